@@ -3,7 +3,6 @@ SCM Document Manager - Streamlit App (Simplified Vertical Layout)
 """
 import streamlit as st
 from datetime import datetime
-import pandas as pd
 
 # Page config (must be first) - WIDE MODE
 st.set_page_config(
@@ -18,7 +17,19 @@ from config.logging_config import setup_logging
 from config.settings import get_settings
 from services.sheets_service import SheetsService
 from services.document_service import DocumentService
+from services.drive_service import DriveService
+from services.drive_change_sync import get_drive_change_sync
+from services.folder_prewarm import get_folder_prewarmer
+from services.shipment_store import ShipmentRows, ShipmentStore
+from services.metrics import start_metrics_server
 from core.enums import DocType
+from core.models import UploadRequest
+from ui.components.upload_progress import create_upload_progress
+from ui.components.metrics_panel import render_metrics_panel
+from ui.components.shipment_table import render_shipment_table
+
+# Invoice options shown for one search
+INVOICE_OPTION_LIMIT = 50
 
 # Setup logging
 setup_logging()
@@ -30,6 +41,10 @@ except Exception as e:
     st.error(f"⚠️ 설정 오류: {e}")
     st.stop()
 
+# Serve /metrics once per process when enabled
+if settings.metrics_enabled and settings.metrics_port:
+    start_metrics_server(settings.metrics_port)
+
 # Initialize services (cached in session)
 if 'sheets_service' not in st.session_state:
     st.session_state.sheets_service = SheetsService()
@@ -37,14 +52,25 @@ if 'sheets_service' not in st.session_state:
 if 'document_service' not in st.session_state:
     st.session_state.document_service = DocumentService()
 
-# Load all shipments on first load
-if 'all_shipments' not in st.session_state:
-    try:
-        with st.spinner("선적 데이터 로딩 중..."):
-            st.session_state.all_shipments = st.session_state.sheets_service.get_all_shipments(limit=200)
-    except Exception as e:
-        st.error(f"선적 데이터 로딩 실패: {e}")
-        st.session_state.all_shipments = []
+# Load shipments from the process-wide snapshot (shared by all sessions,
+# reloaded only when the SCM sheet revision changes)
+try:
+    with st.spinner("선적 데이터 로딩 중..."):
+        snapshot = st.session_state.sheets_service.get_shipment_snapshot()
+        all_shipments = snapshot.shipments
+
+    storage = st.session_state.document_service.storage
+    if isinstance(storage, DriveService):
+        # Apply folders/files changed in Drive since the last poll
+        get_drive_change_sync().sync_in_background(storage)
+
+        # Pre-create Drive folders for active shipments once per sheet revision
+        if settings.folder_prewarm_enabled:
+            get_folder_prewarmer(storage).prewarm_in_background(snapshot)
+except Exception as e:
+    st.error(f"선적 데이터 로딩 실패: {e}")
+    snapshot = None
+    all_shipments = ShipmentRows(ShipmentStore())
 
 # CSS with card styling
 st.markdown("""
@@ -122,18 +148,19 @@ st.markdown("""
 
 # Header
 st.title("📦 SCM 서류 관리 시스템")
-st.markdown(f"<div class='caption'>업로더: {settings.default_uploader} | 총 {len(st.session_state.all_shipments)}건의 선적</div>", unsafe_allow_html=True)
+st.markdown(f"<div class='caption'>업로더: {settings.default_uploader} | 총 {len(all_shipments)}건의 선적</div>", unsafe_allow_html=True)
 
 # ===== 1. 서류 업로드 (전체 너비, 최우선) =====
 st.markdown('<div class="section-card">', unsafe_allow_html=True)
 st.markdown('<div class="section-header">📤 서류 업로드</div>', unsafe_allow_html=True)
 st.markdown('<div class="section-caption">Drive에 저장하고 한 번에 벡터화합니다</div>', unsafe_allow_html=True)
 
-# File uploader (enlarged)
-uploaded_file = st.file_uploader(
+# File uploader (enlarged, multiple files)
+uploaded_files = st.file_uploader(
     "파일을 드래그하거나 클릭하여 업로드",
     type=['pdf', 'xlsx', 'xls', 'csv', 'png', 'jpg', 'jpeg'],
-    help=f"최대 {settings.max_file_size_mb}MB",
+    help=f"파일당 최대 {settings.max_file_size_mb}MB, 여러 파일 선택 가능",
+    accept_multiple_files=True,
     key="file_uploader"
 )
 
@@ -141,8 +168,17 @@ uploaded_file = st.file_uploader(
 col1, col2 = st.columns(2)
 
 with col1:
-    # Invoice Number selectbox (검색 기능 내장)
-    invoice_options = ["송장 선택..."] + [s.invoice_no for s in st.session_state.all_shipments]
+    # Invoice search served from the snapshot's search index; only the first
+    # matches become options, so a rerun sends a short list whatever the sheet size
+    invoice_search = st.text_input(
+        "송장 검색",
+        placeholder="송장번호, BL번호, 티켓명",
+        key="invoice_search"
+    )
+    invoice_matches = all_shipments[:0]
+    if snapshot is not None and invoice_search.strip():
+        invoice_matches = snapshot.search(invoice_search)[:INVOICE_OPTION_LIMIT]
+    invoice_options = ["송장 선택..."] + invoice_matches.column('invoice_no')
     selected_invoice = st.selectbox(
         "송장 번호",
         options=invoice_options,
@@ -158,6 +194,18 @@ with col2:
         key="doctype_select"
     )
 
+# Per-file document type (defaults to the type selected above)
+file_doc_types = {}
+if uploaded_files and len(uploaded_files) > 1:
+    with st.expander(f"📑 파일별 서류 유형 ({len(uploaded_files)}개 파일)"):
+        for i, f in enumerate(uploaded_files):
+            file_doc_types[i] = st.selectbox(
+                f.name,
+                options=doc_type_options,
+                index=doc_type_options.index(selected_doc_type),
+                key=f"doctype_file_{i}_{f.name}"
+            )
+
 # Description (optional)
 description = st.text_area(
     "설명 (선택사항)",
@@ -166,51 +214,58 @@ description = st.text_area(
     key="description_input"
 )
 
+
+def get_doc_abbr(doc_type: str) -> str:
+    """Get doc type abbreviation for file names"""
+    return "CIPL" if "Invoice" in doc_type else doc_type[:4].upper()
+
+
 # Upload button
 if st.button("🚀 업로드 & 벡터화", type="primary", use_container_width=True):
-    if not uploaded_file:
+    if not uploaded_files:
         st.error("파일을 선택해주세요")
     elif selected_invoice == "송장 선택...":
         st.error("송장 번호를 선택해주세요")
     else:
         # Find selected shipment
-        shipment = next((s for s in st.session_state.all_shipments if s.invoice_no == selected_invoice), None)
+        shipment = invoice_matches.find(selected_invoice)
 
         if shipment:
-            with st.spinner("업로드 중..."):
+            with st.spinner(f"{len(uploaded_files)}개 파일 업로드 중..."):
                 try:
-                    # Get doc type abbreviation
-                    doc_abbr = "CIPL" if "Invoice" in selected_doc_type else selected_doc_type[:4].upper()
-
-                    result = st.session_state.document_service.upload_document(
-                        file_content=uploaded_file.getvalue(),
-                        file_name=uploaded_file.name,
-                        shipment_id=shipment.invoice_no,
-                        doc_type=selected_doc_type,
-                        doc_type_abbr=doc_abbr,
-                        origin=shipment.origin,
-                        destination=shipment.destination,
-                        carrier_name=shipment.carrier_name,
-                        carrier_mode=shipment.carrier_mode
+                    batch = []
+                    for i, f in enumerate(uploaded_files):
+                        doc_type = file_doc_types.get(i, selected_doc_type)
+                        batch.append(UploadRequest(
+                            file_content=f,
+                            file_name=f.name,
+                            shipment_id=shipment.invoice_no,
+                            doc_type=doc_type,
+                            doc_type_abbr=get_doc_abbr(doc_type),
+                            origin=shipment.origin,
+                            destination=shipment.destination,
+                            carrier_name=shipment.carrier_name,
+                            carrier_mode=shipment.carrier_mode
+                        ))
+
+                    on_progress = create_upload_progress(sum(f.size for f in uploaded_files))
+                    results = st.session_state.document_service.upload_documents(
+                        batch,
+                        progress_callback=on_progress
                     )
+                    failed = [(f, r) for f, r in zip(uploaded_files, results) if not r.success]
 
-                    if result.success:
-                        st.success(f"✅ {uploaded_file.name} 업로드 완료!")
-
-                        if result.metadata:
-                            with st.expander("📋 업로드 상세 정보"):
-                                st.json({
-                                    "파일명": result.metadata.file_name,
-                                    "드라이브 URL": result.metadata.drive_url,
-                                    "폴더 경로": result.metadata.drive_folder_id,
-                                    "업로더": result.metadata.uploader,
-                                    "업로드 시간": result.metadata.upload_timestamp.isoformat()
-                                })
+                    if not failed:
+                        st.success(f"✅ {len(results)}개 파일 업로드 완료!")
 
                         # Clear and reload
                         st.rerun()
                     else:
-                        st.error(f"❌ 업로드 실패: {result.error}")
+                        succeeded = len(results) - len(failed)
+                        if succeeded:
+                            st.success(f"✅ {succeeded}개 파일 업로드 완료")
+                        for f, r in failed:
+                            st.error(f"❌ {f.name} 업로드 실패: {r.error}")
 
                 except Exception as e:
                     st.error(f"❌ 업로드 오류: {e}")
@@ -224,31 +279,9 @@ st.markdown('<div class="section-card">', unsafe_allow_html=True)
 st.markdown('<div class="section-header">📋 선적 서류 현황</div>', unsafe_allow_html=True)
 st.markdown('<div class="section-caption">진행 중인 모든 선적 및 필요 서류 개요</div>', unsafe_allow_html=True)
 
-# Display shipment data
-if st.session_state.all_shipments:
-    # Create DataFrame
-    shipment_data = []
-    for s in st.session_state.all_shipments[:50]:  # Show first 50
-        shipment_data.append({
-            "송장번호": s.invoice_no,
-            "티켓명": s.ticket_name or "-",
-            "일자": s.onboard_date or "-",
-            "경로": f"{s.origin} → {s.destination}",
-            "운송사": f"{s.carrier_name} ({s.carrier_mode})",
-            "BL번호": s.bl_no or "-",
-            "상태": s.status or "-"
-        })
-
-    df = pd.DataFrame(shipment_data)
-
-    st.dataframe(
-        df,
-        use_container_width=True,
-        hide_index=True,
-        height=400
-    )
-
-    st.caption(f"총 {len(st.session_state.all_shipments)}건의 선적 중 {len(shipment_data)}건 표시")
+# Display shipment data (paged; only the visible page is sent to the browser)
+if all_shipments:
+    render_shipment_table(snapshot)
 else:
     st.info("선적 데이터가 없습니다")
 
@@ -312,6 +345,9 @@ with st.expander("🔍 서류 Q&A (Phase 2-3 예정)", expanded=False):
     st.markdown("**답변**")
     st.info("AI의 답변이 여기에 표시됩니다")
 
+if settings.metrics_debug_panel:
+    render_metrics_panel()
+
 # Footer
 st.markdown("<br>", unsafe_allow_html=True)
 st.caption(
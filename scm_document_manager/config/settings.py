@@ -72,6 +72,125 @@ class Settings(BaseSettings):
         default=8,
         description="Maximum file size in MB"
     )
+    dedup_enabled: bool = Field(
+        default=True,
+        description="Link identical content to the existing Drive file instead of re-uploading"
+    )
+    upload_chunk_size_mb: int = Field(
+        default=5,
+        description="Resumable upload chunk size in MB"
+    )
+    upload_max_workers: int = Field(
+        default=4,
+        description="Concurrent Drive uploads for multi-file uploads"
+    )
+    async_max_concurrency: int = Field(
+        default=8,
+        description="Concurrent API calls in the asyncio service layer"
+    )
+
+    # HTTP Clients
+    http_pool_maxsize: int = Field(
+        default=10,
+        description="Keep-alive connections pooled per host for Sheets requests"
+    )
+
+    token_refresh_margin_seconds: int = Field(
+        default=600,
+        description="Refresh the shared access token this many seconds before expiry"
+    )
+
+    # Request Quotas (per process)
+    drive_requests_per_minute: int = Field(
+        default=600,
+        description="Drive API request budget per minute"
+    )
+    sheets_read_requests_per_minute: int = Field(
+        default=60,
+        description="Sheets API read request budget per minute"
+    )
+    sheets_write_requests_per_minute: int = Field(
+        default=60,
+        description="Sheets API write request budget per minute"
+    )
+
+    # Dashboard Log Writes
+    upload_log_batch_size: int = Field(
+        default=50,
+        description="Queued log rows that trigger an immediate sheet write"
+    )
+    upload_log_flush_interval_seconds: float = Field(
+        default=5.0,
+        description="Maximum seconds before queued log rows are written"
+    )
+    upload_log_sync_interval_seconds: float = Field(
+        default=10.0,
+        description="Minimum seconds between reads of Dashboard rows written by other processes"
+    )
+
+    # Storage Backend
+    storage_backend: str = Field(
+        default="drive",
+        description="Where uploaded files are stored: drive or local"
+    )
+    local_storage_dir: str = Field(
+        default="storage",
+        description="Root directory of the local content-addressed store"
+    )
+
+    # Local Cache
+    cache_dir: str = Field(
+        default=".cache",
+        description="Local directory for persistent caches"
+    )
+    folder_cache_ttl_seconds: int = Field(
+        default=86400,
+        description="Folder ID cache entry lifetime in seconds"
+    )
+    folder_cache_max_entries: int = Field(
+        default=20000,
+        description="Maximum number of cached folder paths"
+    )
+    folder_cache_flush_interval_seconds: float = Field(
+        default=5.0,
+        description="Maximum seconds before folder cache changes are written to disk"
+    )
+    drive_changes_poll_interval_seconds: int = Field(
+        default=60,
+        description="Minimum seconds between Drive changes feed polls"
+    )
+    shipment_snapshot_check_interval_seconds: int = Field(
+        default=30,
+        description="Minimum seconds between SCM sheet revision checks"
+    )
+    shipment_table_page_size: int = Field(
+        default=50,
+        description="Default rows per page of the shipment table"
+    )
+
+    # Folder Pre-warming
+    folder_prewarm_enabled: bool = Field(
+        default=False,
+        description="Create shipment folders and cache existing document type folders of active shipments in the background"
+    )
+    folder_prewarm_active_statuses: str = Field(
+        default="CREATED,IN_TRANSIT",
+        description="Comma-separated shipment statuses pre-warmed (all others are skipped)"
+    )
+
+    # Metrics
+    metrics_enabled: bool = Field(
+        default=False,
+        description="Record latency spans and counters for the upload pipeline"
+    )
+    metrics_port: int = Field(
+        default=0,
+        description="Local port serving /metrics and /metrics.json (0 disables)"
+    )
+    metrics_debug_panel: bool = Field(
+        default=False,
+        description="Show the metrics debug panel in the app"
+    )
 
     # Logging
     log_level: str = Field(
@@ -30,6 +30,14 @@ class ShipmentCategory(str, Enum):
     KR_TO_CUSTOMER = "03_KR_TO_CUSTOMER"  # 한국 → 최종판매처
 
 
+class RequestPriority(int, Enum):
+    """API request priority classes (lower value is served first)"""
+    UPLOAD = 0
+    LOG_WRITE = 1
+    DASHBOARD_READ = 2
+    BACKGROUND = 3
+
+
 class CarrierMode(str, Enum):
     """Carrier modes"""
     EXPRESS = "특송"
@@ -41,3 +49,9 @@ class CarrierMode(str, Enum):
 KR_WAREHOUSES = {"태광KR"}
 OVERSEAS_3PL_WAREHOUSES = {"CJ서부US", "어크로스비US", "01-US", "02-US"}
 CUSTOMER_WAREHOUSES = {"AMZUS", "SBSMY", "SBSPH", "SBSSG", "SBSTH", "REVEVN"}
+
+
+class StorageBackendType(str, Enum):
+    """Where uploaded files are stored"""
+    DRIVE = "drive"
+    LOCAL = "local"
@@ -18,6 +18,16 @@ class SheetsAPIError(SCMDocumentError):
     pass
 
 
+class LocalStorageError(SCMDocumentError):
+    """Local file store read/write errors"""
+    pass
+
+
+class CircuitOpenError(SCMDocumentError):
+    """API endpoint is failing fast after repeated transient errors"""
+    pass
+
+
 class DocumentParsingError(SCMDocumentError):
     """Document parsing/extraction errors"""
     pass
@@ -36,3 +46,8 @@ class FolderCreationError(DriveAPIError):
 class FileUploadError(DriveAPIError):
     """File upload failed"""
     pass
+
+
+class FolderNotFoundError(DriveAPIError):
+    """Target folder no longer exists (stale folder ID)"""
+    pass
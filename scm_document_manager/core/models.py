@@ -2,7 +2,7 @@
 Pydantic models for SCM Document Manager
 """
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 from pydantic import BaseModel, Field, HttpUrl
 from .enums import DocType, UploadStatus, ShipmentCategory
 
@@ -70,6 +70,20 @@ class FolderPath(BaseModel):
     folder_path: str = Field(..., description="전체 경로")
 
 
+class UploadRequest(BaseModel):
+    """배치 업로드 항목"""
+    file_content: Any = Field(..., description="파일 내용 (bytes 또는 file-like 스트림)")
+    file_name: str = Field(..., description="원본 파일명")
+    shipment_id: str = Field(..., description="인보이스 번호")
+    doc_type: str = Field(..., description="서류 종류")
+    doc_type_abbr: str = Field(..., description="서류 약어 (파일명용)")
+    uploader: Optional[str] = Field(None, description="업로더")
+    origin: Optional[str] = Field(None, description="출발창고")
+    destination: Optional[str] = Field(None, description="도착창고")
+    carrier_name: Optional[str] = Field(None, description="운송사")
+    carrier_mode: Optional[str] = Field(None, description="운송 모드")
+
+
 class UploadResult(BaseModel):
     """업로드 결과"""
     success: bool = Field(..., description="성공 여부")
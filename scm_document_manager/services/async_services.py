@@ -0,0 +1,276 @@
+"""
+Asyncio counterparts of the Drive, Sheets and Document services
+
+The Google client libraries (googleapiclient, gspread) are synchronous, so
+each API call runs on a bounded worker pool and is awaited without blocking
+the event loop. Independent calls (folder levels, file uploads, dashboard
+reads) overlap up to settings.async_max_concurrency in flight.
+
+A service that creates its worker pool shuts it down on close(); use it as
+an async context manager to do so automatically:
+
+    async with AsyncDocumentService() as documents:
+        results = await documents.upload_documents(batch)
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple
+from core.models import DocumentMetadata, ShipmentInfo, UploadRequest, UploadResult
+from config.settings import get_settings
+from config.logging_config import get_logger
+from .document_service import DocumentService
+from .drive_service import DriveService
+from .sheets_service import STREAM_BATCH_ROWS, SheetsService
+from .shipment_snapshot import ShipmentSnapshot
+from .storage_backend import StorageBackend
+
+logger = get_logger(__name__)
+
+
+class _AsyncBridge:
+    """Runs blocking service calls on a bounded thread pool"""
+
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None):
+        """
+        Args:
+            executor: Worker pool shared with other async services (optional;
+                left running by close())
+        """
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=get_settings().async_max_concurrency,
+            thread_name_prefix="async-api"
+        )
+
+    def close(self) -> None:
+        """Shut down the worker pool if this service created it"""
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # Waits for running calls without blocking the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+
+class AsyncDriveService(_AsyncBridge):
+    """
+    Awaitable wrapper around DriveService
+
+    Also wraps any other StorageBackend; find_folder / create_folder are
+    Drive-only.
+    """
+
+    def __init__(
+        self,
+        drive_service: Optional[StorageBackend] = None,
+        executor: Optional[ThreadPoolExecutor] = None
+    ):
+        super().__init__(executor)
+        self.sync = drive_service or DriveService()
+
+    async def find_folder(self, folder_name: str, parent_folder_id: Optional[str] = None) -> Optional[str]:
+        return await self._run(self.sync.find_folder, folder_name, parent_folder_id)
+
+    async def create_folder(self, folder_name: str, parent_folder_id: Optional[str] = None) -> str:
+        return await self._run(self.sync.create_folder, folder_name, parent_folder_id)
+
+    async def ensure_folder_path(self, folder_path: str, root_folder_id: Optional[str] = None) -> str:
+        return await self._run(self.sync.ensure_folder_path, folder_path, root_folder_id)
+
+    async def ensure_folder_paths(self, folder_paths: List[str]) -> Dict[str, Any]:
+        """
+        Resolve several folder paths concurrently
+
+        Paths are resolved one depth level at a time: all distinct prefixes
+        of a level run concurrently, and each level finds its parents in the
+        folder cache, so shared parents are never created twice.
+
+        Args:
+            folder_paths: Folder paths relative to the root folder
+
+        Returns:
+            Dict mapping each path (without surrounding slashes) to its
+            folder ID, or to the exception raised while resolving it
+        """
+        paths = {path.strip('/') for path in folder_paths}
+        resolved: Dict[str, Any] = {}
+        max_depth = max((len(path.split('/')) for path in paths), default=0)
+
+        for depth in range(1, max_depth + 1):
+            prefixes = sorted({
+                '/'.join(path.split('/')[:depth])
+                for path in paths
+                if len(path.split('/')) >= depth
+            })
+            # Skip prefixes below an ancestor that already failed
+            prefixes = [p for p in prefixes if not self._failed_ancestor(p, resolved)]
+            results = await asyncio.gather(
+                *(self.ensure_folder_path(prefix) for prefix in prefixes),
+                return_exceptions=True
+            )
+            resolved.update(zip(prefixes, results))
+
+        return {
+            path: resolved[path] if path in resolved else self._failed_ancestor(path, resolved)
+            for path in paths
+        }
+
+    @staticmethod
+    def _failed_ancestor(path: str, resolved: Dict[str, Any]) -> Optional[Exception]:
+        parts = path.split('/')
+        for depth in range(1, len(parts)):
+            result = resolved.get('/'.join(parts[:depth]))
+            if isinstance(result, Exception):
+                return result
+        return None
+
+    async def upload_stream(
+        self,
+        stream: BinaryIO,
+        file_name: str,
+        folder_id: str,
+        mime_type: str = 'application/pdf',
+        **kwargs
+    ) -> Dict[str, Any]:
+        return await self._run(self.sync.upload_stream, stream, file_name, folder_id, mime_type, **kwargs)
+
+    async def get_file(self, file_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self.sync.get_file, file_id)
+
+    async def create_shortcut(self, target_id: str, name: str, folder_id: str) -> Dict[str, Any]:
+        return await self._run(self.sync.create_shortcut, target_id, name, folder_id)
+
+    async def delete_file(self, file_id: str) -> None:
+        await self._run(self.sync.delete_file, file_id)
+
+
+class AsyncSheetsService(_AsyncBridge):
+    """Awaitable wrapper around SheetsService"""
+
+    def __init__(
+        self,
+        sheets_service: Optional[SheetsService] = None,
+        executor: Optional[ThreadPoolExecutor] = None
+    ):
+        super().__init__(executor)
+        self.sync = sheets_service or SheetsService()
+
+    async def get_shipment_snapshot(self) -> ShipmentSnapshot:
+        return await self._run(self.sync.get_shipment_snapshot)
+
+    async def search_shipments(self, search_term: str) -> Sequence[ShipmentInfo]:
+        return await self._run(self.sync.search_shipments, search_term)
+
+    async def get_all_shipments(self, limit: Optional[int] = 100) -> List[ShipmentInfo]:
+        return await self._run(self.sync.get_all_shipments, limit)
+
+    async def iter_shipments(self, batch_rows: int = STREAM_BATCH_ROWS) -> AsyncIterator[ShipmentInfo]:
+        """Stream shipments; each row window is read and parsed on the worker pool"""
+        shipments = self.sync.iter_shipments(batch_rows)
+        while True:
+            batch = await self._run(lambda: list(islice(shipments, batch_rows)))
+            if not batch:
+                return
+            for shipment in batch:
+                yield shipment
+
+    async def append_upload_logs(self, metadata_list: List[DocumentMetadata]) -> None:
+        await self._run(self.sync.append_upload_logs, metadata_list)
+
+    async def flush_upload_logs(self) -> int:
+        return await self._run(self.sync.flush_upload_logs)
+
+    async def get_upload_logs(
+        self,
+        shipment_id: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        return await self._run(self.sync.get_upload_logs, shipment_id, limit)
+
+    async def get_uploaded_doc_types(self, shipment_ids: List[str]) -> Dict[str, List[str]]:
+        return await self._run(self.sync.get_uploaded_doc_types, shipment_ids)
+
+    async def load_dashboard(
+        self,
+        shipment_id: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[ShipmentSnapshot, List[Dict[str, Any]]]:
+        """
+        Load shipments and upload logs concurrently
+
+        Returns:
+            (shipment snapshot, upload log records)
+        """
+        snapshot, logs = await asyncio.gather(
+            self.get_shipment_snapshot(),
+            self.get_upload_logs(shipment_id, limit)
+        )
+        return snapshot, logs
+
+
+class AsyncDocumentService(_AsyncBridge):
+    """Asyncio document upload orchestration"""
+
+    def __init__(
+        self,
+        document_service: Optional[DocumentService] = None,
+        executor: Optional[ThreadPoolExecutor] = None
+    ):
+        """
+        Initialize async document service
+
+        Args:
+            document_service: Sync service whose storage backend, Sheets
+                service and per-document upload are reused (default: new
+                DocumentService)
+            executor: Worker pool for blocking calls (optional; shared with
+                self.drive and self.sheets)
+        """
+        super().__init__(executor)
+        self.sync = document_service or DocumentService()
+        self.drive = AsyncDriveService(self.sync.storage, self._executor)
+        self.sheets = AsyncSheetsService(self.sync.sheets, self._executor)
+
+    async def upload_document(self, request: UploadRequest) -> UploadResult:
+        """Upload one document (see upload_documents)"""
+        return (await self.upload_documents([request]))[0]
+
+    async def upload_documents(
+        self,
+        batch: List[UploadRequest],
+        progress_callback: Optional[Callable[[int, int, int], None]] = None
+    ) -> List[UploadResult]:
+        """
+        Upload several documents with overlapping API calls
+
+        Same behavior as DocumentService.upload_documents: each document is
+        validated, its folder resolved and its file uploaded concurrently
+        (DocumentService.upload_one), then all Dashboard rows are logged in
+        one batch.
+
+        Args:
+            batch: Upload requests
+            progress_callback: Called from worker threads with
+                (request index, bytes_sent, total_bytes)
+
+        Returns:
+            One UploadResult per request, in request order
+        """
+        results = await asyncio.gather(*(
+            self._run(
+                self.sync.upload_one,
+                request,
+                partial(progress_callback, i) if progress_callback else None
+            )
+            for i, request in enumerate(batch)
+        ))
+        return await self._run(self.sync.log_uploads, batch, list(results))
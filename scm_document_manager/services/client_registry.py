@@ -0,0 +1,179 @@
+"""
+Process-wide Google API client registry
+
+One set of credentials authorizes every client, so all sessions share a
+single access token, kept fresh by the shared token cache (see
+token_cache). Sheets calls go through one gspread client whose requests
+session keeps a pool of keep-alive connections; Drive calls use one
+googleapiclient resource per worker thread (httplib2 is not thread-safe),
+each keeping its connection open across sessions.
+"""
+import os
+import threading
+from typing import Dict, Optional
+import gspread
+import httplib2
+import google_auth_httplib2
+from google.auth.transport.requests import AuthorizedSession
+from googleapiclient.discovery import build
+from requests.adapters import HTTPAdapter
+from config.settings import get_settings
+from config.logging_config import get_logger
+from .metrics import get_metrics
+from .token_cache import AccessTokenCache, SharedTokenCredentials
+
+logger = get_logger(__name__)
+
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+
+class _CountingAuthorizedHttp(google_auth_httplib2.AuthorizedHttp):
+    """AuthorizedHttp that reports requests and new connections to the registry"""
+
+    def __init__(self, credentials, http, registry: "ClientRegistry"):
+        super().__init__(credentials, http=http)
+        self._registry = registry
+
+    def request(self, *args, **kwargs):
+        connections = len(self.http.connections)
+        try:
+            return super().request(*args, **kwargs)
+        finally:
+            self._registry._record_drive_request(len(self.http.connections) > connections)
+
+
+class ClientRegistry:
+    """Shared credentials, Sheets client and per-thread Drive clients"""
+
+    def __init__(
+        self,
+        token_cache: AccessTokenCache,
+        pool_maxsize: int = 10,
+        timeout_seconds: int = 60
+    ):
+        """
+        Initialize registry (clients are built on first use)
+
+        Args:
+            token_cache: Access token source for every client
+            pool_maxsize: Keep-alive connections kept per host for Sheets
+            timeout_seconds: Socket timeout for Drive connections
+        """
+        self.token_cache = token_cache
+        self.pool_maxsize = pool_maxsize
+        self.timeout_seconds = timeout_seconds
+        self._credentials = None
+        self._sheets_client: Optional[gspread.Client] = None
+        self._sheets_adapter: Optional[HTTPAdapter] = None
+        self._local = threading.local()
+        self._drive_clients = 0
+        self._drive_requests = 0
+        self._drive_connections = 0
+        self._lock = threading.Lock()
+
+    @property
+    def credentials(self) -> SharedTokenCredentials:
+        """Credentials shared by every client (starts background token refresh)"""
+        with self._lock:
+            if self._credentials is None:
+                self.token_cache.start_refresher()
+                self._credentials = SharedTokenCredentials(self.token_cache)
+            return self._credentials
+
+    def drive(self):
+        """
+        Get the Drive API resource for the current thread
+
+        Built once per thread and reused by every DriveService on it.
+        """
+        service = getattr(self._local, 'drive', None)
+        if service is None:
+            http = _CountingAuthorizedHttp(
+                self.credentials,
+                httplib2.Http(timeout=self.timeout_seconds),
+                self
+            )
+            service = self._local.drive = build('drive', 'v3', http=http, cache_discovery=False)
+            with self._lock:
+                self._drive_clients += 1
+        return service
+
+    def sheets(self) -> gspread.Client:
+        """Get the gspread client shared by every thread and session"""
+        credentials = self.credentials
+        with self._lock:
+            if self._sheets_client is None:
+                session = AuthorizedSession(credentials)
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.pool_maxsize)
+                session.mount('https://', adapter)
+                self._sheets_adapter = adapter
+                self._sheets_client = gspread.Client(auth=credentials, session=session)
+            return self._sheets_client
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get connection reuse and pool utilization counters
+
+        Returns:
+            Dict with Sheets requests / connections opened / connections
+            reused / pooled idle connections, and Drive clients / requests /
+            connections opened / connections reused
+        """
+        sheets_requests = sheets_connections = sheets_idle = 0
+        if self._sheets_adapter is not None:
+            pools = self._sheets_adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                sheets_requests += pool.num_requests
+                sheets_connections += pool.num_connections
+                if pool.pool is not None:
+                    # Free slots hold None until a connection is returned
+                    sheets_idle += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+
+        with self._lock:
+            return {
+                'sheets_requests': sheets_requests,
+                'sheets_connections_opened': sheets_connections,
+                'sheets_connections_reused': max(sheets_requests - sheets_connections, 0),
+                'sheets_pool_idle': sheets_idle,
+                'sheets_pool_maxsize': self.pool_maxsize,
+                'drive_clients': self._drive_clients,
+                'drive_requests': self._drive_requests,
+                'drive_connections_opened': self._drive_connections,
+                'drive_connections_reused': self._drive_requests - self._drive_connections
+            }
+
+    def _record_drive_request(self, new_connection: bool) -> None:
+        with self._lock:
+            self._drive_requests += 1
+            if new_connection:
+                self._drive_connections += 1
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Get process-wide client registry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            settings = get_settings()
+            token_cache = AccessTokenCache(
+                credentials_info=settings.google_credentials,
+                scopes=SCOPES,
+                cache_file=os.path.join(settings.cache_dir, 'access_token.json'),
+                refresh_margin_seconds=settings.token_refresh_margin_seconds
+            )
+            _registry = ClientRegistry(
+                token_cache=token_cache,
+                pool_maxsize=settings.http_pool_maxsize
+            )
+            get_metrics().register_collector('http_pool', _registry.stats)
+        return _registry
@@ -0,0 +1,215 @@
+"""
+Content-hash deduplication index for uploaded files
+
+Maps SHA-256 (and Drive md5Checksum) of uploaded content to the Drive file
+holding it. Stored in a local JSON file; it can be rebuilt from Drive because
+every upload carries its SHA-256 in appProperties and Drive reports
+md5Checksum for all binary files.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Optional, Tuple
+from config.settings import get_settings
+from config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def compute_content_hashes(stream: BinaryIO) -> Tuple[str, str]:
+    """
+    Compute SHA-256 and MD5 of a seekable stream in one streaming pass
+
+    Args:
+        stream: Seekable binary stream (rewound to 0 afterwards)
+
+    Returns:
+        (sha256 hex digest, md5 hex digest)
+    """
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5()
+    stream.seek(0)
+    while True:
+        chunk = stream.read(HASH_CHUNK_SIZE)
+        if not chunk:
+            break
+        sha256.update(chunk)
+        md5.update(chunk)
+    stream.seek(0)
+    return sha256.hexdigest(), md5.hexdigest()
+
+
+class ContentHashIndex:
+    """Content hash → Drive file index"""
+
+    def __init__(self, index_file: Optional[str] = None):
+        """
+        Initialize index
+
+        Args:
+            index_file: JSON file used for persistence (None for memory only)
+        """
+        self.index_file = index_file
+        self._by_sha256: Dict[str, Dict[str, Any]] = {}
+        self._by_md5: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._by_md5)
+
+    def lookup(self, sha256: str, md5: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Find the Drive file holding identical content
+
+        Args:
+            sha256: Content SHA-256
+            md5: Content MD5 (matches files indexed only by Drive md5Checksum)
+
+        Returns:
+            Entry with file_id, drive_url, folder_id and size, or None
+        """
+        with self._lock:
+            entry = self._by_sha256.get(sha256)
+            if entry is None and md5:
+                entry = self._by_md5.get(md5)
+            return dict(entry) if entry else None
+
+    def add(
+        self,
+        file_id: str,
+        drive_url: Optional[str],
+        folder_id: Optional[str],
+        size: int,
+        md5: Optional[str],
+        sha256: Optional[str] = None,
+        persist: bool = True
+    ) -> None:
+        """Register a Drive file under its content hashes"""
+        entry = {
+            'file_id': file_id,
+            'drive_url': drive_url,
+            'folder_id': folder_id,
+            'size': size
+        }
+        with self._lock:
+            if sha256:
+                self._by_sha256[sha256] = entry
+            if md5:
+                self._by_md5[md5] = entry
+            if persist:
+                self._save()
+
+    def remove_file(self, file_id: str, persist: bool = True) -> None:
+        """Drop every entry pointing at file_id (e.g. deleted in Drive)"""
+        with self._lock:
+            removed = 0
+            for index in (self._by_sha256, self._by_md5):
+                for key in [k for k, v in index.items() if v['file_id'] == file_id]:
+                    del index[key]
+                    removed += 1
+            if removed and persist:
+                self._save()
+
+    def remove_unless(self, keep_folder: Callable[[Optional[str]], bool], persist: bool = True) -> int:
+        """
+        Drop entries whose folder fails keep_folder (e.g. moved out of the root tree)
+
+        Returns:
+            Number of removed entries
+        """
+        with self._lock:
+            removed = 0
+            for index in (self._by_sha256, self._by_md5):
+                for key in [k for k, v in index.items() if not keep_folder(v['folder_id'])]:
+                    del index[key]
+                    removed += 1
+            if removed and persist:
+                self._save()
+            return removed
+
+    def save(self) -> None:
+        """Write index to disk (after add/remove_file with persist=False)"""
+        with self._lock:
+            self._save()
+
+    def rebuild(self, drive_files: Iterable[Dict[str, Any]]) -> int:
+        """
+        Replace index contents from a Drive file listing
+
+        Args:
+            drive_files: Drive file resources with id, webViewLink, parents,
+                size, md5Checksum and appProperties
+
+        Returns:
+            Number of indexed files
+        """
+        with self._lock:
+            self._by_sha256.clear()
+            self._by_md5.clear()
+
+        count = 0
+        for file in drive_files:
+            md5 = file.get('md5Checksum')
+            sha256 = (file.get('appProperties') or {}).get('sha256')
+            if not md5 and not sha256:
+                continue
+            self.add(
+                file_id=file['id'],
+                drive_url=file.get('webViewLink'),
+                folder_id=(file.get('parents') or [None])[0],
+                size=int(file.get('size', 0)),
+                md5=md5,
+                sha256=sha256,
+                persist=False
+            )
+            count += 1
+
+        with self._lock:
+            self._save()
+        logger.info(f"Content hash index rebuilt from Drive: {count} files")
+        return count
+
+    def _load(self) -> None:
+        if not self.index_file or not os.path.exists(self.index_file):
+            return
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._by_sha256 = data.get('sha256', {})
+            self._by_md5 = data.get('md5', {})
+            logger.info(f"Content hash index loaded: {len(self._by_md5)} files")
+        except Exception as e:
+            logger.warning(f"Failed to load content hash index {self.index_file}: {e}")
+
+    def _save(self) -> None:
+        """Write index to disk atomically (caller holds _lock)"""
+        if not self.index_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.index_file) or '.', exist_ok=True)
+            tmp_file = f"{self.index_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'sha256': self._by_sha256, 'md5': self._by_md5}, f)
+            os.replace(tmp_file, self.index_file)
+        except Exception as e:
+            logger.warning(f"Failed to save content hash index {self.index_file}: {e}")
+
+
+_hash_index: Optional[ContentHashIndex] = None
+_hash_index_lock = threading.Lock()
+
+
+def get_content_hash_index() -> ContentHashIndex:
+    """Get process-wide content hash index"""
+    global _hash_index
+    with _hash_index_lock:
+        if _hash_index is None:
+            settings = get_settings()
+            _hash_index = ContentHashIndex(
+                index_file=os.path.join(settings.cache_dir, 'content_hash_index.json')
+            )
+        return _hash_index
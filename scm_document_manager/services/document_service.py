@@ -1,36 +1,60 @@
 """
 Document service orchestration
 """
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
-from core.models import DocumentMetadata, UploadResult
-from core.enums import UploadStatus
-from core.exceptions import ValidationError
+from io import BytesIO, SEEK_END
+from tempfile import SpooledTemporaryFile
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+from core.models import DocumentMetadata, UploadRequest, UploadResult
+from core.enums import StorageBackendType, UploadStatus
+from core.exceptions import ValidationError, FolderNotFoundError
 from config.settings import get_settings
 from config.logging_config import get_logger
 from utils.folder_utils import determine_shipment_category, build_folder_path, build_file_name
+from .dedup_index import compute_content_hashes, get_content_hash_index
 from .drive_service import DriveService
+from .local_store import get_local_content_store
+from .metrics import get_metrics
 from .sheets_service import SheetsService
+from .storage_backend import StorageBackend
 
 logger = get_logger(__name__)
 
 
+def create_storage_backend() -> StorageBackend:
+    """Create the storage backend selected by settings.storage_backend"""
+    backend = StorageBackendType(get_settings().storage_backend.lower())
+    if backend == StorageBackendType.LOCAL:
+        return get_local_content_store()
+    return DriveService()
+
+
 class DocumentService:
     """Document upload orchestration service"""
 
     def __init__(
         self,
-        drive_service: Optional[DriveService] = None,
+        storage: Optional[StorageBackend] = None,
         sheets_service: Optional[SheetsService] = None
     ):
-        """Initialize document service"""
+        """
+        Initialize document service
+
+        Args:
+            storage: Where files are stored (default: settings.storage_backend)
+            sheets_service: Sheets service for upload logs
+        """
         self.settings = get_settings()
-        self.drive = drive_service or DriveService()
+        self.storage = storage or create_storage_backend()
         self.sheets = sheets_service or SheetsService()
+        self.dedup_index = get_content_hash_index()
+        self.metrics = get_metrics()
 
     def upload_document(
         self,
-        file_content: bytes,
+        file_content: Union[bytes, BinaryIO],
         file_name: str,
         shipment_id: str,
         doc_type: str,
@@ -45,7 +69,7 @@ class DocumentService:
         Upload document with full orchestration
 
         Args:
-            file_content: File content (bytes)
+            file_content: File content (bytes or seekable file-like object)
             file_name: Original file name
             shipment_id: Invoice number
             doc_type: Document type
@@ -59,82 +83,358 @@ class DocumentService:
         Returns:
             UploadResult
         """
-        try:
-            # Validate file size
-            file_size_bytes = len(file_content)
-            if file_size_bytes > self.settings.max_file_size_bytes:
-                raise ValidationError(
-                    f"File size ({file_size_bytes / 1024 / 1024:.2f}MB) exceeds limit "
-                    f"({self.settings.max_file_size_mb}MB)"
+        request = UploadRequest(
+            file_content=file_content,
+            file_name=file_name,
+            shipment_id=shipment_id,
+            doc_type=doc_type,
+            doc_type_abbr=doc_type_abbr,
+            uploader=uploader,
+            origin=origin,
+            destination=destination,
+            carrier_name=carrier_name,
+            carrier_mode=carrier_mode
+        )
+        return self.upload_documents([request])[0]
+
+    def upload_documents(
+        self,
+        batch: List[UploadRequest],
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int, int], None]] = None
+    ) -> List[UploadResult]:
+        """
+        Upload several documents concurrently
+
+        Each distinct folder path is resolved once, file uploads run on a
+        bounded thread pool, and all Dashboard rows are logged in one batch.
+        File contents are streamed to the storage backend (to Drive in
+        resumable chunks).
+
+        Args:
+            batch: Upload requests
+            max_workers: Concurrent uploads (default: settings.upload_max_workers)
+            progress_callback: Called from worker threads with
+                (request index, bytes_sent, total_bytes)
+
+        Returns:
+            One UploadResult per request, in request order
+        """
+        with self.metrics.span('document.upload_documents'):
+            return self._upload_documents(batch, max_workers, progress_callback)
+
+    def _upload_documents(
+        self,
+        batch: List[UploadRequest],
+        max_workers: Optional[int],
+        progress_callback: Optional[Callable[[int, int, int], None]]
+    ) -> List[UploadResult]:
+        results: List[Optional[UploadResult]] = [None] * len(batch)
+        folder_paths: Dict[int, str] = {}
+        streams: Dict[int, Tuple[BinaryIO, int]] = {}
+
+        # Validate and determine folder paths
+        for i, request in enumerate(batch):
+            try:
+                with self.metrics.span('document.prepare'):
+                    streams[i] = self._open_stream(request.file_content)
+                    folder_paths[i] = self._prepare(request, streams[i][1])
+            except Exception as e:
+                results[i] = self._failure(request, e)
+
+        # Resolve each distinct folder once (sequentially, so shared parent
+        # folders are created only once)
+        folder_ids: Dict[str, str] = {}
+        folder_errors: Dict[str, Exception] = {}
+        for i, folder_path in list(folder_paths.items()):
+            if folder_path not in folder_ids and folder_path not in folder_errors:
+                try:
+                    logger.info(f"Uploading to folder path: {folder_path}")
+                    with self.metrics.span('document.ensure_folder_path'):
+                        folder_ids[folder_path] = self.storage.ensure_folder_path(folder_path)
+                except Exception as e:
+                    folder_errors[folder_path] = e
+            if folder_path in folder_errors:
+                results[i] = self._failure(batch[i], folder_errors[folder_path])
+                del folder_paths[i]
+
+        # Upload files
+        workers = max_workers or self.settings.upload_max_workers
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload") as pool:
+            futures = {
+                i: pool.submit(
+                    self._upload_one,
+                    batch[i],
+                    streams[i],
+                    folder_path,
+                    folder_ids[folder_path],
+                    self._item_progress(progress_callback, i)
                 )
+                for i, folder_path in folder_paths.items()
+            }
+            for i, future in futures.items():
+                try:
+                    results[i] = self._uploaded(future.result())
+                except Exception as e:
+                    results[i] = self._failure(batch[i], e)
+
+        return self.log_uploads(batch, results)
+
+    def upload_one(
+        self,
+        request: UploadRequest,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> UploadResult:
+        """
+        Upload one document without logging it to the Dashboard sheet
+
+        Concurrent calls are safe: shared parent folders are created once.
+        Log a batch of results with log_uploads afterwards.
+
+        Args:
+            request: Upload request
+            progress_callback: Called with (bytes_sent, total_bytes)
 
-            # Use default uploader if not provided
-            uploader = uploader or self.settings.default_uploader
+        Returns:
+            UploadResult (metadata set on success, not yet logged)
+        """
+        try:
+            with self.metrics.span('document.prepare'):
+                stream = self._open_stream(request.file_content)
+                folder_path = self._prepare(request, stream[1])
+            with self.metrics.span('document.ensure_folder_path'):
+                folder_id = self.storage.ensure_folder_path(folder_path)
+            metadata = self._upload_one(request, stream, folder_path, folder_id, progress_callback)
+        except Exception as e:
+            return self._failure(request, e)
+        return self._uploaded(metadata)
+
+    def log_uploads(self, batch: List[UploadRequest], results: List[UploadResult]) -> List[UploadResult]:
+        """
+        Log the successful uploads of a batch to the Dashboard sheet in one append
+
+        Args:
+            batch: Upload requests
+            results: One UploadResult per request (from upload_one)
 
-            # Determine shipment category and folder path
-            category = determine_shipment_category(
-                origin=origin or "",
-                destination=destination or "",
-                doc_type=doc_type
+        Returns:
+            Results in request order; uploads become failures if logging fails
+        """
+        results = list(results)
+        uploaded = [i for i, result in enumerate(results) if result.success and result.metadata]
+        if not uploaded:
+            return results
+
+        try:
+            with self.metrics.span('document.append_upload_logs'):
+                self.sheets.append_upload_logs([results[i].metadata for i in uploaded])
+        except Exception as e:
+            for i in uploaded:
+                results[i] = self._failure(batch[i], e)
+            return results
+
+        for i in uploaded:
+            metadata = results[i].metadata
+            logger.info(f"Document uploaded successfully: {metadata.shipment_id}/{metadata.doc_type}")
+        return results
+
+    def _open_stream(self, file_content: Any) -> Tuple[BinaryIO, int]:
+        """
+        Get a seekable stream and its size for the file content
+
+        Bytes are wrapped in BytesIO, seekable streams (e.g. Streamlit
+        UploadedFile) are used as-is, and anything else is spooled to a
+        temporary file.
+        """
+        if isinstance(file_content, (bytes, bytearray)):
+            stream = BytesIO(file_content)
+        elif file_content.seekable():
+            stream = file_content
+        else:
+            chunk_size = self.settings.upload_chunk_size_mb * 1024 * 1024
+            stream = SpooledTemporaryFile(max_size=chunk_size)
+            shutil.copyfileobj(file_content, stream, chunk_size)
+
+        size = stream.seek(0, SEEK_END)
+        stream.seek(0)
+        return stream, size
+
+    @staticmethod
+    def _item_progress(
+        progress_callback: Optional[Callable[[int, int, int], None]],
+        index: int
+    ) -> Optional[Callable[[int, int], None]]:
+        """Bind a batch progress callback to one request index"""
+        if progress_callback is None:
+            return None
+        return lambda sent, total: progress_callback(index, sent, total)
+
+    def _prepare(self, request: UploadRequest, file_size_bytes: int) -> str:
+        """Validate request and determine its folder path"""
+        # Validate file size
+        if file_size_bytes > self.settings.max_file_size_bytes:
+            raise ValidationError(
+                f"File size ({file_size_bytes / 1024 / 1024:.2f}MB) exceeds limit "
+                f"({self.settings.max_file_size_mb}MB)"
             )
 
-            folder_path = build_folder_path(category, shipment_id, doc_type)
+        # Determine shipment category and folder path
+        category = determine_shipment_category(
+            origin=request.origin or "",
+            destination=request.destination or "",
+            doc_type=request.doc_type
+        )
 
-            logger.info(f"Uploading to folder path: {folder_path}")
+        return build_folder_path(category, request.shipment_id, request.doc_type)
 
-            # Ensure folder exists
-            folder_id = self.drive.ensure_folder_path(folder_path)
+    def _upload_one(
+        self,
+        request: UploadRequest,
+        stream: Tuple[BinaryIO, int],
+        folder_path: str,
+        folder_id: str,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> DocumentMetadata:
+        """Upload one file into a resolved folder and build its metadata"""
+        file_stream, file_size_bytes = stream
+
+        # Build standardized file name
+        upload_date = datetime.now().strftime("%Y%m%d")
+        std_file_name = build_file_name(upload_date, request.doc_type_abbr, request.file_name)
+
+        # Determine MIME type
+        mime_type = self._get_mime_type(request.file_name)
+
+        # Upload file (or link identical content already stored)
+        try:
+            with self.metrics.span('document.store_file'):
+                upload_result = self._store_file(
+                    file_stream, file_size_bytes, std_file_name, folder_id, mime_type, progress_callback
+                )
+        except FolderNotFoundError:
+            # Cached folder was deleted; resolve it again and retry once
+            logger.warning(f"Cached folder missing for {folder_path}, re-resolving")
+            with self.metrics.span('document.ensure_folder_path'):
+                folder_id = self.storage.ensure_folder_path(folder_path)
+            with self.metrics.span('document.store_file'):
+                upload_result = self._store_file(
+                    file_stream, file_size_bytes, std_file_name, folder_id, mime_type, progress_callback
+                )
 
-            # Build standardized file name
-            upload_date = datetime.now().strftime("%Y%m%d")
-            std_file_name = build_file_name(upload_date, doc_type_abbr, file_name)
+        # Create metadata
+        return DocumentMetadata(
+            shipment_id=request.shipment_id,
+            doc_type=request.doc_type,
+            file_name=std_file_name,
+            drive_file_id=upload_result['file_id'],
+            drive_url=upload_result['drive_url'],
+            drive_folder_id=folder_id,
+            uploader=request.uploader or self.settings.default_uploader,
+            file_size_bytes=file_size_bytes,
+            status=UploadStatus.UPLOADED,
+            carrier_name=request.carrier_name,
+            carrier_mode=request.carrier_mode,
+            origin=request.origin,
+            destination=request.destination
+        )
 
-            # Determine MIME type
-            mime_type = self._get_mime_type(file_name)
+    def _store_file(
+        self,
+        file_stream: BinaryIO,
+        file_size_bytes: int,
+        file_name: str,
+        folder_id: str,
+        mime_type: str,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, str]:
+        """
+        Upload file content unless identical content is already stored
 
-            # Upload file
-            upload_result = self.drive.upload_file(
-                file_content=file_content,
-                file_name=std_file_name,
+        Returns:
+            Dict with file_id and drive_url
+        """
+        if not self.settings.dedup_enabled:
+            return self.storage.upload_stream(
+                stream=file_stream,
+                file_name=file_name,
                 folder_id=folder_id,
-                mime_type=mime_type
+                mime_type=mime_type,
+                progress_callback=progress_callback
             )
 
-            # Create metadata
-            metadata = DocumentMetadata(
-                shipment_id=shipment_id,
-                doc_type=doc_type,
-                file_name=std_file_name,
-                drive_file_id=upload_result['file_id'],
-                drive_url=upload_result['drive_url'],
-                drive_folder_id=folder_id,
-                uploader=uploader,
-                file_size_bytes=file_size_bytes,
-                status=UploadStatus.UPLOADED,
-                carrier_name=carrier_name,
-                carrier_mode=carrier_mode,
-                origin=origin,
-                destination=destination
-            )
+        with self.metrics.span('document.hash'):
+            sha256, md5 = compute_content_hashes(file_stream)
 
-            # Log to Dashboard sheet
-            self.sheets.append_upload_log(metadata)
+        existing = self._find_duplicate(sha256, md5)
+        self.metrics.inc('dedup_hits' if existing else 'dedup_misses')
+        if existing:
+            logger.info(f"Duplicate content for {file_name}, linking file {existing['file_id']}")
+            if existing['folder_id'] != folder_id:
+                self.storage.create_shortcut(existing['file_id'], file_name, folder_id)
+            if progress_callback:
+                progress_callback(file_size_bytes, file_size_bytes)
+            return {
+                'file_id': existing['file_id'],
+                'drive_url': existing['drive_url']
+            }
 
-            logger.info(f"Document uploaded successfully: {shipment_id}/{doc_type}")
+        upload_result = self.storage.upload_stream(
+            stream=file_stream,
+            file_name=file_name,
+            folder_id=folder_id,
+            mime_type=mime_type,
+            session_key=f"{folder_id}/{sha256}",
+            progress_callback=progress_callback,
+            app_properties={'sha256': sha256}
+        )
+        self.dedup_index.add(
+            file_id=upload_result['file_id'],
+            drive_url=upload_result['drive_url'],
+            folder_id=folder_id,
+            size=file_size_bytes,
+            md5=md5,
+            sha256=sha256
+        )
+        return upload_result
 
-            return UploadResult(
-                success=True,
-                message=f"File uploaded successfully: {std_file_name}",
-                metadata=metadata
-            )
+    def _find_duplicate(self, sha256: str, md5: str) -> Optional[Dict[str, Any]]:
+        """Look up identical content, dropping index entries whose file is gone"""
+        existing = self.dedup_index.lookup(sha256, md5)
+        if existing is None:
+            return None
 
-        except Exception as e:
-            logger.error(f"Document upload failed: {e}")
-            return UploadResult(
-                success=False,
-                message="Upload failed",
-                error=str(e)
-            )
+        stored_file = self.storage.get_file(existing['file_id'])
+        if stored_file is None or stored_file.get('trashed'):
+            self.dedup_index.remove_file(existing['file_id'])
+            return None
+        return existing
+
+    def rebuild_dedup_index(self) -> int:
+        """
+        Rebuild the content hash index from the storage backend's file hashes
+
+        Returns:
+            Number of indexed files
+        """
+        return self.dedup_index.rebuild(self.storage.list_hashed_files())
+
+    @staticmethod
+    def _uploaded(metadata: DocumentMetadata) -> UploadResult:
+        """Build successful UploadResult"""
+        return UploadResult(
+            success=True,
+            message=f"File uploaded successfully: {metadata.file_name}",
+            metadata=metadata
+        )
+
+    def _failure(self, request: UploadRequest, error: Exception) -> UploadResult:
+        """Build failed UploadResult"""
+        logger.error(f"Document upload failed: {request.file_name}: {error}")
+        return UploadResult(
+            success=False,
+            message="Upload failed",
+            error=str(error)
+        )
 
     def _get_mime_type(self, file_name: str) -> str:
         """Determine MIME type from file extension"""
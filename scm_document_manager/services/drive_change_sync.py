@@ -0,0 +1,289 @@
+"""
+Incremental Drive sync via the changes feed
+
+After one full folder listing, the folder index, folder cache and content
+hash index are kept current by polling changes.list from a stored page
+token. Folders and files created, moved or trashed elsewhere (by hand or
+by other tools) arrive as deltas, so a poll costs one list call per page of
+changes instead of a re-listing of the whole archive. The page token and
+folder index are saved under the local cache directory, so restarts resume
+from the last token as well.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, TYPE_CHECKING
+from googleapiclient.errors import HttpError
+from config.settings import get_settings
+from config.logging_config import get_logger
+from core.exceptions import DriveAPIError
+from .dedup_index import ContentHashIndex, get_content_hash_index
+from .drive_folder_index import DriveFolderIndex
+from .folder_cache import FolderCache
+
+if TYPE_CHECKING:
+    from .drive_service import DriveService
+
+logger = get_logger(__name__)
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+
+def _is_invalid_token(error: Exception) -> bool:
+    """Check whether a changes.list failure means the page token is unusable"""
+    cause = error.__cause__ or error.__context__
+    return isinstance(cause, HttpError) and cause.resp.status in (400, 404, 410)
+
+
+class DriveChangeSync:
+    """Applies Drive changes feed deltas to the local folder and file indexes"""
+
+    def __init__(
+        self,
+        state_file: Optional[str] = None,
+        poll_interval_seconds: int = 60,
+        hash_index: Optional[ContentHashIndex] = None
+    ):
+        """
+        Initialize change sync
+
+        Args:
+            state_file: JSON file for the page token and folder index
+                (None for memory only)
+            poll_interval_seconds: Minimum seconds between changes.list polls
+            hash_index: Content hash index to update (default: process-wide index)
+        """
+        self.state_file = state_file
+        self.poll_interval_seconds = poll_interval_seconds
+        self.hash_index = hash_index if hash_index is not None else get_content_hash_index()
+        self.folder_index: Optional[DriveFolderIndex] = None
+        self.page_token: Optional[str] = None
+        self._last_polled = float('-inf')
+        self._lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._load()
+
+    def get_folder_index(self, drive: "DriveService") -> DriveFolderIndex:
+        """
+        Get the folder index, building it on first use and syncing it if due
+
+        Args:
+            drive: Drive service used for listing and polling
+        """
+        self.sync(drive)
+        return self.folder_index
+
+    def sync(self, drive: "DriveService", force: bool = False) -> int:
+        """
+        Bring the indexes up to date
+
+        Builds the folder index from a full listing when there is no saved
+        state for the current root folder (or the saved token was rejected);
+        otherwise applies the changes since the saved page token.
+
+        Args:
+            drive: Drive service used for listing and polling
+            force: Poll even if the poll interval has not elapsed
+
+        Returns:
+            Number of changes applied (0 after a full build)
+        """
+        with self._lock:
+            root_id = drive.settings.google_drive_root_folder_id
+            if self.folder_index is None or self.folder_index.root_folder_id != root_id:
+                self._full_build(drive, root_id)
+                return 0
+
+            if not force and time.monotonic() - self._last_polled < self.poll_interval_seconds:
+                return 0
+
+            try:
+                applied = self._apply_changes(drive)
+            except DriveAPIError as e:
+                if not _is_invalid_token(e):
+                    raise
+                logger.warning(f"Drive changes page token rejected, rebuilding folder index: {e}")
+                self._full_build(drive, root_id)
+                return 0
+            self._last_polled = time.monotonic()
+            return applied
+
+    def sync_in_background(self, drive: "DriveService") -> bool:
+        """
+        Start a sync in a background thread if a poll is due
+
+        Returns:
+            True if a background run was started
+        """
+        with self._thread_lock:
+            if time.monotonic() - self._last_polled < self.poll_interval_seconds:
+                return False
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(drive,),
+                name="drive-change-sync",
+                daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def _run(self, drive: "DriveService") -> None:
+        try:
+            self.sync(drive)
+        except Exception as e:
+            logger.warning(f"Drive change sync failed: {e}")
+
+    def _full_build(self, drive: "DriveService", root_id: str) -> None:
+        """Build the folder index from a full listing (caller holds _lock)"""
+        # Token first, so changes made during the listing are replayed later
+        page_token = drive.get_start_page_token()
+        index = DriveFolderIndex(root_id)
+        index.build(drive)
+        index.seed_cache(drive.folder_cache)
+        self.folder_index = index
+        self.page_token = page_token
+        self._last_polled = time.monotonic()
+        self._save()
+
+    def _apply_changes(self, drive: "DriveService") -> int:
+        """Apply every change since page_token (caller holds _lock)"""
+        started = time.monotonic()
+        applied = 0
+        page_token = self.page_token
+        while True:
+            response = drive.list_changes(page_token)
+            for change in response.get('changes', []):
+                self._apply_change(change, drive.folder_cache)
+                applied += 1
+            if response.get('newStartPageToken'):
+                page_token = response['newStartPageToken']
+                break
+            page_token = response['nextPageToken']
+
+        if applied or page_token != self.page_token:
+            self.page_token = page_token
+            self.hash_index.save()
+            self._save()
+        if applied:
+            logger.info(f"Drive changes applied: {applied} in {time.monotonic() - started:.1f}s")
+        return applied
+
+    def _apply_change(self, change: Dict[str, Any], folder_cache: FolderCache) -> None:
+        """Apply one changes.list entry to the folder index, folder cache and hash index"""
+        file_id = change['fileId']
+        file = change.get('file') or {}
+        index = self.folder_index
+
+        if change.get('removed') or file.get('trashed'):
+            if file_id in index:
+                index.remove(file_id)
+                folder_cache.invalidate_folder_id(file_id)
+                # Files in the folder are no longer under the root
+                self.hash_index.remove_unless(index.is_under_root, persist=False)
+            self.hash_index.remove_file(file_id, persist=False)
+            return
+
+        parent_id = (file.get('parents') or [None])[0]
+
+        if file.get('mimeType') == FOLDER_MIME_TYPE:
+            old_path = index.path_of(file_id) if file_id in index else None
+            index.add(file_id, file['name'], parent_id)
+            new_path = index.path_of(file_id)
+            if old_path is not None and old_path != new_path:
+                # Moved or renamed: cached paths under the old location are stale
+                folder_cache.invalidate_folder_id(file_id)
+            if new_path is None:
+                if old_path is not None:
+                    # Moved out of the root tree, taking its files along
+                    self.hash_index.remove_unless(index.is_under_root, persist=False)
+                return
+            entries = {FolderCache.make_key(index.root_folder_id, new_path): file_id}
+            if old_path is not None and old_path != new_path:
+                entries.update(
+                    (FolderCache.make_key(index.root_folder_id, path), folder_id)
+                    for path, folder_id in index.paths()
+                    if path.startswith(new_path + '/')
+                )
+            folder_cache.set_many(entries)
+            return
+
+        if not index.is_under_root(parent_id):
+            # Not (or no longer) in the managed tree: never a dedup target
+            self.hash_index.remove_file(file_id, persist=False)
+            return
+
+        md5 = file.get('md5Checksum')
+        sha256 = (file.get('appProperties') or {}).get('sha256')
+        if md5 or sha256:
+            self.hash_index.add(
+                file_id=file_id,
+                drive_url=file.get('webViewLink'),
+                folder_id=parent_id,
+                size=int(file.get('size', 0)),
+                md5=md5,
+                sha256=sha256,
+                persist=False
+            )
+
+    def _load(self) -> None:
+        """Restore page token and folder index from disk"""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.folder_index = DriveFolderIndex.from_dict(data['folder_index'])
+            self.page_token = data['page_token']
+            logger.info(f"Drive sync state loaded: {len(self.folder_index)} folders")
+        except Exception as e:
+            logger.warning(f"Failed to load Drive sync state {self.state_file}: {e}")
+            self.folder_index = None
+            self.page_token = None
+
+    def _save(self) -> None:
+        """Write page token and folder index to disk atomically"""
+        if not self.state_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {'page_token': self.page_token, 'folder_index': self.folder_index.to_dict()},
+                    f,
+                    ensure_ascii=False
+                )
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            logger.warning(f"Failed to save Drive sync state {self.state_file}: {e}")
+
+
+_change_sync: Optional[DriveChangeSync] = None
+_change_sync_lock = threading.Lock()
+
+
+def get_drive_change_sync() -> DriveChangeSync:
+    """Get process-wide Drive change sync"""
+    global _change_sync
+    with _change_sync_lock:
+        if _change_sync is None:
+            settings = get_settings()
+            _change_sync = DriveChangeSync(
+                state_file=os.path.join(settings.cache_dir, 'drive_sync_state.json'),
+                poll_interval_seconds=settings.drive_changes_poll_interval_seconds
+            )
+        return _change_sync
+
+
+def get_drive_folder_index(drive: "DriveService") -> DriveFolderIndex:
+    """
+    Get process-wide folder index, kept current from the changes feed
+
+    Args:
+        drive: Drive service used for the initial listing and polling
+    """
+    return get_drive_change_sync().get_folder_index(drive)
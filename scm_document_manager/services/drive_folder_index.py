@@ -0,0 +1,197 @@
+"""
+In-memory index of the Drive folder tree under the root folder
+
+Built from a paginated listing of every folder (1000 per page, id/name/parents
+only), so a cold start over thousands of shipment folders costs a few list
+calls instead of one find_folder lookup per path segment. Paths resolve by
+walking parent → child-name maps from the root folder. After the first build
+the index is kept current from the Drive changes feed (see drive_change_sync).
+"""
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple, TYPE_CHECKING
+from config.logging_config import get_logger
+from .folder_cache import FolderCache
+
+if TYPE_CHECKING:
+    from .drive_service import DriveService
+
+logger = get_logger(__name__)
+
+
+class DriveFolderIndex:
+    """Folder ID → (name, parent) tree with path lookup"""
+
+    def __init__(self, root_folder_id: str):
+        """
+        Initialize empty index
+
+        Args:
+            root_folder_id: Folder under which paths are resolved
+        """
+        self.root_folder_id = root_folder_id
+        self._folders: Dict[str, Tuple[str, Optional[str]]] = {}
+        self._children: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._folders)
+
+    def build(self, drive: "DriveService", page_size: int = 1000) -> int:
+        """
+        Replace index contents from a full folder listing
+
+        Args:
+            drive: Drive service used for listing
+            page_size: Folders per list request
+
+        Returns:
+            Number of folders under the root folder
+        """
+        started = time.monotonic()
+        folders: Dict[str, Tuple[str, Optional[str]]] = {}
+        for folder in drive.list_folders(page_size=page_size):
+            parents = folder.get('parents') or [None]
+            folders[folder['id']] = (folder['name'], parents[0])
+
+        with self._lock:
+            self._folders = {}
+            self._children = {}
+            # Listing is oldest first, so the oldest of same-named siblings wins
+            for folder_id, (name, parent_id) in folders.items():
+                self.add(folder_id, name, parent_id)
+            count = sum(1 for _ in self.paths())
+
+        logger.info(
+            f"Drive folder index built: {count} folders under root "
+            f"({len(folders)} listed) in {time.monotonic() - started:.1f}s"
+        )
+        return count
+
+    def get(self, folder_path: str) -> Optional[str]:
+        """
+        Resolve a path relative to the root folder
+
+        Args:
+            folder_path: Folder path (e.g., "01_KR_TO_3PL/TA717001250829/BL")
+
+        Returns:
+            Folder ID, or None if any segment is not in the index
+        """
+        path = folder_path.strip('/')
+        with self._lock:
+            folder_id = self.root_folder_id
+            for part in path.split('/') if path else []:
+                folder_id = self._children.get(folder_id, {}).get(part)
+                if folder_id is None:
+                    return None
+            return folder_id
+
+    def add(self, folder_id: str, name: str, parent_id: Optional[str]) -> None:
+        """Add or move a folder (an existing same-named sibling is kept)"""
+        with self._lock:
+            self.remove(folder_id)
+            self._folders[folder_id] = (name, parent_id)
+            if parent_id is not None:
+                self._children.setdefault(parent_id, {}).setdefault(name, folder_id)
+
+    def remove(self, folder_id: str) -> None:
+        """Remove a folder (its descendants become unreachable from the root)"""
+        with self._lock:
+            entry = self._folders.pop(folder_id, None)
+            if entry is None:
+                return
+            name, parent_id = entry
+            siblings = self._children.get(parent_id, {})
+            if siblings.get(name) == folder_id:
+                del siblings[name]
+                # Promote another folder with the same name, if any
+                for other_id, (other_name, other_parent) in self._folders.items():
+                    if other_parent == parent_id and other_name == name:
+                        siblings[name] = other_id
+                        break
+
+    def __contains__(self, folder_id: str) -> bool:
+        return folder_id in self._folders
+
+    def is_under_root(self, folder_id: Optional[str]) -> bool:
+        """Check whether a folder is the root folder or one of its descendants"""
+        with self._lock:
+            for _ in range(len(self._folders) + 1):
+                if folder_id == self.root_folder_id:
+                    return True
+                entry = self._folders.get(folder_id)
+                if entry is None:
+                    return False
+                folder_id = entry[1]
+            return False
+
+    def path_of(self, folder_id: str) -> Optional[str]:
+        """
+        Get the path of a folder relative to the root
+
+        Returns:
+            Path, or None if the folder is not reachable from the root
+        """
+        with self._lock:
+            parts = []
+            current = folder_id
+            while current != self.root_folder_id:
+                entry = self._folders.get(current)
+                if entry is None or len(parts) > len(self._folders):
+                    return None
+                name, parent_id = entry
+                if self._children.get(parent_id, {}).get(name) != current:
+                    # Shadowed by an older same-named sibling
+                    return None
+                parts.append(name)
+                current = parent_id
+            return '/'.join(reversed(parts))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize folders for persistence"""
+        with self._lock:
+            return {
+                'root_folder_id': self.root_folder_id,
+                'folders': {fid: [name, parent] for fid, (name, parent) in self._folders.items()}
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DriveFolderIndex":
+        """Restore an index saved with to_dict"""
+        index = cls(data['root_folder_id'])
+        for folder_id, (name, parent_id) in data['folders'].items():
+            index.add(folder_id, name, parent_id)
+        return index
+
+    def paths(self) -> Iterator[Tuple[str, str]]:
+        """
+        Iterate over every folder reachable from the root
+
+        Yields:
+            (path relative to the root, folder ID)
+        """
+        found = []
+        with self._lock:
+            stack = [('', self.root_folder_id)]
+            while stack:
+                path, folder_id = stack.pop()
+                for name, child_id in self._children.get(folder_id, {}).items():
+                    child_path = f"{path}/{name}" if path else name
+                    found.append((child_path, child_id))
+                    stack.append((child_path, child_id))
+        return iter(found)
+
+    def seed_cache(self, folder_cache: FolderCache) -> int:
+        """
+        Copy every indexed path into the folder cache
+
+        Returns:
+            Number of cached paths
+        """
+        entries = {
+            FolderCache.make_key(self.root_folder_id, path): folder_id
+            for path, folder_id in self.paths()
+        }
+        folder_cache.set_many(entries)
+        return len(entries)
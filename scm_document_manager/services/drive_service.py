@@ -1,40 +1,133 @@
 """
 Google Drive API service
 """
-from typing import Optional, Dict, Any
-from io import BytesIO
-from googleapiclient.discovery import build
+import json
+import threading
+from typing import Optional, Dict, Any, BinaryIO, Callable, Iterator, Tuple
+from io import BytesIO, SEEK_END
+from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaIoBaseUpload
-from google.oauth2 import service_account
-from core.exceptions import DriveAPIError, FolderCreationError, FileUploadError
+from core.exceptions import (
+    DriveAPIError,
+    FolderCreationError,
+    FileUploadError,
+    FolderNotFoundError
+)
+from core.enums import RequestPriority
 from config.settings import get_settings
 from config.logging_config import get_logger
-from utils.retry import retry_on_api_error
+from utils.retry import classify_error, retry_on_api_error
+from .client_registry import get_client_registry
+from .dedup_index import compute_content_hashes
+from .drive_change_sync import get_drive_folder_index
+from .folder_cache import FolderCache, get_folder_cache
+from .metrics import get_metrics
+from .request_scheduler import get_request_scheduler, scheduled
+from .storage_backend import StorageBackend
+from .upload_session_store import get_upload_session_store
 
 logger = get_logger(__name__)
 
-SCOPES = ['https://www.googleapis.com/auth/drive']
-
-
-class DriveService:
+# (parent folder ID, name) → lock held while that folder is found or created,
+# so concurrent resolutions of a shared parent create it only once
+_folder_locks: Dict[Tuple[str, str], threading.Lock] = {}
+_folder_locks_lock = threading.Lock()
+
+
+def _folder_lock(parent_id: str, name: str) -> threading.Lock:
+    with _folder_locks_lock:
+        return _folder_locks.setdefault((parent_id, name), threading.Lock())
+
+
+def _is_not_found(error: Exception) -> bool:
+    """Check whether a Drive API error is a 404"""
+    return isinstance(error, HttpError) and error.resp.status == 404
+
+
+def _query_session_offset(
+    http,
+    resumable_uri: str,
+    total_bytes: int
+) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """
+    Ask Drive how many bytes of a resumable upload session it has received
+
+    Args:
+        http: Authorized http of the upload request
+        resumable_uri: Saved session URI
+        total_bytes: Upload size
+
+    Returns:
+        (confirmed byte offset, created file if the upload already completed)
+
+    Raises:
+        HttpError: If the session is gone (404/410) or the query fails
+    """
+    response, content = http.request(
+        resumable_uri,
+        method='PUT',
+        headers={'Content-Length': '0', 'Content-Range': f"bytes */{total_bytes}"}
+    )
+    if response.status == 308:
+        # Range is "bytes=0-<last byte>", absent if nothing was received
+        received = response.get('range')
+        return (int(received.rsplit('-', 1)[1]) + 1 if received else 0), None
+    if response.status in (200, 201):
+        return total_bytes, json.loads(content)
+    raise HttpError(response, content, uri=resumable_uri)
+
+
+def _is_missing_or_denied(error: Exception) -> bool:
+    """Check whether a Drive API error means the file is gone or not shared (404 / non-quota 403)"""
+    return (
+        isinstance(error, HttpError)
+        and error.resp.status in (403, 404)
+        and classify_error(error) is None
+    )
+
+
+class DriveService(StorageBackend):
     """Google Drive API wrapper"""
 
-    def __init__(self):
-        """Initialize Drive service"""
+    def __init__(
+        self,
+        folder_cache: Optional[FolderCache] = None,
+        service: Optional[Any] = None
+    ):
+        """
+        Initialize Drive service
+
+        Args:
+            folder_cache: Folder ID cache (default: process-wide cache)
+            service: Pre-built Drive API resource shared by all threads (optional)
+        """
         try:
             settings = get_settings()
-            credentials = service_account.Credentials.from_service_account_info(
-                settings.google_credentials,
-                scopes=SCOPES
-            )
-            self.service = build('drive', 'v3', credentials=credentials)
             self.settings = settings
+            self.folder_cache = folder_cache or get_folder_cache()
+            self.upload_sessions = get_upload_session_store()
+            self._shared_service = service
+            if service is None:
+                self._clients = get_client_registry()
+                self._clients.drive()
             logger.info("Drive service initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Drive service: {e}")
             raise DriveAPIError(f"Drive service initialization failed: {e}")
 
-    @retry_on_api_error(max_attempts=3)
+    @property
+    def service(self):
+        """
+        Drive API resource for the current thread
+
+        The underlying httplib2 transport is not thread-safe, so each worker
+        thread gets its own client from the process-wide registry, shared by
+        every DriveService (and session) on that thread.
+        """
+        if self._shared_service is not None:
+            return self._shared_service
+        return self._clients.drive()
+
     def create_folder(
         self,
         folder_name: str,
@@ -43,6 +136,10 @@ class DriveService:
         """
         Create a folder in Google Drive
 
+        A create that fails with a transient error may still have gone
+        through on Drive's side, so before each retry the folder is looked
+        up again and reused if it now exists.
+
         Args:
             folder_name: Folder name
             parent_folder_id: Parent folder ID (None for root)
@@ -51,8 +148,27 @@ class DriveService:
             Folder ID
 
         Raises:
+            FolderNotFoundError: If the parent folder no longer exists
             FolderCreationError: If folder creation fails
         """
+        attempted = False
+
+        @retry_on_api_error(max_attempts=3, endpoint='drive')
+        def attempt() -> str:
+            nonlocal attempted
+            if attempted:
+                folder_id = self.find_folder(folder_name, parent_folder_id)
+                if folder_id:
+                    logger.info(f"Folder {folder_name} was created by the failed attempt (ID: {folder_id})")
+                    return folder_id
+            attempted = True
+            return self._insert_folder(folder_name, parent_folder_id)
+
+        return attempt()
+
+    @scheduled('drive', RequestPriority.UPLOAD)
+    def _insert_folder(self, folder_name: str, parent_folder_id: Optional[str]) -> str:
+        """Single files.create call for a folder (not retried)"""
         try:
             file_metadata = {
                 'name': folder_name,
@@ -72,10 +188,14 @@ class DriveService:
             return folder_id
 
         except Exception as e:
+            if parent_folder_id and _is_not_found(e):
+                self.folder_cache.invalidate_folder_id(parent_folder_id)
+                raise FolderNotFoundError(f"Parent folder not found: {parent_folder_id}")
             logger.error(f"Folder creation failed: {folder_name}, error: {e}")
             raise FolderCreationError(f"Failed to create folder {folder_name}: {e}")
 
-    @retry_on_api_error(max_attempts=3)
+    @retry_on_api_error(max_attempts=3, endpoint='drive')
+    @scheduled('drive', RequestPriority.UPLOAD)
     def find_folder(
         self,
         folder_name: str,
@@ -89,7 +209,11 @@ class DriveService:
             parent_folder_id: Parent folder ID
 
         Returns:
-            Folder ID if found, None otherwise
+            Folder ID if found, None if the lookup found nothing (or the
+            parent is gone / not shared)
+
+        Raises:
+            DriveAPIError: If the lookup itself failed (retried when transient)
         """
         try:
             query = f"name='{folder_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
@@ -109,10 +233,16 @@ class DriveService:
             return None
 
         except Exception as e:
-            logger.warning(f"Folder search failed: {folder_name}, error: {e}")
-            return None
-
-    @retry_on_api_error(max_attempts=3)
+            if _is_missing_or_denied(e):
+                logger.warning(f"Folder search failed: {folder_name}, error: {e}")
+                return None
+            # Transient and unknown failures must not read as "missing": the
+            # caller would create a duplicate folder
+            logger.error(f"Folder search failed: {folder_name}, error: {e}")
+            raise DriveAPIError(f"Failed to search folder {folder_name}: {e}") from e
+
+    @retry_on_api_error(max_attempts=3, endpoint='drive')
+    @scheduled('drive', RequestPriority.UPLOAD)
     def verify_folder_access(self, folder_id: str) -> bool:
         """
         Verify that we have access to a folder
@@ -121,7 +251,10 @@ class DriveService:
             folder_id: Folder ID to verify
 
         Returns:
-            True if accessible, False otherwise
+            True if accessible, False if the folder is gone or not shared
+
+        Raises:
+            DriveAPIError: If the check itself failed (retried when transient)
         """
         try:
             self.service.files().get(
@@ -131,8 +264,11 @@ class DriveService:
             logger.info(f"Folder access verified: {folder_id}")
             return True
         except Exception as e:
-            logger.error(f"Cannot access folder {folder_id}: {e}")
-            return False
+            if _is_missing_or_denied(e):
+                logger.error(f"Cannot access folder {folder_id}: {e}")
+                return False
+            logger.error(f"Folder access check failed: {folder_id}, error: {e}")
+            raise DriveAPIError(f"Failed to verify folder {folder_id}: {e}") from e
 
     def ensure_folder_path(
         self,
@@ -142,6 +278,9 @@ class DriveService:
         """
         Ensure folder path exists, creating folders as needed
 
+        Resolved paths are served from the folder cache, so a known path
+        costs no API calls. Only the uncached suffix of a path is looked up.
+
         Args:
             folder_path: Folder path (e.g., "01_KR_TO_3PL/TA717001250829/BL")
             root_folder_id: Root folder ID
@@ -149,31 +288,85 @@ class DriveService:
         Returns:
             Final folder ID
         """
-        parts = folder_path.strip('/').split('/')
-        current_parent_id = root_folder_id or self.settings.google_drive_root_folder_id
-
-        # Verify root folder access first
-        if not self.verify_folder_access(current_parent_id):
-            raise DriveAPIError(
-                f"Cannot access root folder (ID: {current_parent_id}). "
-                f"Please ensure the folder exists and is shared with the service account: "
-                f"{self.settings.google_credentials.get('client_email', 'N/A')}"
-            )
-
-        for part in parts:
-            # Try to find existing folder
-            folder_id = self.find_folder(part, current_parent_id)
+        root_id = root_folder_id or self.settings.google_drive_root_folder_id
+        path = folder_path.strip('/')
 
-            if not folder_id:
-                # Create folder if it doesn't exist
-                folder_id = self.create_folder(part, current_parent_id)
+        cached_id = self.folder_cache.get(FolderCache.make_key(root_id, path))
+        if cached_id:
+            logger.info(f"Folder path cache hit: {folder_path} (ID: {cached_id})")
+            return cached_id
 
+        try:
+            return self._resolve_folder_path(path, root_id, use_cache=True)
+        except FolderNotFoundError:
+            # A cached ancestor was deleted in Drive; resolve again from the root
+            logger.warning(f"Stale cached folder in path {folder_path}, resolving from root")
+            return self._resolve_folder_path(path, root_id, use_cache=False)
+
+    def _resolve_folder_path(self, path: str, root_id: str, use_cache: bool) -> str:
+        """Walk path segments from the deepest cached ancestor"""
+        parts = path.split('/')
+        current_parent_id = root_id
+        start = 0
+
+        if use_cache:
+            for depth in range(len(parts) - 1, 0, -1):
+                cached_id = self.folder_cache.get(
+                    FolderCache.make_key(root_id, '/'.join(parts[:depth]))
+                )
+                if cached_id:
+                    current_parent_id = cached_id
+                    start = depth
+                    break
+
+        if start == 0:
+            self.verify_root_folder(root_id)
+
+        for depth in range(start, len(parts)):
+            part = parts[depth]
+            key = FolderCache.make_key(root_id, '/'.join(parts[:depth + 1]))
+
+            with _folder_lock(current_parent_id, part):
+                # Resolved by another thread while this one waited
+                folder_id = self.folder_cache.get(key) if use_cache else None
+
+                if not folder_id:
+                    # Try to find existing folder
+                    folder_id = self.find_folder(part, current_parent_id)
+
+                if not folder_id:
+                    # Create folder if it doesn't exist
+                    folder_id = self.create_folder(part, current_parent_id)
+
+                self.folder_cache.set(key, folder_id)
             current_parent_id = folder_id
 
-        logger.info(f"Folder path ensured: {folder_path} (ID: {current_parent_id})")
+        logger.info(f"Folder path ensured: {path} (ID: {current_parent_id})")
         return current_parent_id
 
-    @retry_on_api_error(max_attempts=3)
+    def verify_root_folder(self, root_id: str) -> None:
+        """
+        Verify root folder access (cached like any other folder)
+
+        Args:
+            root_id: Root folder ID
+
+        Raises:
+            DriveAPIError: If the folder does not exist or is not shared
+                with the service account
+        """
+        root_key = FolderCache.make_key(root_id, '')
+        if self.folder_cache.get(root_key):
+            return
+
+        if not self.verify_folder_access(root_id):
+            raise DriveAPIError(
+                f"Cannot access root folder (ID: {root_id}). "
+                f"Please ensure the folder exists and is shared with the service account: "
+                f"{self.settings.google_credentials.get('client_email', 'N/A')}"
+            )
+        self.folder_cache.set(root_key, root_id)
+
     def upload_file(
         self,
         file_content: bytes,
@@ -194,25 +387,114 @@ class DriveService:
             Dict with file_id and drive_url
 
         Raises:
+            FolderNotFoundError: If the destination folder no longer exists
             FileUploadError: If upload fails
         """
-        try:
-            file_metadata = {
-                'name': file_name,
-                'parents': [folder_id]
-            }
+        return self.upload_stream(BytesIO(file_content), file_name, folder_id, mime_type)
+
+    @retry_on_api_error(max_attempts=3, endpoint='drive')
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        file_name: str,
+        folder_id: str,
+        mime_type: str = 'application/pdf',
+        session_key: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        app_properties: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Upload a seekable stream to Google Drive in resumable chunks
+
+        The resumable session URI and last confirmed offset are saved after
+        every chunk. A retry (or a later call with the same session_key,
+        e.g. after a restart) resumes from that offset.
 
+        Args:
+            stream: Seekable binary file-like object
+            file_name: File name
+            folder_id: Destination folder ID
+            mime_type: MIME type
+            session_key: Key identifying this upload across retries/restarts
+                (default: folder ID + content SHA-256)
+            chunk_size: Chunk size in bytes (multiple of 256KB,
+                default: settings.upload_chunk_size_mb)
+            progress_callback: Called with (bytes_sent, total_bytes) after each chunk
+            app_properties: Drive appProperties to set on the file (e.g. sha256)
+
+        Returns:
+            Dict with file_id and drive_url
+
+        Raises:
+            FolderNotFoundError: If the destination folder no longer exists
+            FileUploadError: If upload fails
+        """
+        total_bytes = stream.seek(0, SEEK_END)
+        stream.seek(0)
+        if session_key is None:
+            session_key = f"{folder_id}/{compute_content_hashes(stream)[0]}"
+        chunk_size = chunk_size or self.settings.upload_chunk_size_mb * 1024 * 1024
+
+        try:
             media = MediaIoBaseUpload(
-                BytesIO(file_content),
+                stream,
                 mimetype=mime_type,
+                chunksize=chunk_size,
                 resumable=True
             )
 
-            file = self.service.files().create(
+            file_metadata = {
+                'name': file_name,
+                'parents': [folder_id]
+            }
+            if app_properties:
+                file_metadata['appProperties'] = app_properties
+
+            request = self.service.files().create(
                 body=file_metadata,
                 media_body=media,
                 fields='id, name, webViewLink'
-            ).execute()
+            )
+
+            scheduler = get_request_scheduler()
+            metrics = get_metrics()
+            file = None
+
+            saved = self.upload_sessions.get(session_key)
+            if saved is not None:
+                try:
+                    scheduler.acquire('drive', RequestPriority.UPLOAD)
+                    offset, file = _query_session_offset(
+                        request.http, saved['resumable_uri'], total_bytes
+                    )
+                except HttpError as e:
+                    if e.resp.status not in (404, 410):
+                        raise
+                    # Session expired on Drive's side; start a new one
+                    logger.warning(f"Upload session expired for {file_name}, restarting")
+                    self.upload_sessions.remove(session_key)
+                else:
+                    request.resumable_uri = saved['resumable_uri']
+                    request.resumable_progress = offset
+                    logger.info(f"Resuming upload {file_name} from byte {offset}")
+
+            while file is None:
+                scheduler.acquire('drive', RequestPriority.UPLOAD)
+                sent_before = request.resumable_progress
+                with metrics.span('api.drive.upload_chunk'):
+                    status, file = request.next_chunk()
+                sent = status.resumable_progress if status else total_bytes
+                metrics.inc('drive_upload_bytes', sent - sent_before)
+
+                if status:
+                    self.upload_sessions.save(session_key, request.resumable_uri, status.resumable_progress)
+                    if progress_callback:
+                        progress_callback(status.resumable_progress, total_bytes)
+
+            self.upload_sessions.remove(session_key)
+            if progress_callback:
+                progress_callback(total_bytes, total_bytes)
 
             file_id = file.get('id')
             drive_url = file.get('webViewLink')
@@ -225,10 +507,206 @@ class DriveService:
             }
 
         except Exception as e:
+            if _is_not_found(e):
+                self.upload_sessions.remove(session_key)
+                self.folder_cache.invalidate_folder_id(folder_id)
+                raise FolderNotFoundError(f"Destination folder not found: {folder_id}")
             logger.error(f"File upload failed: {file_name}, error: {e}")
             raise FileUploadError(f"Failed to upload file {file_name}: {e}")
 
-    @retry_on_api_error(max_attempts=3)
+    @retry_on_api_error(max_attempts=3, endpoint='drive')
+    @scheduled('drive', RequestPriority.UPLOAD)
+    def get_file(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get file metadata
+
+        Args:
+            file_id: File ID
+
+        Returns:
+            Dict with id, trashed and webViewLink, or None if the file does not exist
+        """
+        try:
+            return self.service.files().get(
+                fileId=file_id,
+                fields='id, trashed, webViewLink'
+            ).execute()
+        except Exception as e:
+            if _is_not_found(e):
+                return None
+            logger.error(f"Failed to get file {file_id}: {e}")
+            raise DriveAPIError(f"Failed to get file {file_id}: {e}")
+
+    @retry_on_api_error(max_attempts=3, endpoint='drive')
+    @scheduled('drive', RequestPriority.UPLOAD)
+    def create_shortcut(
+        self,
+        target_file_id: str,
+        shortcut_name: str,
+        folder_id: str
+    ) -> Dict[str, Any]:
+        """
+        Create a Drive shortcut to an existing file
+
+        Args:
+            target_file_id: File the shortcut points to
+            shortcut_name: Shortcut name
+            folder_id: Folder to place the shortcut in
+
+        Returns:
+            Dict with shortcut_id and drive_url
+        """
+        try:
+            shortcut = self.service.files().create(
+                body={
+                    'name': shortcut_name,
+                    'mimeType': 'application/vnd.google-apps.shortcut',
+                    'shortcutDetails': {'targetId': target_file_id},
+                    'parents': [folder_id]
+                },
+                fields='id, webViewLink'
+            ).execute()
+
+            logger.info(f"Shortcut created: {shortcut_name} → {target_file_id}")
+
+            return {
+                'shortcut_id': shortcut.get('id'),
+                'drive_url': shortcut.get('webViewLink')
+            }
+
+        except Exception as e:
+            if _is_not_found(e):
+                self.folder_cache.invalidate_folder_id(folder_id)
+                raise FolderNotFoundError(f"Destination folder not found: {folder_id}")
+            logger.error(f"Shortcut creation failed: {shortcut_name}, error: {e}")
+            raise DriveAPIError(f"Failed to create shortcut {shortcut_name}: {e}")
+
+    def list_hashed_files(self, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        List non-folder files under the root folder with their content hashes
+
+        Drive queries cannot filter by ancestor, so every visible file is
+        listed and files outside the root tree are dropped using the folder
+        index.
+
+        Args:
+            page_size: Files per list request
+
+        Yields:
+            File resources with id, webViewLink, parents, size, md5Checksum, appProperties
+        """
+        folder_index = get_drive_folder_index(self)
+        page_token = None
+        while True:
+            response = self._list_files_page(
+                query="trashed=false and mimeType!='application/vnd.google-apps.folder'",
+                fields='nextPageToken, files(id, webViewLink, parents, size, md5Checksum, appProperties)',
+                page_size=page_size,
+                page_token=page_token
+            )
+            for file in response.get('files', []):
+                if folder_index.is_under_root((file.get('parents') or [None])[0]):
+                    yield file
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return
+
+    def list_folders(self, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        List all folders visible to the service account, oldest first
+
+        Args:
+            page_size: Folders per list request
+
+        Yields:
+            Folder resources with id, name and parents
+        """
+        page_token = None
+        while True:
+            response = self._list_files_page(
+                query="trashed=false and mimeType='application/vnd.google-apps.folder'",
+                fields='nextPageToken, files(id, name, parents)',
+                page_size=page_size,
+                page_token=page_token,
+                order_by='createdTime'
+            )
+            yield from response.get('files', [])
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return
+
+    @retry_on_api_error(max_attempts=3, endpoint='drive')
+    @scheduled('drive', RequestPriority.BACKGROUND)
+    def get_start_page_token(self) -> str:
+        """Get the changes feed token for the current state of Drive"""
+        try:
+            response = self.service.changes().getStartPageToken().execute()
+            return response['startPageToken']
+        except Exception as e:
+            logger.error(f"Failed to get changes start page token: {e}")
+            raise DriveAPIError(f"Failed to get changes start page token: {e}")
+
+    @retry_on_api_error(max_attempts=3, endpoint='drive')
+    @scheduled('drive', RequestPriority.BACKGROUND)
+    def list_changes(self, page_token: str, page_size: int = 1000) -> Dict[str, Any]:
+        """
+        Fetch one page of the changes feed
+
+        Args:
+            page_token: Token from get_start_page_token or a previous page
+            page_size: Changes per request
+
+        Returns:
+            Response with changes and nextPageToken (more pages) or
+            newStartPageToken (caught up)
+
+        Raises:
+            DriveAPIError: If the request fails (HttpError kept as __context__)
+        """
+        try:
+            return self.service.changes().list(
+                pageToken=page_token,
+                pageSize=page_size,
+                spaces='drive',
+                includeRemoved=True,
+                fields=(
+                    'nextPageToken, newStartPageToken, changes(fileId, removed, '
+                    'file(id, name, mimeType, parents, trashed, webViewLink, size, md5Checksum, appProperties))'
+                )
+            ).execute()
+        except Exception as e:
+            logger.error(f"Failed to list Drive changes: {e}")
+            raise DriveAPIError(f"Failed to list Drive changes: {e}")
+
+    @retry_on_api_error(max_attempts=3, endpoint='drive')
+    @scheduled('drive', RequestPriority.BACKGROUND)
+    def _list_files_page(
+        self,
+        query: str,
+        fields: str,
+        page_size: int,
+        page_token: Optional[str] = None,
+        order_by: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Fetch one page of files.list results"""
+        try:
+            params = {}
+            if order_by:
+                params['orderBy'] = order_by
+            return self.service.files().list(
+                q=query,
+                spaces='drive',
+                fields=fields,
+                pageSize=page_size,
+                pageToken=page_token,
+                **params
+            ).execute()
+        except Exception as e:
+            logger.error(f"File listing failed: {e}")
+            raise DriveAPIError(f"Failed to list files: {e}")
+
+    @retry_on_api_error(max_attempts=3, endpoint='drive')
+    @scheduled('drive', RequestPriority.UPLOAD)
     def delete_file(self, file_id: str) -> None:
         """Delete file from Drive"""
         try:
@@ -0,0 +1,226 @@
+"""
+Folder path → Drive folder ID cache
+
+Kept in process memory (shared by every DriveService instance) and mirrored
+to a JSON file under the local cache directory so it survives restarts.
+Changes only mark the cache dirty; the file is rewritten at most once per
+flush interval and at exit, so a burst of folder resolutions costs one
+write instead of one per folder.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from config.settings import get_settings
+from config.logging_config import get_logger
+from .metrics import get_metrics
+
+logger = get_logger(__name__)
+
+
+class FolderCache:
+    """TTL + LRU cache of folder path → folder ID"""
+
+    def __init__(
+        self,
+        cache_file: Optional[str] = None,
+        ttl_seconds: int = 86400,
+        max_entries: int = 5000,
+        flush_interval_seconds: float = 5.0
+    ):
+        """
+        Initialize folder cache
+
+        Args:
+            cache_file: JSON file used for persistence (None for memory only)
+            ttl_seconds: Entry lifetime in seconds
+            max_entries: Maximum number of entries before LRU eviction
+            flush_interval_seconds: Maximum delay before changes are written
+                to cache_file
+        """
+        self.cache_file = cache_file
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.flush_interval_seconds = flush_interval_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        self._load()
+        if self.cache_file:
+            atexit.register(self.flush)
+
+    @staticmethod
+    def make_key(root_folder_id: str, folder_path: str) -> str:
+        """Build cache key for a folder path under a root folder"""
+        return f"{root_folder_id}/{folder_path.strip('/')}"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get cached folder ID
+
+        Args:
+            key: Cache key (see make_key)
+
+        Returns:
+            Folder ID if cached and not expired, None otherwise
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            folder_id, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return folder_id
+
+    def set(self, key: str, folder_id: str) -> None:
+        """Store folder ID for key"""
+        with self._lock:
+            self._entries[key] = (folder_id, time.time() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._mark_dirty()
+
+    def set_many(self, entries: Dict[str, str]) -> None:
+        """Store several key → folder ID entries"""
+        if not entries:
+            return
+        with self._lock:
+            expires_at = time.time() + self.ttl_seconds
+            for key, folder_id in entries.items():
+                self._entries[key] = (folder_id, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._mark_dirty()
+
+    def invalidate(self, key: str) -> None:
+        """Remove key and every cached descendant path"""
+        with self._lock:
+            prefix = key.rstrip('/') + '/'
+            stale = [k for k in self._entries if k == key or k.startswith(prefix)]
+            self._remove(stale)
+
+    def invalidate_folder_id(self, folder_id: str) -> None:
+        """Remove every entry resolving to folder_id, plus their descendants"""
+        with self._lock:
+            prefixes = [k.rstrip('/') + '/' for k, (fid, _) in self._entries.items() if fid == folder_id]
+            stale = [
+                k for k, (fid, _) in self._entries.items()
+                if fid == folder_id or any(k.startswith(p) for p in prefixes)
+            ]
+            self._remove(stale)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._mark_dirty()
+
+    def flush(self) -> None:
+        """Write entries to cache_file now if they changed since the last write"""
+        if not self.cache_file:
+            return
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                entries = dict(self._entries)
+                self._dirty = False
+            if not self._save(entries):
+                with self._lock:
+                    self._mark_dirty()
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _remove(self, keys) -> None:
+        if not keys:
+            return
+        for key in keys:
+            self._entries.pop(key, None)
+        logger.info(f"Folder cache invalidated {len(keys)} entries")
+        self._mark_dirty()
+
+    def _mark_dirty(self) -> None:
+        """Schedule a write of the entries (call with the lock held)"""
+        if not self.cache_file:
+            return
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval_seconds, self.flush)
+            self._timer.name = "folder-cache-flush"
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _load(self) -> None:
+        """Load non-expired entries from disk"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            now = time.time()
+            for key, (folder_id, expires_at) in data.items():
+                if expires_at >= now:
+                    self._entries[key] = (folder_id, expires_at)
+            logger.info(f"Folder cache loaded: {len(self._entries)} entries")
+        except Exception as e:
+            logger.warning(f"Failed to load folder cache {self.cache_file}: {e}")
+
+    def _save(self, entries: Dict[str, Tuple[str, float]]) -> bool:
+        """Write entries to disk atomically; False if the write failed"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_file, self.cache_file)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to save folder cache {self.cache_file}: {e}")
+            return False
+
+
+_folder_cache: Optional[FolderCache] = None
+_folder_cache_lock = threading.Lock()
+
+
+def get_folder_cache() -> FolderCache:
+    """Get process-wide folder cache"""
+    global _folder_cache
+    with _folder_cache_lock:
+        if _folder_cache is None:
+            settings = get_settings()
+            _folder_cache = FolderCache(
+                cache_file=os.path.join(settings.cache_dir, 'folder_cache.json'),
+                ttl_seconds=settings.folder_cache_ttl_seconds,
+                max_entries=settings.folder_cache_max_entries,
+                flush_interval_seconds=settings.folder_cache_flush_interval_seconds
+            )
+            get_metrics().register_collector('folder_cache', _folder_cache.stats)
+        return _folder_cache
@@ -0,0 +1,375 @@
+"""
+Folder pre-warming for active shipments
+
+Computes every folder an active shipment of a snapshot can upload to
+(category / invoice / doc type, settlement documents included) and resolves
+them with Drive batch HTTP requests, one tree level at a time:
+    - the shipment folder (category / invoice) is created when missing
+    - document type folders, and the settlement tree, are only looked up,
+      so no shipment gets a set of empty folders
+Results go into the folder cache. An upload to a shipment then skips the
+lookups for folders that already exist; the first upload of a document
+type still creates its folder.
+"""
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
+from googleapiclient.errors import HttpError
+from core.enums import DocType, RequestPriority
+from core.models import ShipmentInfo
+from config.settings import get_settings
+from config.logging_config import get_logger
+from utils.folder_utils import build_folder_path, build_shipment_folder_path, determine_shipment_category
+from .drive_change_sync import get_drive_folder_index
+from .drive_folder_index import DriveFolderIndex
+from .folder_cache import FolderCache
+from .metrics import get_metrics
+from .request_scheduler import get_request_scheduler
+from .shipment_store import ShipmentRows
+
+if TYPE_CHECKING:
+    from .drive_service import DriveService
+    from .shipment_snapshot import ShipmentSnapshot
+
+logger = get_logger(__name__)
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+# Drive accepts at most 100 calls per batch request
+BATCH_MAX_REQUESTS = 100
+
+# Rounds for sub-requests failing with a retriable status (429 / 5xx)
+BATCH_MAX_ROUNDS = 3
+
+
+def _is_retriable(error: Exception) -> bool:
+    return isinstance(error, HttpError) and (error.resp.status == 429 or error.resp.status >= 500)
+
+
+class FolderPrewarmer:
+    """Resolves shipment folder paths into the folder cache in bulk"""
+
+    def __init__(
+        self,
+        drive: "DriveService",
+        active_statuses: Set[str],
+        folder_index: Optional[DriveFolderIndex] = None
+    ):
+        """
+        Initialize pre-warmer
+
+        Args:
+            drive: Drive service (its API resource and folder cache are used)
+            active_statuses: Shipment statuses pre-warmed (lowercase); any
+                other status, including none, is skipped
+            folder_index: Folder tree index (default: process-wide index,
+                kept current from the Drive changes feed)
+        """
+        self.drive = drive
+        self.active_statuses = active_statuses
+        self._folder_index = folder_index
+        self._lock = threading.Lock()
+        self._warmed_revision: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        # Look-up-only folders found missing; not looked up again (folders
+        # created later reach the cache through the changes feed or uploads)
+        self._not_found: Set[str] = set()
+
+    def folder_paths_for(self, shipments: Iterable[ShipmentInfo]) -> Dict[str, bool]:
+        """
+        Get the folders of every active shipment
+
+        Args:
+            shipments: Shipments (statuses outside active_statuses are
+                skipped; for ShipmentRows only active rows become models)
+
+        Returns:
+            Folder path → True if it is created when missing (shipment
+            folders and their parents), False if it is only looked up
+            (document type folders and the settlement tree)
+        """
+        if isinstance(shipments, ShipmentRows):
+            shipments = ShipmentRows(shipments.store, [
+                row_id for row_id, status in zip(shipments.row_ids, shipments.column('status'))
+                if self._is_active(status)
+            ])
+
+        paths: Dict[str, bool] = {}
+        for shipment in shipments:
+            if not self._is_active(shipment.status):
+                continue
+            # Every document type except settlement shares this category
+            category = determine_shipment_category(
+                shipment.origin, shipment.destination, DocType.CIPL.value
+            )
+            paths[build_shipment_folder_path(category, shipment.invoice_no)] = True
+            for doc_type in DocType:
+                doc_category = determine_shipment_category(
+                    shipment.origin, shipment.destination, doc_type.value
+                )
+                paths.setdefault(build_folder_path(doc_category, shipment.invoice_no, doc_type.value), False)
+        return paths
+
+    def _is_active(self, status: Optional[str]) -> bool:
+        return (status or '').strip().lower() in self.active_statuses
+
+    def prewarm(self, shipments: Iterable[ShipmentInfo]) -> int:
+        """
+        Resolve the folders of the active shipments into the folder cache
+
+        Shipment folders are created when missing; document type folders
+        are cached only if they already exist.
+
+        Args:
+            shipments: Shipments from the current snapshot
+
+        Returns:
+            Number of folders newly resolved into the cache
+        """
+        root_id = self.drive.settings.google_drive_root_folder_id
+        cache = self.drive.folder_cache
+        self.drive.verify_root_folder(root_id)
+
+        # Existing folders come from the folder index (a few list calls on a
+        # cold start, changes feed deltas after that); batch lookups below
+        # only cover folders created since the last sync
+        folder_index = self._folder_index
+        if folder_index is None:
+            folder_index = get_drive_folder_index(self.drive)
+        folder_index.seed_cache(cache)
+
+        # Every distinct prefix, grouped by depth; a prefix of a created
+        # folder is created too
+        levels: Dict[int, Dict[str, bool]] = {}
+        for path, create in self.folder_paths_for(shipments).items():
+            parts = path.strip('/').split('/')
+            for depth in range(1, len(parts) + 1):
+                prefixes = levels.setdefault(depth, {})
+                prefix = '/'.join(parts[:depth])
+                prefixes[prefix] = prefixes.get(prefix, False) or create
+
+        started = time.monotonic()
+        resolved_count = 0
+        known: Dict[str, str] = {'': root_id}
+        created_paths: Set[str] = set()
+
+        for depth in sorted(levels):
+            creatable = levels[depth]
+            pending: Dict[str, Tuple[str, str]] = {}
+            for prefix in sorted(creatable):
+                folder_id = cache.get(FolderCache.make_key(root_id, prefix))
+                if folder_id:
+                    known[prefix] = folder_id
+                    continue
+                if not creatable[prefix] and prefix in self._not_found:
+                    continue
+                parent_path, _, name = prefix.rpartition('/')
+                parent_id = known.get(parent_path)
+                if not parent_id:
+                    continue
+                if not creatable[prefix] and parent_path in created_paths:
+                    # A folder created by this run has no children yet
+                    with self._lock:
+                        self._not_found.add(prefix)
+                    continue
+                pending[prefix] = (parent_id, name)
+
+            if not pending:
+                continue
+
+            found: Dict[str, str] = {}
+            created: Dict[str, str] = {}
+            not_created = 0
+            remaining = pending
+            for attempt in range(BATCH_MAX_ROUNDS):
+                if attempt:
+                    time.sleep(2 ** attempt)
+                # Only create folders whose lookup succeeded and came back
+                # empty. A failed create may still have gone through, so it is
+                # looked up again before the next round instead of re-sent.
+                lookups = self._batch_find(remaining)
+                found.update({p: fid for p, fid in lookups.items() if fid})
+                missing = {p: remaining[p] for p, fid in lookups.items() if not fid and creatable[p]}
+                not_found = [p for p, fid in lookups.items() if not fid and not creatable[p]]
+                not_created += len(not_found)
+                with self._lock:
+                    self._not_found.update(not_found)
+                if not missing:
+                    break
+                new_folders = self._batch_create(missing)
+                for prefix, folder_id in new_folders.items():
+                    parent_id, name = missing[prefix]
+                    folder_index.add(folder_id, name, parent_id)
+                created.update(new_folders)
+                remaining = {p: missing[p] for p in missing if p not in new_folders}
+                if not remaining:
+                    break
+
+            resolved = {**found, **created}
+            cache.set_many({FolderCache.make_key(root_id, p): fid for p, fid in resolved.items()})
+            known.update(resolved)
+            created_paths.update(created)
+            resolved_count += len(resolved)
+            logger.info(
+                f"Folder pre-warm level {depth}: {len(found)} found, {len(created)} created, "
+                f"{not_created} left to uploads, {len(pending) - len(resolved) - not_created} failed"
+            )
+
+        logger.info(f"Folder pre-warm resolved {resolved_count} folders in {time.monotonic() - started:.1f}s")
+        return resolved_count
+
+    def prewarm_in_background(self, snapshot: "ShipmentSnapshot") -> bool:
+        """
+        Start pre-warming for a snapshot unless this revision was already handled
+
+        Args:
+            snapshot: Current shipment snapshot
+
+        Returns:
+            True if a background run was started
+        """
+        with self._lock:
+            if self._warmed_revision == snapshot.revision:
+                return False
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._warmed_revision = snapshot.revision
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(snapshot,),
+                name="folder-prewarm",
+                daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def _run(self, snapshot: "ShipmentSnapshot") -> None:
+        try:
+            self.prewarm(snapshot.shipments)
+        except Exception as e:
+            logger.warning(f"Folder pre-warm failed for revision {snapshot.revision}: {e}")
+            with self._lock:
+                self._warmed_revision = None
+
+    def _batch_find(self, pending: Dict[str, Tuple[str, str]]) -> Dict[str, Optional[str]]:
+        """
+        Look up folders by (parent ID, name) in batches
+
+        Returns:
+            Dict of path → folder ID (None if not found) for lookups that succeeded
+        """
+        def build(files, parent_id: str, name: str):
+            escaped = name.replace("\\", "\\\\").replace("'", "\\'")
+            return files.list(
+                q=(
+                    f"name='{escaped}' and mimeType='{FOLDER_MIME_TYPE}' "
+                    f"and trashed=false and '{parent_id}' in parents"
+                ),
+                spaces='drive',
+                fields='files(id)',
+                pageSize=1
+            )
+
+        responses = self._execute_batched(pending, build)
+        return {
+            prefix: response['files'][0]['id'] if response.get('files') else None
+            for prefix, response in responses.items()
+        }
+
+    def _batch_create(self, missing: Dict[str, Tuple[str, str]]) -> Dict[str, str]:
+        """Create folders in batches (one round; creates are not idempotent)"""
+        def build(files, parent_id: str, name: str):
+            return files.create(
+                body={'name': name, 'mimeType': FOLDER_MIME_TYPE, 'parents': [parent_id]},
+                fields='id'
+            )
+
+        responses = self._execute_batched(missing, build, rounds=1)
+        return {prefix: response['id'] for prefix, response in responses.items()}
+
+    def _execute_batched(
+        self,
+        items: Dict[str, Tuple[str, str]],
+        build_request: Callable,
+        rounds: int = BATCH_MAX_ROUNDS
+    ) -> Dict[str, dict]:
+        """
+        Run one request per item in batches of BATCH_MAX_REQUESTS
+
+        Sub-requests failing with a retriable status are retried in a later
+        round (up to rounds); other failures (e.g. parent folder deleted)
+        are logged and left out of the result.
+
+        Returns:
+            Dict of item key → response for successful sub-requests
+        """
+        service = self.drive.service
+        scheduler = get_request_scheduler()
+        responses: Dict[str, dict] = {}
+        remaining = list(items)
+
+        for attempt in range(rounds):
+            if attempt:
+                time.sleep(2 ** attempt)
+            retry: List[str] = []
+
+            for start in range(0, len(remaining), BATCH_MAX_REQUESTS):
+                chunk = remaining[start:start + BATCH_MAX_REQUESTS]
+                keys = {str(i): prefix for i, prefix in enumerate(chunk)}
+
+                def callback(request_id, response, exception):
+                    prefix = keys[request_id]
+                    if exception is None:
+                        responses[prefix] = response
+                    elif _is_retriable(exception):
+                        retry.append(prefix)
+                    else:
+                        logger.warning(f"Folder pre-warm request failed for {prefix}: {exception}")
+
+                batch = service.new_batch_http_request(callback=callback)
+                files = service.files()
+                for request_id, prefix in keys.items():
+                    parent_id, name = items[prefix]
+                    batch.add(build_request(files, parent_id, name), request_id=request_id)
+                try:
+                    scheduler.acquire('drive', RequestPriority.BACKGROUND, cost=len(chunk))
+                    with get_metrics().span('api.drive.batch'):
+                        batch.execute()
+                except Exception as e:
+                    if not _is_retriable(e):
+                        raise
+                    retry.extend(p for p in chunk if p not in responses and p not in retry)
+
+            if not retry:
+                break
+            remaining = retry
+        else:
+            logger.warning(f"Folder pre-warm gave up on {len(remaining)} requests after {rounds} rounds")
+
+        return responses
+
+
+_prewarmer: Optional[FolderPrewarmer] = None
+_prewarmer_lock = threading.Lock()
+
+
+def get_folder_prewarmer(drive: "DriveService") -> FolderPrewarmer:
+    """
+    Get process-wide folder pre-warmer
+
+    Args:
+        drive: Drive service (used when the pre-warmer is first created)
+    """
+    global _prewarmer
+    with _prewarmer_lock:
+        if _prewarmer is None:
+            settings = get_settings()
+            _prewarmer = FolderPrewarmer(
+                drive,
+                active_statuses={
+                    status.strip().lower()
+                    for status in settings.folder_prewarm_active_statuses.split(',')
+                    if status.strip()
+                }
+            )
+        return _prewarmer
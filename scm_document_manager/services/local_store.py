@@ -0,0 +1,367 @@
+"""
+Local content-addressed file store
+
+A StorageBackend that keeps files on a local or LAN filesystem:
+
+    <root>/objects/ab/cd/<sha256>        file content, stored once per hash
+    <root>/objects/ab/cd/<sha256>.json   sidecar metadata (hashes, size,
+                                         MIME type, properties, folders)
+    <root>/folders/<folder path>/<name>  hard link to the object (copy where
+                                         hard links are unsupported)
+    <root>/tmp/                          in-progress writes
+
+File IDs are the content SHA-256 and folder IDs the folder path, so the same
+content uploaded twice is stored once and only gains a folder entry. Every
+file is written to tmp/ and renamed (folder entries: hard-linked) into place,
+so readers never see a partial object, sidecar or folder entry.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional
+from core.exceptions import FolderNotFoundError, LocalStorageError, ValidationError
+from config.settings import get_settings
+from config.logging_config import get_logger
+from .storage_backend import StorageBackend
+
+try:
+    import fcntl
+except ImportError:  # Windows: sidecar updates are serialized within the process only
+    fcntl = None
+
+logger = get_logger(__name__)
+
+# Read/write block size when copying streams into the store
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _path_parts(path: str) -> List[str]:
+    """Split a folder path into segments, rejecting anything that escapes the store"""
+    parts = [part for part in path.strip('/').split('/') if part]
+    for part in parts:
+        if part in ('.', '..') or '\\' in part or '\0' in part or os.sep in part:
+            raise ValidationError(f"Invalid path segment: {part!r}")
+    return parts
+
+
+class LocalContentStore(StorageBackend):
+    """Content-addressed file store on the local filesystem"""
+
+    def __init__(self, root_dir: str, chunk_size: int = COPY_CHUNK_SIZE):
+        """
+        Initialize store (directories are created as needed)
+
+        Args:
+            root_dir: Store root directory
+            chunk_size: Bytes read per chunk (progress is reported per chunk)
+        """
+        self.root = Path(root_dir).resolve()
+        self.chunk_size = chunk_size
+        self._objects = self.root / 'objects'
+        self._folders = self.root / 'folders'
+        self._tmp = self.root / 'tmp'
+        for directory in (self._objects, self._folders, self._tmp):
+            directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    # ===== StorageBackend =====
+
+    def ensure_folder_path(self, folder_path: str, root_folder_id: Optional[str] = None) -> str:
+        """
+        Create folder path under the store (root_folder_id is ignored)
+
+        Returns:
+            Folder ID (the normalized folder path)
+        """
+        folder_id = '/'.join(_path_parts(folder_path))
+        self._folder_dir(folder_id).mkdir(parents=True, exist_ok=True)
+        return folder_id
+
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        file_name: str,
+        folder_id: str,
+        mime_type: str = 'application/pdf',
+        session_key: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        app_properties: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Store a stream and link it into a folder
+
+        Content already in the store is not written again. session_key is
+        accepted for interface compatibility: a failed local write is simply
+        repeated from the start.
+
+        Returns:
+            Dict with file_id (content SHA-256) and drive_url (file:// URI)
+
+        Raises:
+            FolderNotFoundError: If the destination folder no longer exists
+            LocalStorageError: If the file cannot be written
+        """
+        folder_dir = self._folder_dir(folder_id)
+        if not folder_dir.is_dir():
+            raise FolderNotFoundError(f"Destination folder not found: {folder_id}")
+
+        total_bytes = stream.seek(0, os.SEEK_END)
+        stream.seek(0)
+        chunk_size = chunk_size or self.chunk_size
+        sha256 = hashlib.sha256()
+        md5 = hashlib.md5()
+
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp, prefix='upload-')
+        try:
+            sent = 0
+            with os.fdopen(fd, 'wb') as tmp_file:
+                while True:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        break
+                    tmp_file.write(chunk)
+                    sha256.update(chunk)
+                    md5.update(chunk)
+                    sent += len(chunk)
+                    if progress_callback:
+                        progress_callback(sent, total_bytes)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+
+            file_id = sha256.hexdigest()
+            object_path = self._object_path(file_id)
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            if object_path.exists():
+                logger.info(f"Content already stored: {file_id}")
+            else:
+                os.replace(tmp_path, object_path)
+        except OSError as e:
+            logger.error(f"Local store write failed: {file_name}, error: {e}")
+            raise LocalStorageError(f"Failed to store {file_name}: {e}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+        with self._sidecar_lock():
+            sidecar = self._read_sidecar(file_id) or {
+                'sha256': file_id,
+                'md5': md5.hexdigest(),
+                'size': total_bytes,
+                'mime_type': mime_type,
+                'created_at': datetime.utcnow().isoformat(),
+                'properties': {},
+                'locations': []
+            }
+            sidecar['properties'].update(app_properties or {})
+            entry_name = self._link(file_id, folder_dir, file_name)
+            location = {'folder_id': folder_id, 'name': entry_name}
+            if location not in sidecar['locations']:
+                sidecar['locations'].append(location)
+            self._write_sidecar(file_id, sidecar)
+
+        logger.info(f"File stored: {folder_id}/{entry_name} ({file_id}, {total_bytes} bytes)")
+        return {
+            'file_id': file_id,
+            'drive_url': (folder_dir / entry_name).as_uri()
+        }
+
+    def create_shortcut(self, target_file_id: str, shortcut_name: str, folder_id: str) -> Dict[str, Any]:
+        """
+        Link stored content into another folder
+
+        Returns:
+            Dict with shortcut_id (folder path / entry name) and drive_url
+        """
+        folder_dir = self._folder_dir(folder_id)
+        if not folder_dir.is_dir():
+            raise FolderNotFoundError(f"Destination folder not found: {folder_id}")
+
+        with self._sidecar_lock():
+            sidecar = self._read_sidecar(target_file_id)
+            if sidecar is None:
+                raise LocalStorageError(f"File not found: {target_file_id}")
+            entry_name = self._link(target_file_id, folder_dir, shortcut_name)
+            location = {'folder_id': folder_id, 'name': entry_name}
+            if location not in sidecar['locations']:
+                sidecar['locations'].append(location)
+            self._write_sidecar(target_file_id, sidecar)
+
+        logger.info(f"Link created: {folder_id}/{entry_name} → {target_file_id}")
+        return {
+            'shortcut_id': f"{folder_id}/{entry_name}",
+            'drive_url': (folder_dir / entry_name).as_uri()
+        }
+
+    def get_file(self, file_id: str) -> Optional[Dict[str, Any]]:
+        sidecar = self._read_sidecar(file_id)
+        if sidecar is None or not self._object_path(file_id).exists():
+            return None
+        return {'id': file_id, 'trashed': False, 'webViewLink': self._url(file_id, sidecar)}
+
+    def list_hashed_files(self, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        for sidecar_path in self._objects.glob('*/*/*.json'):
+            sidecar = self._read_sidecar(sidecar_path.stem)
+            if sidecar is None:
+                continue
+            locations = sidecar.get('locations') or []
+            yield {
+                'id': sidecar['sha256'],
+                'webViewLink': self._url(sidecar['sha256'], sidecar),
+                'parents': [locations[0]['folder_id']] if locations else [],
+                'size': str(sidecar.get('size', 0)),
+                'md5Checksum': sidecar.get('md5'),
+                'appProperties': {**sidecar.get('properties', {}), 'sha256': sidecar['sha256']}
+            }
+
+    def delete_file(self, file_id: str) -> None:
+        """Delete content, its sidecar and every folder entry linking to it"""
+        with self._sidecar_lock():
+            sidecar = self._read_sidecar(file_id) or {}
+            for location in sidecar.get('locations', []):
+                entry = self._folder_dir(location['folder_id']) / location['name']
+                entry.unlink(missing_ok=True)
+            self._object_path(file_id).unlink(missing_ok=True)
+            self._sidecar_path(file_id).unlink(missing_ok=True)
+        logger.info(f"File deleted: {file_id}")
+
+    # ===== internals =====
+
+    def _object_path(self, file_id: str) -> Path:
+        if len(file_id) != 64 or any(c not in '0123456789abcdef' for c in file_id):
+            raise ValidationError(f"Invalid file ID: {file_id!r}")
+        return self._objects / file_id[:2] / file_id[2:4] / file_id
+
+    def _sidecar_path(self, file_id: str) -> Path:
+        return self._object_path(file_id).with_suffix('.json')
+
+    def _folder_dir(self, folder_id: str) -> Path:
+        return self._folders.joinpath(*_path_parts(folder_id))
+
+    def _url(self, file_id: str, sidecar: Dict[str, Any]) -> str:
+        locations = sidecar.get('locations') or []
+        if locations:
+            return (self._folder_dir(locations[0]['folder_id']) / locations[0]['name']).as_uri()
+        return self._object_path(file_id).as_uri()
+
+    def _link(self, file_id: str, folder_dir: Path, name: str) -> str:
+        """
+        Add a folder entry for an object (caller holds the sidecar lock)
+
+        The entry is created without replacing anything, so a name taken
+        meanwhile (by another process or store instance) moves on to the
+        next candidate instead of being overwritten.
+
+        Returns:
+            Entry name: the requested name (also if it already holds this
+            content), or "name (n).ext" if another file already uses it
+        """
+        if _path_parts(name) != [name]:
+            raise ValidationError(f"Invalid file name: {name!r}")
+        object_path = self._object_path(file_id)
+        stem, ext = os.path.splitext(name)
+        copy_path: Optional[Path] = None
+        candidate = name
+        n = 0
+        try:
+            while n < 1000:
+                candidate = f"{stem} ({n}){ext}" if n else name
+                entry = folder_dir / candidate
+                try:
+                    if copy_path is None:
+                        os.link(object_path, entry)
+                    elif os.path.lexists(entry):
+                        raise FileExistsError(str(entry))
+                    else:
+                        # Fails on Windows if the name was taken meanwhile; POSIX
+                        # filesystems are covered by the store lock
+                        os.rename(copy_path, entry)
+                    return candidate
+                except FileExistsError:
+                    if self._holds(entry, file_id):
+                        return candidate
+                    n += 1
+                except OSError:
+                    if copy_path is not None:
+                        raise
+                    # Filesystem without hard links: keep a copy
+                    copy_path = self._tmp / f"link-{file_id}-{threading.get_ident()}"
+                    shutil.copyfile(object_path, copy_path)
+        except OSError as e:
+            raise LocalStorageError(f"Failed to link {candidate} into {folder_dir}: {e}")
+        finally:
+            if copy_path is not None:
+                copy_path.unlink(missing_ok=True)
+        raise LocalStorageError(f"Too many files named {name} in {folder_dir}")
+
+    def _holds(self, entry: Path, file_id: str) -> bool:
+        """Check whether a folder entry has the object's content (hard link or copy)"""
+        object_path = self._object_path(file_id)
+        try:
+            if os.path.samefile(entry, object_path):
+                return True
+            if entry.stat().st_size != object_path.stat().st_size:
+                return False
+            sha256 = hashlib.sha256()
+            with open(entry, 'rb') as f:
+                for chunk in iter(lambda: f.read(self.chunk_size), b''):
+                    sha256.update(chunk)
+            return sha256.hexdigest() == file_id
+        except OSError:
+            return False
+
+    def _read_sidecar(self, file_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._sidecar_path(file_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValidationError):
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to read sidecar for {file_id}: {e}")
+            return None
+
+    def _write_sidecar(self, file_id: str, sidecar: Dict[str, Any]) -> None:
+        """Write sidecar atomically (caller holds the sidecar lock)"""
+        path = self._sidecar_path(file_id)
+        tmp_file = self._tmp / f"{file_id}.json.{threading.get_ident()}"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(sidecar, f, ensure_ascii=False)
+        os.replace(tmp_file, path)
+
+    @contextmanager
+    def _sidecar_lock(self):
+        """Serialize sidecar and folder entry updates across threads and processes"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.root / '.lock', 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+_store: Optional[LocalContentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_local_content_store() -> LocalContentStore:
+    """Get process-wide local content store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            settings = get_settings()
+            _store = LocalContentStore(
+                root_dir=settings.local_storage_dir,
+                chunk_size=settings.upload_chunk_size_mb * 1024 * 1024
+            )
+            logger.info(f"Local content store at {_store.root}")
+        return _store
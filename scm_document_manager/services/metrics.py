@@ -0,0 +1,266 @@
+"""
+Latency and throughput instrumentation
+
+Spans time DocumentService stages and every scheduled Drive/Sheets call
+into fixed-bucket histograms; counters track bytes and cache/dedup events.
+Stats already kept elsewhere (folder cache, retries, request scheduler,
+HTTP client pool) are pulled in through collectors when a snapshot is
+taken. Snapshots are served as JSON or Prometheus text, over HTTP when
+settings.metrics_port is set, and in the app's debug panel.
+
+When disabled, span() returns a shared no-op context manager and counters
+return immediately.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+from config.settings import get_settings
+from config.logging_config import get_logger
+from utils.retry import get_retry_stats
+
+logger = get_logger(__name__)
+
+# Histogram bucket upper bounds (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float, error: bool) -> None:
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+        self.count += 1
+        self.errors += error
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile"""
+        target = q * self.count
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target and count:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max
+        return 0.0
+
+
+class _Span:
+    def __init__(self, metrics: "Metrics", name: str):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._metrics.observe(self._name, time.perf_counter() - self._started, error=exc_type is not None)
+        return False
+
+
+class Metrics:
+    """Process-wide span histograms, counters and stat collectors"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._histograms: Dict[str, _Histogram] = {}
+        self._counters: Dict[str, float] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str):
+        """Context manager timing a block into the named histogram"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name)
+
+    def observe(self, name: str, seconds: float, error: bool = False) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = _Histogram()
+            histogram.observe(seconds, error)
+
+    def inc(self, name: str, value: float = 1) -> None:
+        """Add to a counter (e.g. drive_upload_bytes, dedup_hits)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def register_collector(self, name: str, collect: Callable[[], Dict[str, Any]]) -> None:
+        """Add stats pulled at snapshot time (flat dict, or dict of dicts per endpoint)"""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get spans (count, errors, mean, p50/p95/p99, max), counters and collected stats"""
+        with self._lock:
+            spans = {
+                name: {
+                    'count': h.count,
+                    'errors': h.errors,
+                    'mean_seconds': round(h.total / h.count, 6) if h.count else 0.0,
+                    'p50_seconds': h.quantile(0.5),
+                    'p95_seconds': h.quantile(0.95),
+                    'p99_seconds': h.quantile(0.99),
+                    'max_seconds': round(h.max, 6)
+                }
+                for name, h in sorted(self._histograms.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+        return {'enabled': self.enabled, 'spans': spans, 'counters': counters, 'stats': self._collect()}
+
+    def _collect(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            collectors = dict(self._collectors)
+        collected = {}
+        for name, collect in collectors.items():
+            try:
+                collected[name] = collect()
+            except Exception as e:
+                logger.warning(f"Metrics collector {name} failed: {e}")
+        return collected
+
+    def render_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False)
+
+    def render_prometheus(self) -> str:
+        """Render histograms, counters and collected stats in Prometheus text format"""
+        lines: List[str] = [
+            '# TYPE scm_span_duration_seconds histogram',
+        ]
+        with self._lock:
+            histograms = {name: (list(h.buckets), h.count, h.total, h.errors) for name, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        for name, (buckets, count, total, _) in sorted(histograms.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS + (float('inf'),), buckets):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'scm_span_duration_seconds_bucket{{span="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'scm_span_duration_seconds_sum{{span="{name}"}} {total:.6f}')
+            lines.append(f'scm_span_duration_seconds_count{{span="{name}"}} {count}')
+
+        lines.append('# TYPE scm_span_errors_total counter')
+        for name, (_, _, _, errors) in sorted(histograms.items()):
+            lines.append(f'scm_span_errors_total{{span="{name}"}} {errors}')
+
+        lines.append('# TYPE scm_events_total counter')
+        for name, value in sorted(counters.items()):
+            lines.append(f'scm_events_total{{event="{name}"}} {value}')
+
+        # Collectors return plain dicts; values that are not numbers are left out
+        for collector, stats in sorted(self._collect().items()):
+            for key, value in sorted(stats.items()):
+                if isinstance(value, dict):
+                    for stat, stat_value in sorted(value.items()):
+                        sample = _sample_value(stat_value)
+                        if sample is not None:
+                            lines.append(f'scm_{collector}_{stat}{{key="{key}"}} {sample}')
+                else:
+                    sample = _sample_value(value)
+                    if sample is not None:
+                        lines.append(f'scm_{collector}_{key} {sample}')
+        return '\n'.join(lines) + '\n'
+
+
+def _sample_value(value: Any) -> Optional[str]:
+    """Format a collected stat as a Prometheus sample value (None if not numeric)"""
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float)):
+        return str(value)
+    return None
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Get process-wide metrics"""
+    global _metrics
+    if _metrics is not None:
+        return _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            metrics = Metrics(enabled=get_settings().metrics_enabled)
+            metrics.register_collector('retry', get_retry_stats)
+            _metrics = metrics
+        return _metrics
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        metrics = get_metrics()
+        if self.path.rstrip('/') == '/metrics':
+            body, content_type = metrics.render_prometheus(), 'text/plain; version=0.0.4'
+        elif self.path.rstrip('/') == '/metrics.json':
+            body, content_type = metrics.render_json(), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_attempted = False
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1') -> bool:
+    """
+    Serve /metrics (Prometheus text) and /metrics.json once per process
+
+    Returns:
+        True if the server was started by this call
+    """
+    global _server, _server_attempted
+    with _metrics_lock:
+        if _server_attempted:
+            return False
+        _server_attempted = True
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            # Another worker process already serves this port
+            logger.warning(f"Metrics server not started on {host}:{port}: {e}")
+            return False
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        logger.info(f"Metrics served on http://{host}:{port}/metrics")
+        return True
@@ -0,0 +1,171 @@
+"""
+Quota-aware scheduler for Drive and Sheets requests
+
+Each API has a token bucket sized to its per-minute budget. Requests are
+admitted by priority: a waiting request blocks every lower-priority one on
+the same API, and lower priorities also leave a reserve of tokens untouched
+so a burst of dashboard reads cannot spend the budget uploads need. Callers
+holding cached data can check has_budget() first and serve the stale copy
+instead of queueing.
+
+Budgets are per process; with several worker processes, divide the
+project quota between them.
+"""
+import functools
+import threading
+import time
+from typing import Callable, Dict, Optional
+from core.enums import RequestPriority
+from config.settings import get_settings
+from config.logging_config import get_logger
+from .metrics import get_metrics
+
+logger = get_logger(__name__)
+
+# Share of the bucket each priority must leave untouched
+PRIORITY_RESERVE = {
+    RequestPriority.UPLOAD: 0.0,
+    RequestPriority.LOG_WRITE: 0.1,
+    RequestPriority.DASHBOARD_READ: 0.25,
+    RequestPriority.BACKGROUND: 0.5,
+}
+
+
+class _TokenBucket:
+    """Token bucket whose capacity plus one minute of refill equals the budget"""
+
+    def __init__(self, requests_per_minute: int):
+        self.capacity = max(1.0, requests_per_minute / 6)
+        self.rate = max(requests_per_minute - self.capacity, 1.0) / 60
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waiting: Dict[RequestPriority, int] = {priority: 0 for priority in RequestPriority}
+        self.granted = 0
+        self.denied = 0
+        self.wait_seconds = 0.0
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def floor(self, priority: RequestPriority) -> float:
+        return self.capacity * PRIORITY_RESERVE[priority]
+
+    def can_take(self, priority: RequestPriority, cost: float) -> bool:
+        if any(count for p, count in self.waiting.items() if p < priority):
+            return False
+        return self.tokens - cost >= self.floor(priority)
+
+
+class RequestScheduler:
+    """Per-API token buckets with priority admission"""
+
+    def __init__(self, budgets: Dict[str, int]):
+        """
+        Initialize scheduler
+
+        Args:
+            budgets: API name → requests per minute
+        """
+        self._buckets = {api: _TokenBucket(rpm) for api, rpm in budgets.items()}
+        self._condition = threading.Condition()
+
+    def acquire(self, api: str, priority: RequestPriority, cost: int = 1) -> float:
+        """
+        Block until the request may be sent
+
+        Args:
+            api: API name (see budgets)
+            priority: Request priority
+            cost: Requests this call counts as (e.g. sub-requests of a batch)
+
+        Returns:
+            Seconds spent waiting
+        """
+        bucket = self._buckets[api]
+        started = time.monotonic()
+        with self._condition:
+            # A cost larger than the usable bucket would never be admitted
+            cost = min(cost, bucket.capacity - bucket.floor(priority))
+            bucket.waiting[priority] += 1
+            try:
+                while True:
+                    bucket.refill()
+                    if bucket.can_take(priority, cost):
+                        bucket.tokens -= cost
+                        break
+                    shortfall = bucket.floor(priority) + cost - bucket.tokens
+                    self._condition.wait(max(shortfall / bucket.rate, 0.05))
+            finally:
+                bucket.waiting[priority] -= 1
+                self._condition.notify_all()
+
+            waited = time.monotonic() - started
+            bucket.granted += 1
+            bucket.wait_seconds += waited
+        if waited > 1:
+            logger.info(f"{api} request ({priority.name}) waited {waited:.1f}s for quota")
+        return waited
+
+    def has_budget(self, api: str, priority: RequestPriority, cost: int = 1) -> bool:
+        """
+        Check whether a request would be admitted now without waiting
+
+        A False result is counted as a denied (served-from-cache) request.
+        """
+        bucket = self._buckets[api]
+        with self._condition:
+            bucket.refill()
+            if bucket.can_take(priority, cost):
+                return True
+            bucket.denied += 1
+            return False
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Get per-API granted/denied counts, wait time and available tokens"""
+        with self._condition:
+            result = {}
+            for api, bucket in self._buckets.items():
+                bucket.refill()
+                result[api] = {
+                    'granted': bucket.granted,
+                    'denied': bucket.denied,
+                    'wait_seconds': round(bucket.wait_seconds, 3),
+                    'tokens': round(bucket.tokens, 1),
+                    'capacity': round(bucket.capacity, 1)
+                }
+            return result
+
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_request_scheduler() -> RequestScheduler:
+    """Get process-wide request scheduler"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            settings = get_settings()
+            _scheduler = RequestScheduler({
+                'drive': settings.drive_requests_per_minute,
+                'sheets_read': settings.sheets_read_requests_per_minute,
+                'sheets_write': settings.sheets_write_requests_per_minute
+            })
+            get_metrics().register_collector('scheduler', _scheduler.stats)
+        return _scheduler
+
+
+def scheduled(api: str, priority: RequestPriority) -> Callable:
+    """Decorator acquiring one request from the scheduler before each call (traced as a span)"""
+    def decorator(func: Callable) -> Callable:
+        span_name = f"api.{api}.{func.__name__.lstrip('_')}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            get_request_scheduler().acquire(api, priority)
+            with get_metrics().span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,110 +1,87 @@
 """
 Google Sheets API service
 """
-from typing import List, Dict, Optional, Any
+from itertools import islice
+from typing import Iterator, List, Dict, Optional, Any, Sequence, Tuple
 import gspread
-from google.oauth2 import service_account
+from gspread.utils import numericise_all, rowcol_to_a1
+from core.enums import RequestPriority, UploadStatus
 from core.exceptions import SheetsAPIError
 from core.models import ShipmentInfo, DocumentMetadata
 from config.settings import get_settings
 from config.logging_config import get_logger
-from utils.retry import retry_on_api_error
+from utils.retry import get_circuit_breaker, retry_on_api_error
+from .client_registry import get_client_registry
+from .request_scheduler import get_request_scheduler, scheduled
+from .shipment_snapshot import ShipmentSnapshot, get_shipment_snapshot_store
+from .upload_log_mirror import DASHBOARD_COLUMNS, UploadLogMirror, get_upload_log_mirror
+from .upload_log_writer import get_upload_log_writer
 
 logger = get_logger(__name__)
 
-SCOPES = [
-    'https://www.googleapis.com/auth/spreadsheets',
-    'https://www.googleapis.com/auth/drive'
+# SCM 통합 시트 헤더 (ShipmentInfo에 매핑되는 컬럼만 조회)
+SHIPMENT_COLUMNS = [
+    '인보이스 번호',
+    '티켓명',
+    'carrier_name',
+    'carrier_mode',
+    '출발창고',
+    '도착창고',
+    'onboard_date',
+    'bl_no',
+    'status'
 ]
 
+# Sheet rows per read when streaming shipments
+STREAM_BATCH_ROWS = 1000
+
+# A run of this many blank rows ends the shipment list when streaming
+STREAM_END_BLANK_ROWS = 1000
+
+# (sheet_id, worksheet name) → {header: column index}, shared across instances
+_header_positions: Dict[Tuple[str, str], Dict[str, int]] = {}
+
+
+def _column_letter(col: int) -> str:
+    """Convert 1-based column index to A1 column letter"""
+    return rowcol_to_a1(1, col)[:-1]
+
 
 class SheetsService:
     """Google Sheets API wrapper"""
 
-    def __init__(self):
-        """Initialize Sheets service"""
+    def __init__(self, client: Optional[gspread.Client] = None):
+        """
+        Initialize Sheets service
+
+        Args:
+            client: Pre-built gspread client (default: process-wide pooled client)
+        """
         try:
             settings = get_settings()
-            credentials = service_account.Credentials.from_service_account_info(
-                settings.google_credentials,
-                scopes=SCOPES
-            )
-            self.client = gspread.authorize(credentials)
+            self.client = client or get_client_registry().sheets()
             self.settings = settings
+            self._worksheets: Dict[Tuple[str, str], gspread.Worksheet] = {}
             logger.info("Sheets service initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Sheets service: {e}")
             raise SheetsAPIError(f"Sheets service initialization failed: {e}")
 
-    @retry_on_api_error(max_attempts=3)
-    def search_shipments(self, search_term: str) -> List[ShipmentInfo]:
+    def search_shipments(self, search_term: str) -> Sequence[ShipmentInfo]:
         """
         Search shipments in SCM 통합 시트
 
+        Served from the shared snapshot's search index; no sheet read is
+        made unless the snapshot itself needs a reload.
+
         Args:
-            search_term: Search term (invoice number or partial match)
+            search_term: Search term (invoice number, BL number or partial match)
 
         Returns:
-            List of matching ShipmentInfo
+            Matching ShipmentInfo in sheet order (built as they are accessed)
         """
         try:
-            logger.info(f"Searching for '{search_term}' in sheet ID: {self.settings.invoice_sheet_id}")
-            logger.info(f"Looking for worksheet: {self.settings.invoice_sheet_name}")
-
-            # Open spreadsheet
-            sheet = self.client.open_by_key(self.settings.invoice_sheet_id)
-            logger.info(f"Opened spreadsheet: {sheet.title}")
-
-            # List all worksheets for debugging
-            all_worksheets = [ws.title for ws in sheet.worksheets()]
-            logger.info(f"Available worksheets: {all_worksheets}")
-
-            # Try to get the worksheet
-            try:
-                worksheet = sheet.worksheet(self.settings.invoice_sheet_name)
-                logger.info(f"Found worksheet: {worksheet.title}")
-            except gspread.exceptions.WorksheetNotFound:
-                logger.error(f"Worksheet '{self.settings.invoice_sheet_name}' not found. Available: {all_worksheets}")
-                raise SheetsAPIError(
-                    f"워크시트 '{self.settings.invoice_sheet_name}'를 찾을 수 없습니다. "
-                    f"사용 가능한 시트: {', '.join(all_worksheets)}"
-                )
-
-            # Get all records
-            records = worksheet.get_all_records()
-            logger.info(f"Retrieved {len(records)} records from sheet")
-
-            # Show column headers for debugging
-            if records:
-                headers = list(records[0].keys())
-                logger.info(f"Sheet columns: {headers}")
-
-            # Filter by search term
-            search_lower = search_term.lower()
-            matches = []
-
-            for record in records:
-                invoice_no = str(record.get('인보이스 번호', '')).lower()
-                ticket_name = str(record.get('티켓명', '')).lower()
-
-                if search_lower in invoice_no or search_lower in ticket_name:
-                    try:
-                        shipment = ShipmentInfo(
-                            invoice_no=record.get('인보이스 번호', ''),
-                            ticket_name=record.get('티켓명'),
-                            carrier_name=record.get('carrier_name', ''),
-                            carrier_mode=record.get('carrier_mode', ''),
-                            origin=record.get('출발창고', ''),
-                            destination=record.get('도착창고', ''),
-                            onboard_date=str(record.get('onboard_date', '')),
-                            bl_no=record.get('bl_no'),
-                            status=record.get('status')
-                        )
-                        matches.append(shipment)
-                    except Exception as e:
-                        logger.warning(f"Failed to parse shipment record: {e}")
-                        continue
-
+            matches = self.get_shipment_snapshot().search(search_term)
             logger.info(f"Found {len(matches)} shipments matching '{search_term}'")
             return matches
 
@@ -115,48 +92,60 @@ class SheetsService:
             logger.error(f"Shipment search failed: {e}", exc_info=True)
             raise SheetsAPIError(f"선적 검색 실패: {e}")
 
-    @retry_on_api_error(max_attempts=3)
-    def get_all_shipments(self, limit: int = 100) -> List[ShipmentInfo]:
+    @retry_on_api_error(max_attempts=3, endpoint='drive')
+    @scheduled('drive', RequestPriority.DASHBOARD_READ)
+    def get_sheet_revision(self) -> str:
+        """
+        Get SCM 통합 spreadsheet revision (Drive modifiedTime)
+
+        Returns:
+            Revision string that changes whenever the spreadsheet is edited
+        """
+        try:
+            metadata = self.client.get_file_drive_metadata(self.settings.invoice_sheet_id)
+            return metadata['modifiedTime']
+        except Exception as e:
+            logger.error(f"Failed to get sheet revision: {e}")
+            raise SheetsAPIError(f"시트 버전 조회 실패: {e}")
+
+    def get_shipment_snapshot(self) -> ShipmentSnapshot:
+        """
+        Get process-wide shipment snapshot shared by all sessions
+
+        Returns:
+            ShipmentSnapshot (reloaded only when the sheet revision changes)
+        """
+        return get_shipment_snapshot_store().get(self)
+
+    def get_all_shipments(self, limit: Optional[int] = 100) -> List[ShipmentInfo]:
         """
         Get all shipments from SCM 통합 시트
 
+        With a limit the rows are streamed (see iter_shipments), so the list
+        ends at the first run of STREAM_END_BLANK_ROWS blank rows; rows below
+        such a gap are only returned with limit=None.
+
         Args:
-            limit: Maximum number of shipments to return (default 100)
+            limit: Maximum number of shipments to return (default 100, None for all)
 
         Returns:
             List of ShipmentInfo objects
         """
         try:
-            logger.info(f"Fetching all shipments from sheet ID: {self.settings.invoice_sheet_id}")
+            if limit is not None:
+                # Read only as many rows as needed
+                shipments = list(islice(self.iter_shipments(batch_rows=max(limit, 1)), limit))
+                logger.info(f"Parsed {len(shipments)} shipments successfully")
+                return shipments
 
-            # Open spreadsheet
-            sheet = self.client.open_by_key(self.settings.invoice_sheet_id)
-            worksheet = sheet.worksheet(self.settings.invoice_sheet_name)
-
-            # Get all records
-            records = worksheet.get_all_records()
-            logger.info(f"Retrieved {len(records)} total records from sheet")
+            records = self.read_shipment_records()
 
             # Parse records
             shipments = []
-            for record in records[:limit]:  # Limit to avoid performance issues
-                try:
-                    shipment = ShipmentInfo(
-                        invoice_no=record.get('인보이스 번호', ''),
-                        ticket_name=record.get('티켓명'),
-                        carrier_name=record.get('carrier_name', ''),
-                        carrier_mode=record.get('carrier_mode', ''),
-                        origin=record.get('출발창고', ''),
-                        destination=record.get('도착창고', ''),
-                        onboard_date=str(record.get('onboard_date', '')),
-                        bl_no=record.get('bl_no'),
-                        status=record.get('status')
-                    )
-                    if shipment.invoice_no:  # Only add if invoice number exists
-                        shipments.append(shipment)
-                except Exception as e:
-                    logger.warning(f"Failed to parse shipment record: {e}")
-                    continue
+            for record in records:
+                shipment = self._record_to_shipment(record)
+                if shipment and shipment.invoice_no:  # Only add if invoice number exists
+                    shipments.append(shipment)
 
             logger.info(f"Parsed {len(shipments)} shipments successfully")
             return shipments
@@ -165,48 +154,172 @@ class SheetsService:
             logger.error(f"Failed to get all shipments: {e}", exc_info=True)
             raise SheetsAPIError(f"선적 목록 조회 실패: {e}")
 
-    @retry_on_api_error(max_attempts=3)
+    @retry_on_api_error(max_attempts=3, endpoint='sheets')
+    @scheduled('sheets_read', RequestPriority.UPLOAD)
+    def read_shipment_records(self) -> List[Dict[str, Any]]:
+        """
+        Read SCM 통합 rows as unparsed records (SHIPMENT_COLUMNS, sheet order)
+
+        Returns:
+            List of records keyed by header name
+        """
+        try:
+            logger.info(f"Fetching all shipments from sheet ID: {self.settings.invoice_sheet_id}")
+            records = self._read_columns(
+                self.settings.invoice_sheet_id,
+                self.settings.invoice_sheet_name,
+                SHIPMENT_COLUMNS
+            )
+            logger.info(f"Retrieved {len(records)} total records from sheet")
+            return records
+
+        except SheetsAPIError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to read shipment rows: {e}", exc_info=True)
+            raise SheetsAPIError(f"선적 목록 조회 실패: {e}")
+
+    def iter_shipments(self, batch_rows: int = STREAM_BATCH_ROWS) -> Iterator[ShipmentInfo]:
+        """
+        Stream shipments from SCM 통합 시트, reading one row window at a time
+
+        Each window is one batch_get of the shipment columns over batch_rows
+        rows, so the first shipments arrive after one small read, a caller
+        that stops early skips the remaining reads, and only one window of
+        records is held at a time.
+
+        The Sheets API returns no values past the last row, nor for blank
+        rows inside the sheet, so the list ends at the first run of
+        STREAM_END_BLANK_ROWS blank rows. An empty window shorter than that
+        is followed by a read of STREAM_END_BLANK_ROWS rows before ending.
+
+        Args:
+            batch_rows: Sheet rows per read
+
+        Yields:
+            ShipmentInfo in sheet order (invalid rows are skipped)
+        """
+        first_row = 2
+        window_rows = batch_rows
+        while True:
+            last_row = first_row + window_rows - 1
+            records = self._read_shipment_window(first_row, last_row)
+            if records:
+                for record in records:
+                    shipment = self._record_to_shipment(record)
+                    if shipment and shipment.invoice_no:
+                        yield shipment
+                window_rows = batch_rows
+            elif window_rows >= STREAM_END_BLANK_ROWS:
+                return
+            else:
+                # Too few blank rows to tell a gap from the end of the sheet
+                window_rows = STREAM_END_BLANK_ROWS
+            first_row = last_row + 1
+
+    @retry_on_api_error(max_attempts=3, endpoint='sheets')
+    @scheduled('sheets_read', RequestPriority.UPLOAD)
+    def _read_shipment_window(self, first_row: int, last_row: int) -> List[Dict[str, Any]]:
+        """Read one row window of SCM 통합 as unparsed records"""
+        try:
+            return self._read_columns(
+                self.settings.invoice_sheet_id,
+                self.settings.invoice_sheet_name,
+                SHIPMENT_COLUMNS,
+                rows=(first_row, last_row)
+            )
+        except SheetsAPIError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to read shipment rows {first_row}-{last_row}: {e}")
+            raise SheetsAPIError(f"선적 목록 조회 실패: {e}")
+
     def append_upload_log(self, metadata: DocumentMetadata) -> None:
         """
         Append upload log to Dashboard sheet
 
+        The row is journaled locally and written by the background
+        write-behind writer; this returns once the journal is durable.
+
         Args:
             metadata: Document metadata to log
         """
-        try:
-            sheet = self.client.open_by_key(self.settings.dashboard_sheet_id)
-            worksheet = sheet.worksheet(self.settings.dashboard_sheet_name)
-
-            # Prepare row data (18 columns)
-            row = [
-                metadata.upload_timestamp.isoformat(),
-                metadata.shipment_id,
-                metadata.doc_type,
-                metadata.file_name,
-                metadata.drive_file_id,
-                metadata.drive_url,
-                metadata.drive_folder_id,
-                metadata.uploader,
-                metadata.file_size_bytes,
-                metadata.status.value,
-                metadata.error_message or '',
-                metadata.carrier_name or '',
-                metadata.carrier_mode or '',
-                metadata.origin or '',
-                metadata.destination or '',
-                metadata.extracted_text or '',
-                metadata.extracted_json or '',
-                metadata.embedding_status or ''
-            ]
+        self.append_upload_logs([metadata])
 
-            worksheet.append_row(row)
-            logger.info(f"Upload log appended: {metadata.shipment_id}/{metadata.doc_type}")
+    def append_upload_logs(self, metadata_list: List[DocumentMetadata]) -> None:
+        """
+        Append several upload logs to Dashboard sheet (write-behind)
+
+        Args:
+            metadata_list: Document metadata to log
+        """
+        try:
+            rows = [self._metadata_to_row(metadata) for metadata in metadata_list]
+            get_upload_log_writer(self.client, self._append_dashboard_rows).enqueue(rows)
+            for metadata in metadata_list:
+                logger.info(f"Upload log journaled: {metadata.shipment_id}/{metadata.doc_type}")
 
         except Exception as e:
             logger.error(f"Failed to append upload log: {e}")
             raise SheetsAPIError(f"Failed to append upload log: {e}")
 
-    @retry_on_api_error(max_attempts=3)
+    def flush_upload_logs(self) -> int:
+        """
+        Write journaled upload logs to the Dashboard sheet now
+
+        Returns:
+            Number of rows written
+        """
+        return get_upload_log_writer(self.client, self._append_dashboard_rows).flush()
+
+    @retry_on_api_error(max_attempts=3, endpoint='sheets')
+    @scheduled('sheets_write', RequestPriority.LOG_WRITE)
+    def _append_dashboard_rows(self, rows: List[List[Any]]) -> None:
+        """Write a batch of rows to the Dashboard sheet with one append_rows call"""
+        try:
+            worksheet = self._get_worksheet(
+                self.settings.dashboard_sheet_id,
+                self.settings.dashboard_sheet_name
+            )
+            response = worksheet.append_rows(rows)
+        except Exception as e:
+            logger.error(f"Failed to write upload log rows: {e}")
+            raise SheetsAPIError(f"Failed to write upload log rows: {e}")
+
+        # The rows are written; a mirror failure must not trigger a retry
+        try:
+            updated_range = ((response or {}).get('updates') or {}).get('updatedRange')
+            get_upload_log_mirror().add_appended(
+                updated_range,
+                [dict(zip(DASHBOARD_COLUMNS, row)) for row in rows]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to add written rows to upload log mirror: {e}")
+
+    @staticmethod
+    def _metadata_to_row(metadata: DocumentMetadata) -> List[Any]:
+        """Convert metadata to a Dashboard row (18 columns)"""
+        return [
+            metadata.upload_timestamp.isoformat(),
+            metadata.shipment_id,
+            metadata.doc_type,
+            metadata.file_name,
+            metadata.drive_file_id,
+            metadata.drive_url,
+            metadata.drive_folder_id,
+            metadata.uploader,
+            metadata.file_size_bytes,
+            metadata.status.value,
+            metadata.error_message or '',
+            metadata.carrier_name or '',
+            metadata.carrier_mode or '',
+            metadata.origin or '',
+            metadata.destination or '',
+            metadata.extracted_text or '',
+            metadata.extracted_json or '',
+            metadata.embedding_status or ''
+        ]
+
     def get_upload_logs(
         self,
         shipment_id: Optional[str] = None,
@@ -215,24 +328,31 @@ class SheetsService:
         """
         Get upload logs from Dashboard sheet
 
+        Served from the local upload log mirror; the sheet is only read for
+        rows added since the last sync.
+
         Args:
             shipment_id: Filter by shipment ID (optional)
             limit: Maximum number of records to return
 
         Returns:
-            List of upload log records
+            List of upload log records, most recent first
         """
         try:
-            sheet = self.client.open_by_key(self.settings.dashboard_sheet_id)
-            worksheet = sheet.worksheet(self.settings.dashboard_sheet_name)
-
-            records = worksheet.get_all_records()
-
+            mirror = self._sync_upload_log_mirror()
             if shipment_id:
-                records = [r for r in records if r.get('shipment_id') == shipment_id]
-
-            # Return most recent first
-            records = list(reversed(records))[:limit]
+                records = mirror.for_shipment(shipment_id, limit)
+            else:
+                records = mirror.recent(limit)
+
+            # Rows journaled but not yet written are the most recent ones
+            pending_rows = get_upload_log_writer(self.client, self._append_dashboard_rows).pending_rows()
+            pending = [
+                record for record in (dict(zip(DASHBOARD_COLUMNS, row)) for row in reversed(pending_rows))
+                if (not shipment_id or str(record['shipment_id']) == shipment_id)
+                and not mirror.contains(record)
+            ]
+            records = (pending + records)[:limit]
 
             logger.info(f"Retrieved {len(records)} upload logs")
             return records
@@ -240,3 +360,220 @@ class SheetsService:
         except Exception as e:
             logger.error(f"Failed to get upload logs: {e}")
             raise SheetsAPIError(f"Failed to get upload logs: {e}")
+
+    def get_uploaded_doc_types(self, shipment_ids: List[str]) -> Dict[str, List[str]]:
+        """
+        Get the document types uploaded per shipment (document completeness)
+
+        Args:
+            shipment_ids: Shipments to look up
+
+        Returns:
+            shipment_id → sorted doc types with a successful upload; journaled
+            uploads not yet written are included
+        """
+        try:
+            doc_types = self._sync_upload_log_mirror().uploaded_doc_types(shipment_ids)
+
+            wanted = set(str(shipment_id) for shipment_id in shipment_ids)
+            pending_rows = get_upload_log_writer(self.client, self._append_dashboard_rows).pending_rows()
+            for record in (dict(zip(DASHBOARD_COLUMNS, row)) for row in pending_rows):
+                shipment_id = str(record['shipment_id'])
+                if shipment_id in wanted and record['status'] == UploadStatus.UPLOADED.value:
+                    types = doc_types.setdefault(shipment_id, [])
+                    if record['doc_type'] not in types:
+                        types.append(record['doc_type'])
+                        types.sort()
+            return doc_types
+
+        except Exception as e:
+            logger.error(f"Failed to get uploaded document types: {e}")
+            raise SheetsAPIError(f"Failed to get uploaded document types: {e}")
+
+    def _sync_upload_log_mirror(self) -> UploadLogMirror:
+        """
+        Bring the upload log mirror up to date
+
+        When the Sheets read budget is exhausted (or its circuit is open), a
+        built mirror is served as is instead of queueing behind uploads and
+        log writes.
+        """
+        mirror = get_upload_log_mirror()
+        available = not get_circuit_breaker('sheets').is_open and get_request_scheduler().has_budget(
+            'sheets_read', RequestPriority.DASHBOARD_READ
+        )
+        if mirror.is_built and not available:
+            logger.info("Sheets unavailable or read budget exhausted, serving mirrored upload logs")
+        else:
+            mirror.sync(self)
+        return mirror
+
+    @retry_on_api_error(max_attempts=3, endpoint='sheets')
+    @scheduled('sheets_read', RequestPriority.DASHBOARD_READ)
+    def _read_dashboard_rows(self, ranges: List[Tuple[int, int]]) -> List[List[Optional[Dict[str, Any]]]]:
+        """
+        Read Dashboard rows by A1 range with one batch_get
+
+        Args:
+            ranges: (first row, last row) pairs, 1-based and inclusive
+
+        Returns:
+            Per range, one record per row up to its last non-empty row
+            (None for blank rows)
+        """
+        try:
+            key = (self.settings.dashboard_sheet_id, self.settings.dashboard_sheet_name)
+            worksheet = self._get_worksheet(*key)
+            positions = self._get_header_positions(worksheet, key)
+            last_letter = _column_letter(max(positions.values(), default=len(DASHBOARD_COLUMNS)))
+            value_ranges = worksheet.batch_get(
+                [f"A{first_row}:{last_letter}{last_row}" for first_row, last_row in ranges]
+            )
+
+            results = []
+            for value_range in value_ranges:
+                records = []
+                for row in value_range:
+                    if not any(row):
+                        records.append(None)
+                        continue
+                    values = numericise_all(list(row))
+                    records.append({
+                        column: values[positions[column] - 1]
+                        if column in positions and positions[column] <= len(values) else ''
+                        for column in DASHBOARD_COLUMNS
+                    })
+                results.append(records)
+            return results
+        except Exception as e:
+            logger.error(f"Failed to read upload log rows: {e}")
+            raise SheetsAPIError(f"Failed to read upload log rows: {e}")
+
+    @staticmethod
+    def _record_to_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Map SCM 통합 record columns to ShipmentInfo fields"""
+        return {
+            'invoice_no': record.get('인보이스 번호', ''),
+            'ticket_name': record.get('티켓명'),
+            'carrier_name': record.get('carrier_name', ''),
+            'carrier_mode': record.get('carrier_mode', ''),
+            'origin': record.get('출발창고', ''),
+            'destination': record.get('도착창고', ''),
+            'onboard_date': str(record.get('onboard_date', '')),
+            'bl_no': record.get('bl_no'),
+            'status': record.get('status')
+        }
+
+    def _record_to_shipment(self, record: Dict[str, Any]) -> Optional[ShipmentInfo]:
+        """Parse SCM 통합 record into ShipmentInfo (None if invalid)"""
+        try:
+            return ShipmentInfo(**self._record_to_fields(record))
+        except Exception as e:
+            logger.warning(f"Failed to parse shipment record: {e}")
+            return None
+
+    def _get_worksheet(self, sheet_id: str, sheet_name: str) -> gspread.Worksheet:
+        """Open worksheet (cached per instance)"""
+        key = (sheet_id, sheet_name)
+        if key not in self._worksheets:
+            sheet = self.client.open_by_key(sheet_id)
+            try:
+                self._worksheets[key] = sheet.worksheet(sheet_name)
+            except gspread.exceptions.WorksheetNotFound:
+                all_worksheets = [ws.title for ws in sheet.worksheets()]
+                logger.error(f"Worksheet '{sheet_name}' not found. Available: {all_worksheets}")
+                raise SheetsAPIError(
+                    f"워크시트 '{sheet_name}'를 찾을 수 없습니다. "
+                    f"사용 가능한 시트: {', '.join(all_worksheets)}"
+                )
+        return self._worksheets[key]
+
+    def _get_header_positions(
+        self,
+        worksheet: gspread.Worksheet,
+        key: Tuple[str, str],
+        refresh: bool = False
+    ) -> Dict[str, int]:
+        """Resolve header name → column index from the header row (cached)"""
+        if refresh or key not in _header_positions:
+            headers = worksheet.row_values(1)
+            _header_positions[key] = {
+                header: col for col, header in enumerate(headers, start=1) if header
+            }
+            logger.info(f"Resolved {len(headers)} headers for {key[1]}")
+        return _header_positions[key]
+
+    def _read_columns(
+        self,
+        sheet_id: str,
+        sheet_name: str,
+        columns: List[str],
+        numericise: bool = False,
+        rows: Optional[Tuple[int, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Read only the given columns as records (like get_all_records)
+
+        Header positions are resolved once; each read is then a single
+        batch_get of per-column A1 ranges. Every read includes the header
+        row so a moved column is detected and the positions re-resolved.
+
+        Args:
+            sheet_id: Spreadsheet ID
+            sheet_name: Worksheet name
+            columns: Header names to fetch (missing headers read as '')
+            numericise: Convert numeric strings like get_all_records does
+            rows: (first row, last row) window, 1-based and inclusive
+                (default: every row below the header)
+
+        Returns:
+            List of records keyed by header name
+        """
+        key = (sheet_id, sheet_name)
+        worksheet = self._get_worksheet(sheet_id, sheet_name)
+
+        for refresh in (False, True):
+            positions = self._get_header_positions(worksheet, key, refresh=refresh)
+            present = [column for column in columns if column in positions]
+            if not present:
+                return []
+
+            letters = [_column_letter(positions[column]) for column in present]
+            if rows is None:
+                ranges = [f"{letter}1:{letter}" for letter in letters]
+            else:
+                ranges = [f"{letter}1" for letter in letters]
+                ranges += [f"{letter}{rows[0]}:{letter}{rows[1]}" for letter in letters]
+
+            value_ranges = worksheet.batch_get(ranges, major_dimension='COLUMNS')
+            column_values = [vr[0] if vr else [] for vr in value_ranges]
+
+            headers_match = all(
+                values and values[0] == column
+                for column, values in zip(present, column_values)
+            )
+            if headers_match:
+                break
+            logger.warning(f"Header layout changed in {sheet_name}, re-resolving columns")
+        else:
+            raise SheetsAPIError(f"Header layout of '{sheet_name}' could not be resolved")
+
+        if rows is None:
+            column_values = [values[1:] for values in column_values]
+        else:
+            column_values = column_values[len(present):]
+        num_rows = max(len(values) for values in column_values)
+        data = {
+            column: values + [''] * (num_rows - len(values))
+            for column, values in zip(present, column_values)
+        }
+
+        records = []
+        for i in range(num_rows):
+            row = [data[column][i] if column in data else '' for column in columns]
+            if not any(row):
+                continue
+            if numericise:
+                row = numericise_all(row)
+            records.append(dict(zip(columns, row)))
+        return records
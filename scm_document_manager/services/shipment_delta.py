@@ -0,0 +1,214 @@
+"""
+Row-level delta sync for the SCM 통합 shipment list
+
+Every sheet row is fingerprinted by its cell values. When the sheet is read
+again, a row with a known fingerprint keeps the ShipmentStore row added for
+it earlier. Only inserted and changed rows are parsed and stored again, and
+the search index is updated for those rows and for deleted ones. A reload
+after a single status edit therefore parses one row, not the whole sheet.
+
+Replaced rows stay in the append-only store. When they make up more than
+COMPACT_DEAD_RATIO of it, the live rows are copied to a new store and the
+search index is rebuilt over it; snapshots taken before keep the old store.
+
+Each reload yields a ShipmentChangeSet for listeners (see
+ShipmentSnapshotStore.add_listener).
+"""
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from core.models import ShipmentInfo
+from config.logging_config import get_logger
+from .shipment_index import ShipmentSearchIndex
+from .shipment_store import ShipmentRows, ShipmentStore
+
+logger = get_logger(__name__)
+
+# Cell values of a row, in column order
+Fingerprint = Tuple[Any, ...]
+
+# Compact the store once this share of its rows is no longer in the sheet...
+COMPACT_DEAD_RATIO = 0.5
+# ...and at least this many rows are (small stores are not worth rebuilding)
+COMPACT_MIN_DEAD_ROWS = 10_000
+
+
+class ShipmentChangeSet:
+    """Shipments inserted, changed and deleted by one reload"""
+
+    def __init__(
+        self,
+        revision: str,
+        inserted: Sequence[ShipmentInfo],
+        changed: List[Tuple[ShipmentInfo, ShipmentInfo]],
+        deleted: Sequence[ShipmentInfo]
+    ):
+        """
+        Args:
+            revision: Sheet revision the changes lead to
+            inserted: New shipments (ShipmentRows; models are built on access)
+            changed: (old, new) pairs matched by invoice number
+            deleted: Removed shipments (ShipmentRows)
+        """
+        self.revision = revision
+        self.inserted = inserted
+        self.changed = changed
+        self.deleted = deleted
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.inserted or self.changed or self.deleted)
+
+    def __len__(self) -> int:
+        return len(self.inserted) + len(self.changed) + len(self.deleted)
+
+    def __repr__(self) -> str:
+        return (
+            f"ShipmentChangeSet(revision={self.revision!r}, inserted={len(self.inserted)}, "
+            f"changed={len(self.changed)}, deleted={len(self.deleted)})"
+        )
+
+
+class ShipmentDeltaSync:
+    """Shipment rows and search index, updated row by row"""
+
+    def __init__(self):
+        self.store = ShipmentStore()
+        self.index = ShipmentSearchIndex(self.store)
+        # row id → fingerprint of the rows currently in the sheet
+        self._rows: Dict[int, Fingerprint] = {}
+        self._by_fingerprint: Dict[Fingerprint, List[int]] = {}
+        self._order: List[int] = []
+        self._shipments = ShipmentRows(self.store)
+        self._lock = threading.Lock()
+
+    @property
+    def shipments(self) -> ShipmentRows:
+        """Shipments in sheet order"""
+        with self._lock:
+            return self._shipments
+
+    def apply(
+        self,
+        revision: str,
+        records: List[Dict[str, Any]],
+        parse: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+    ) -> ShipmentChangeSet:
+        """
+        Bring the rows up to date with a fresh read of the sheet
+
+        Args:
+            revision: Sheet revision of the records
+            records: All sheet rows as records (same columns on every call)
+            parse: Record → ShipmentInfo fields (None if invalid)
+
+        Returns:
+            Change set of this reload
+        """
+        with self._lock:
+            # Match rows by fingerprint; duplicates are matched in order
+            unmatched = dict(self._by_fingerprint)
+            order: List[int] = []
+            new_rows: List[Tuple[int, Fingerprint, Dict[str, Any]]] = []
+            for record in records:
+                fingerprint = tuple(record.values())
+                row_ids = unmatched.get(fingerprint)
+                if row_ids:
+                    order.append(row_ids[0])
+                    if len(row_ids) == 1:
+                        del unmatched[fingerprint]
+                    else:
+                        unmatched[fingerprint] = row_ids[1:]
+                else:
+                    new_rows.append((len(order), fingerprint, record))
+                    order.append(-1)
+
+            removed_row_ids = [row_id for row_ids in unmatched.values() for row_id in row_ids]
+            if not new_rows and not removed_row_ids and order == self._order:
+                return ShipmentChangeSet(revision, ShipmentRows(self.store), [], ShipmentRows(self.store))
+
+            with self.index.updating():
+                # Removed rows by invoice, to pair them with re-inserted rows
+                removed: Dict[str, List[int]] = {}
+                for row_id in removed_row_ids:
+                    self._forget_fingerprint(self._rows.pop(row_id), row_id)
+                    invoice = self.store.value(row_id, 'invoice_no')
+                    if invoice:
+                        self.index.remove(row_id)
+                        removed.setdefault(invoice, []).append(row_id)
+
+                # Rows that do not parse are stored blank, like rows without an invoice
+                row_ids = self.store.extend([parse(record) or {} for _, _, record in new_rows])
+                inserted: List[int] = []
+                changed: List[Tuple[int, int]] = []
+                for (position, fingerprint, _), row_id, invoice in zip(
+                    new_rows, row_ids, self.store.take(row_ids, 'invoice_no')
+                ):
+                    # Share the strings the store interned instead of keeping the record's
+                    fingerprint = tuple([sys.intern(v) if isinstance(v, str) else v for v in fingerprint])
+                    self._rows[row_id] = fingerprint
+                    self._by_fingerprint.setdefault(fingerprint, []).append(row_id)
+                    order[position] = row_id
+                    if not invoice:
+                        continue
+
+                    self.index.add(row_id)
+                    previous = removed.get(invoice)
+                    if previous:
+                        changed.append((previous.pop(0), row_id))
+                    else:
+                        inserted.append(row_id)
+
+                self._order = order
+                invoices = self.store.take(order, 'invoice_no')
+                self._shipments = ShipmentRows(
+                    self.store, [row_id for row_id, invoice in zip(order, invoices) if invoice]
+                )
+                self.index.set_order(self._shipments.row_ids)
+
+            change_set = ShipmentChangeSet(
+                revision,
+                ShipmentRows(self.store, inserted),
+                [(self.store.get(old), self.store.get(new)) for old, new in changed],
+                ShipmentRows(self.store, [row_id for row_ids in removed.values() for row_id in row_ids])
+            )
+            logger.info(f"Shipment rows synced: {change_set} ({len(new_rows)} rows parsed)")
+
+            dead_rows = len(self.store) - len(self._order)
+            if dead_rows >= COMPACT_MIN_DEAD_ROWS and dead_rows > COMPACT_DEAD_RATIO * len(self.store):
+                self._compact()
+            return change_set
+
+    def _compact(self) -> None:
+        """Move the rows in the sheet to a new store and rebuild the index over it"""
+        dead_rows = len(self.store) - len(self._order)
+        store = self.store.compacted(self._order)
+        index = ShipmentSearchIndex(store)
+        # Row ids in the new store are sheet positions
+        rows = {position: self._rows[row_id] for position, row_id in enumerate(self._order)}
+        by_fingerprint: Dict[Fingerprint, List[int]] = {}
+        for row_id, fingerprint in rows.items():
+            by_fingerprint.setdefault(fingerprint, []).append(row_id)
+
+        with index.updating():
+            live_row_ids = [
+                row_id for row_id, invoice in enumerate(store.take(range(len(store)), 'invoice_no'))
+                if invoice
+            ]
+            for row_id in live_row_ids:
+                index.add(row_id)
+            index.set_order(live_row_ids)
+
+        self.store = store
+        self.index = index
+        self._rows = rows
+        self._by_fingerprint = by_fingerprint
+        self._order = list(range(len(store)))
+        self._shipments = ShipmentRows(store, live_row_ids)
+        logger.info(f"Shipment store compacted: {dead_rows} dead rows dropped, {len(store)} kept")
+
+    def _forget_fingerprint(self, fingerprint: Fingerprint, row_id: int) -> None:
+        row_ids = self._by_fingerprint[fingerprint]
+        row_ids.remove(row_id)
+        if not row_ids:
+            del self._by_fingerprint[fingerprint]
@@ -0,0 +1,185 @@
+"""
+In-memory search index over a shipment snapshot
+
+Built once and then updated row by row, so searches never touch the sheet:
+    - exact hash lookup on invoice_no and bl_no
+    - prefix trie on invoice_no
+    - character n-gram index for substring search on ticket_name / invoice_no
+
+Rows are keyed by their ShipmentStore row id; searches return row ids in
+the order set by set_order() (sheet order).
+"""
+import threading
+from collections import defaultdict
+from typing import DefaultDict, Dict, Iterable, List, Optional, Set, Tuple
+from .shipment_store import ShipmentStore
+
+NGRAM_SIZE = 3
+# Trie depth; longer prefixes are resolved by filtering the bucket at this depth
+TRIE_DEPTH = 8
+_EMPTY: Set[int] = frozenset()
+
+
+def _ngrams(text: str) -> Set[str]:
+    """Split text into overlapping n-grams"""
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class _TrieNode:
+    __slots__ = ('children', 'row_ids')
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.row_ids: Set[int] = set()
+
+
+class ShipmentSearchIndex:
+    """Search index over the rows of a ShipmentStore"""
+
+    def __init__(self, store: ShipmentStore):
+        """
+        Initialize empty index
+
+        Args:
+            store: Store the indexed row ids refer to
+        """
+        self.store = store
+        self._positions: Dict[int, int] = {}
+        self._by_invoice: Dict[str, Set[int]] = {}
+        self._by_bl: Dict[str, Set[int]] = {}
+        self._trie = _TrieNode()
+        self._ngrams: DefaultDict[str, Set[int]] = defaultdict(set)
+        self._texts: Dict[int, str] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, row_id: int) -> None:
+        """Index a store row (placed by the next set_order)"""
+        invoice, ticket, bl_no = self._keys(row_id)
+
+        with self._lock:
+            if invoice:
+                self._by_invoice.setdefault(invoice, set()).add(row_id)
+                self._trie_node(invoice, create=True).row_ids.add(row_id)
+            if bl_no:
+                self._by_bl.setdefault(bl_no, set()).add(row_id)
+
+            # Searchable text for substring matching (NUL never appears in a query)
+            self._texts[row_id] = f"{invoice}\0{ticket}"
+            for gram in _ngrams(invoice) | _ngrams(ticket):
+                self._ngrams[gram].add(row_id)
+
+    def remove(self, row_id: int) -> None:
+        """Drop a row from the index (its store values are still readable)"""
+        with self._lock:
+            if self._texts.pop(row_id, None) is None:
+                return
+            invoice, ticket, bl_no = self._keys(row_id)
+
+            if invoice:
+                self._discard(self._by_invoice, invoice, row_id)
+                node = self._trie_node(invoice)
+                if node is not None:
+                    node.row_ids.discard(row_id)
+            if bl_no:
+                self._discard(self._by_bl, bl_no, row_id)
+            for gram in _ngrams(invoice) | _ngrams(ticket):
+                self._discard(self._ngrams, gram, row_id)
+            self._positions.pop(row_id, None)
+
+    def updating(self) -> threading.RLock:
+        """Lock to hold across several add/remove calls so searches see them at once"""
+        return self._lock
+
+    def set_order(self, row_ids: Iterable[int]) -> None:
+        """Set the result order (sheet order) of the indexed rows"""
+        positions = {row_id: position for position, row_id in enumerate(row_ids)}
+        with self._lock:
+            self._positions = positions
+
+    def search(self, search_term: str) -> List[int]:
+        """
+        Search shipments
+
+        Matches exact invoice/BL numbers, invoice prefixes and substrings of
+        invoice number or ticket name (case-insensitive).
+
+        Args:
+            search_term: Search term
+
+        Returns:
+            Store row ids of the matching shipments, in sheet order
+        """
+        term = search_term.strip().lower()
+        with self._lock:
+            if not term:
+                row_ids: Iterable[int] = self._texts
+            else:
+                row_ids = set()
+                row_ids.update(self._by_invoice.get(term, ()))
+                row_ids.update(self._by_bl.get(term, ()))
+                row_ids.update(self._prefix_row_ids(term))
+                row_ids.update(self._substring_row_ids(term))
+
+            return sorted(row_ids, key=lambda row_id: self._positions.get(row_id, row_id))
+
+    def _keys(self, row_id: int) -> Tuple[str, str, str]:
+        """Lowercase invoice number, ticket name and BL number of a row"""
+        value = self.store.value
+        return (
+            (value(row_id, 'invoice_no') or '').lower(),
+            (value(row_id, 'ticket_name') or '').lower(),
+            (value(row_id, 'bl_no') or '').lower()
+        )
+
+    @staticmethod
+    def _discard(postings: Dict[str, Set[int]], key: str, row_id: int) -> None:
+        row_ids = postings.get(key)
+        if row_ids is not None:
+            row_ids.discard(row_id)
+            if not row_ids:
+                del postings[key]
+
+    def _trie_node(self, invoice: str, create: bool = False) -> Optional[_TrieNode]:
+        node = self._trie
+        for char in invoice[:TRIE_DEPTH]:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[char] = _TrieNode()
+            node = child
+        return node
+
+    def _prefix_row_ids(self, prefix: str) -> Iterable[int]:
+        node = self._trie_node(prefix)
+        if node is None:
+            return []
+
+        row_ids: List[int] = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            row_ids.extend(current.row_ids)
+            stack.extend(current.children.values())
+
+        if len(prefix) > TRIE_DEPTH:
+            row_ids = [row_id for row_id in row_ids if self._texts[row_id].startswith(prefix)]
+        return row_ids
+
+    def _substring_row_ids(self, term: str) -> Iterable[int]:
+        if len(term) < NGRAM_SIZE:
+            # Too short for the n-gram index; scan the prepared texts
+            return [row_id for row_id, text in self._texts.items() if term in text]
+
+        postings = sorted(
+            (self._ngrams.get(gram, _EMPTY) for gram in _ngrams(term)),
+            key=len
+        )
+        if not postings[0]:
+            return []
+
+        candidates = set.intersection(*postings)
+        return [row_id for row_id in candidates if term in self._texts[row_id]]
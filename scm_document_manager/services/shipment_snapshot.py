@@ -0,0 +1,167 @@
+"""
+Process-wide shipment snapshot shared by all Streamlit sessions
+
+The SCM 통합 sheet is read once per spreadsheet revision (Drive modifiedTime)
+instead of once per browser session. Reloads are applied row by row (see
+shipment_delta) to a columnar store (see shipment_store), and each one's
+change set is published to listeners.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, TYPE_CHECKING
+from core.enums import RequestPriority
+from config.settings import get_settings
+from config.logging_config import get_logger
+from .request_scheduler import get_request_scheduler
+from .shipment_delta import ShipmentChangeSet, ShipmentDeltaSync
+from .shipment_index import ShipmentSearchIndex
+from .shipment_store import ShipmentRows
+
+if TYPE_CHECKING:
+    from .sheets_service import SheetsService
+
+logger = get_logger(__name__)
+
+
+class ShipmentSnapshot:
+    """Shipment list loaded at a given sheet revision"""
+
+    def __init__(self, revision: str, shipments: ShipmentRows, index: ShipmentSearchIndex):
+        """
+        Args:
+            revision: Sheet revision
+            shipments: Shipments in sheet order (never modified; models are
+                built on access, use shipments.column() for whole columns)
+            index: Search index over the shipment store. The snapshot store
+                shares one index across revisions and updates it in place,
+                so it always reflects the latest revision.
+        """
+        self.revision = revision
+        self.shipments = shipments
+        self.index = index
+        self.loaded_at = datetime.now(timezone.utc)
+
+    def __len__(self) -> int:
+        return len(self.shipments)
+
+    def search(self, search_term: str) -> ShipmentRows:
+        """Search shipments with the index (see ShipmentSearchIndex.search)"""
+        return ShipmentRows(self.index.store, self.index.search(search_term))
+
+
+class ShipmentSnapshotStore:
+    """Holds the current snapshot and reloads it when the sheet revision changes"""
+
+    def __init__(self, check_interval_seconds: int = 30):
+        """
+        Initialize snapshot store
+
+        Args:
+            check_interval_seconds: Minimum seconds between revision checks
+        """
+        self.check_interval_seconds = check_interval_seconds
+        self._snapshot: Optional[ShipmentSnapshot] = None
+        self._delta = ShipmentDeltaSync()
+        self._listeners: List[Callable[[ShipmentChangeSet], None]] = []
+        self._last_checked = float('-inf')
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[ShipmentChangeSet], None]) -> None:
+        """
+        Call listener with the change set of every reload that changed rows
+
+        The first load is published as all shipments inserted. Listeners run
+        on the reloading thread after the new snapshot is in place; errors
+        are logged and do not affect the reload.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[ShipmentChangeSet], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def get(self, sheets: "SheetsService") -> ShipmentSnapshot:
+        """
+        Get current snapshot, reloading if the sheet revision changed
+
+        Concurrent callers share a single revision check and reload: the
+        first caller holds the lock while the others wait and then reuse
+        its result.
+
+        Args:
+            sheets: Sheets service used for the revision check and reload
+
+        Returns:
+            Current ShipmentSnapshot
+        """
+        if self._is_fresh():
+            return self._snapshot
+
+        change_set = None
+        with self._lock:
+            if self._is_fresh():
+                return self._snapshot
+
+            if self._snapshot is not None and not get_request_scheduler().has_budget(
+                'drive', RequestPriority.DASHBOARD_READ
+            ):
+                logger.info("Drive budget exhausted, serving cached snapshot without revision check")
+                self._last_checked = time.monotonic()
+                return self._snapshot
+
+            try:
+                revision = sheets.get_sheet_revision()
+            except Exception as e:
+                if self._snapshot is None:
+                    raise
+                logger.warning(f"Sheet revision check failed, serving cached snapshot: {e}")
+                self._last_checked = time.monotonic()
+                return self._snapshot
+
+            if self._snapshot is None or self._snapshot.revision != revision:
+                records = sheets.read_shipment_records()
+                change_set = self._delta.apply(revision, records, sheets._record_to_fields)
+                shipments = self._delta.shipments
+                self._snapshot = ShipmentSnapshot(revision, shipments, self._delta.index)
+                logger.info(f"Shipment snapshot loaded: {len(shipments)} shipments (revision {revision})")
+
+            self._last_checked = time.monotonic()
+            snapshot = self._snapshot
+            listeners = list(self._listeners)
+
+        if change_set is not None and not change_set.is_empty:
+            for listener in listeners:
+                try:
+                    listener(change_set)
+                except Exception as e:
+                    logger.warning(f"Shipment change listener failed: {e}")
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Force a revision check on the next get()"""
+        self._last_checked = float('-inf')
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._snapshot is not None
+            and time.monotonic() - self._last_checked < self.check_interval_seconds
+        )
+
+
+_snapshot_store: Optional[ShipmentSnapshotStore] = None
+_snapshot_store_lock = threading.Lock()
+
+
+def get_shipment_snapshot_store() -> ShipmentSnapshotStore:
+    """Get process-wide shipment snapshot store"""
+    global _snapshot_store
+    with _snapshot_store_lock:
+        if _snapshot_store is None:
+            settings = get_settings()
+            _snapshot_store = ShipmentSnapshotStore(
+                check_interval_seconds=settings.shipment_snapshot_check_interval_seconds
+            )
+        return _snapshot_store
@@ -0,0 +1,191 @@
+"""
+Columnar store for SCM 통합 shipment rows
+
+Holding every sheet row as a ShipmentInfo model costs about 1 KB per row
+(model instance, its __dict__ and nine separate strings). The store keeps
+one column per ShipmentInfo field instead:
+    - fields with few distinct values (carrier, mode, warehouses, date,
+      status) as array('I') codes into a table of those values
+    - per-row text (invoice, ticket name, BL number) as interned strings
+
+Rows are addressed by a row id and only ever appended: a row deleted or
+edited in the sheet keeps its values, so snapshots of older revisions stay
+readable. Once enough rows are dead, ShipmentDeltaSync moves the live rows
+to a new store (compacted()) and older snapshots keep the old one.
+ShipmentInfo objects are built on access (values were coerced to
+text when the row was added, so they always validate), so only the rows a
+page displays or an upload targets become models.
+
+A store has one writer (ShipmentDeltaSync, under its lock); readers only
+touch row ids that existed when their ShipmentRows view was made.
+"""
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+from core.models import ShipmentInfo
+
+SHIPMENT_FIELDS = list(ShipmentInfo.model_fields)
+
+# Few distinct values per sheet; stored as codes
+CODED_FIELDS = {'carrier_name', 'carrier_mode', 'origin', 'destination', 'onboard_date', 'status'}
+
+# Required fields fall back to '' instead of None
+_REQUIRED_FIELDS = {name for name, field in ShipmentInfo.model_fields.items() if field.is_required()}
+
+
+class _CodedColumn:
+    """Column of codes into a table of distinct values"""
+
+    __slots__ = ('codes', 'values', '_codes_by_value')
+
+    def __init__(self):
+        self.codes = array('I')
+        self.values: List[Optional[str]] = []
+        self._codes_by_value: Dict[Optional[str], int] = {}
+
+    def extend(self, values: List[Optional[str]]) -> None:
+        codes_by_value = self._codes_by_value
+        codes = [codes_by_value.setdefault(value, len(codes_by_value)) for value in values]
+        if len(codes_by_value) > len(self.values):
+            self.values = list(codes_by_value)
+        self.codes.extend(codes)
+
+    def __getitem__(self, row_id: int) -> Optional[str]:
+        return self.values[self.codes[row_id]]
+
+    def take(self, row_ids: Iterable[int]) -> List[Optional[str]]:
+        values, codes = self.values, self.codes
+        return [values[codes[row_id]] for row_id in row_ids]
+
+
+class _TextColumn:
+    """Column of per-row strings"""
+
+    __slots__ = ('values',)
+
+    def __init__(self):
+        self.values: List[Optional[str]] = []
+
+    def extend(self, values: List[Optional[str]]) -> None:
+        self.values.extend(values)
+
+    def __getitem__(self, row_id: int) -> Optional[str]:
+        return self.values[row_id]
+
+    def take(self, row_ids: Iterable[int]) -> List[Optional[str]]:
+        values = self.values
+        return [values[row_id] for row_id in row_ids]
+
+
+class ShipmentStore:
+    """Append-only shipment rows stored column by column"""
+
+    def __init__(self):
+        self._columns = {
+            name: _CodedColumn() if name in CODED_FIELDS else _TextColumn()
+            for name in SHIPMENT_FIELDS
+        }
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Rows stored, including ones no longer in the sheet"""
+        return self._size
+
+    def extend(self, rows: List[Mapping[str, Any]]) -> range:
+        """
+        Append rows
+
+        Args:
+            rows: ShipmentInfo field → sheet value, per row (missing fields
+                are empty)
+
+        Returns:
+            Row ids of the new rows
+        """
+        intern = sys.intern
+        for name, column in self._columns.items():
+            missing = '' if name in _REQUIRED_FIELDS else None
+            # Interned, so repeated values (and the delta fingerprints) share one string
+            column.extend([
+                missing if value is None else intern(value if isinstance(value, str) else str(value))
+                for value in (fields.get(name) for fields in rows)
+            ])
+        first_row_id = self._size
+        self._size += len(rows)
+        return range(first_row_id, self._size)
+
+    def compacted(self, row_ids: Iterable[int]) -> "ShipmentStore":
+        """
+        Copy rows to a new store
+
+        Args:
+            row_ids: Rows to keep; they get row ids 0, 1, ... in this order
+
+        Returns:
+            New store holding only those rows (this store is left unchanged)
+        """
+        row_ids = list(row_ids)
+        store = ShipmentStore()
+        for name, column in self._columns.items():
+            # Values were interned when first added
+            store._columns[name].extend(column.take(row_ids))
+        store._size = len(row_ids)
+        return store
+
+    def value(self, row_id: int, field: str) -> Optional[str]:
+        """Get one field of a row"""
+        return self._columns[field][row_id]
+
+    def take(self, row_ids: Iterable[int], field: str) -> List[Optional[str]]:
+        """Get one field of several rows, in the given order"""
+        return self._columns[field].take(row_ids)
+
+    def get(self, row_id: int) -> ShipmentInfo:
+        """Build the ShipmentInfo of a row"""
+        return ShipmentInfo(**{
+            name: column[row_id] for name, column in self._columns.items()
+        })
+
+
+class ShipmentRows(Sequence):
+    """
+    Read-only sequence of ShipmentInfo over selected store rows
+
+    Indexing and iteration build models on the fly; column() and find()
+    read the columns directly.
+    """
+
+    def __init__(self, store: ShipmentStore, row_ids: Iterable[int] = ()):
+        """
+        Args:
+            store: Store holding the rows
+            row_ids: Row ids in sequence order
+        """
+        self.store = store
+        self.row_ids = row_ids if isinstance(row_ids, array) else array('I', row_ids)
+
+    def __len__(self) -> int:
+        return len(self.row_ids)
+
+    def __getitem__(self, position: Union[int, slice]) -> Union[ShipmentInfo, "ShipmentRows"]:
+        if isinstance(position, slice):
+            return ShipmentRows(self.store, self.row_ids[position])
+        return self.store.get(self.row_ids[position])
+
+    def __iter__(self) -> Iterator[ShipmentInfo]:
+        return map(self.store.get, self.row_ids)
+
+    def __repr__(self) -> str:
+        return f"ShipmentRows({len(self)} shipments)"
+
+    def column(self, field: str) -> List[Optional[str]]:
+        """Get one field of every row, in sequence order"""
+        return self.store.take(self.row_ids, field)
+
+    def find(self, invoice_no: str) -> Optional[ShipmentInfo]:
+        """Get the first shipment with this invoice number"""
+        for row_id, value in zip(self.row_ids, self.column('invoice_no')):
+            if value == invoice_no:
+                return self.store.get(row_id)
+        return None
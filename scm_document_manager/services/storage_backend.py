@@ -0,0 +1,84 @@
+"""
+Storage backend interface
+
+DocumentService resolves folders and stores files through this interface.
+DriveService is the Google Drive implementation; LocalContentStore keeps
+files in a content-addressed directory tree (on-prem storage, offline runs
+and load tests).
+
+IDs are opaque strings chosen by the backend: file_id / folder_id returned
+by one call are passed back unchanged to the others.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional
+
+
+class StorageBackend(ABC):
+    """Folder and file operations used by the upload pipeline"""
+
+    @abstractmethod
+    def ensure_folder_path(self, folder_path: str, root_folder_id: Optional[str] = None) -> str:
+        """
+        Ensure folder path exists, creating folders as needed
+
+        Args:
+            folder_path: Folder path (e.g., "01_KR_TO_3PL/TA717001250829/BL")
+            root_folder_id: Root folder ID (default: backend's root)
+
+        Returns:
+            Final folder ID
+        """
+
+    @abstractmethod
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        file_name: str,
+        folder_id: str,
+        mime_type: str = 'application/pdf',
+        session_key: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        app_properties: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Store a seekable stream in a folder
+
+        Returns:
+            Dict with file_id and drive_url
+
+        Raises:
+            FolderNotFoundError: If the destination folder no longer exists
+        """
+
+    @abstractmethod
+    def create_shortcut(self, target_file_id: str, shortcut_name: str, folder_id: str) -> Dict[str, Any]:
+        """
+        Make an existing file appear in another folder
+
+        Returns:
+            Dict with shortcut_id and drive_url
+        """
+
+    @abstractmethod
+    def get_file(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get file metadata
+
+        Returns:
+            Dict with id, trashed and webViewLink, or None if the file does not exist
+        """
+
+    @abstractmethod
+    def list_hashed_files(self, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        List stored files with their content hashes
+
+        Yields:
+            Dicts with id, webViewLink, parents, size, md5Checksum and
+            appProperties (sha256), as read by ContentHashIndex.rebuild
+        """
+
+    @abstractmethod
+    def delete_file(self, file_id: str) -> None:
+        """Delete file"""
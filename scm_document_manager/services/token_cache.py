@@ -0,0 +1,202 @@
+"""
+Shared OAuth access-token cache
+
+One service-account access token is shared by every client in the process
+and, through a lock-protected JSON file under the local cache directory, by
+every worker process on the host. A background thread refreshes the token
+before it expires, so API calls find a valid token instead of blocking on a
+refresh; only the process holding the file lock talks to the token endpoint.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from google.auth import credentials as google_credentials
+from google.auth.transport.requests import Request
+from google.oauth2 import service_account
+from config.logging_config import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: cache is shared within the process only
+    fcntl = None
+
+logger = get_logger(__name__)
+
+# Wait before retrying a failed background refresh
+REFRESH_RETRY_SECONDS = 30
+
+
+class AccessTokenCache:
+    """Access token shared across threads and processes, refreshed ahead of expiry"""
+
+    def __init__(
+        self,
+        credentials_info: Dict[str, Any],
+        scopes: List[str],
+        cache_file: Optional[str] = None,
+        refresh_margin_seconds: int = 600
+    ):
+        """
+        Initialize token cache
+
+        Args:
+            credentials_info: Service account key
+            scopes: OAuth scopes of the token
+            cache_file: JSON file shared with other processes (None for
+                process-local only)
+            refresh_margin_seconds: Refresh this many seconds before expiry
+        """
+        self.cache_file = cache_file
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.refreshes = 0
+        self._source = service_account.Credentials.from_service_account_info(
+            credentials_info,
+            scopes=scopes
+        )
+        self._token: Optional[str] = None
+        self._expiry: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def current(self) -> Tuple[Optional[str], Optional[datetime]]:
+        """Get the token held in memory (no I/O)"""
+        return self._token, self._expiry
+
+    def get_token(self, stale_token: Optional[str] = None) -> Tuple[str, datetime]:
+        """
+        Get a token valid for at least the refresh margin
+
+        Uses, in order: the in-memory token, a token another process wrote to
+        the cache file, a new token from the token endpoint.
+
+        Args:
+            stale_token: Token the caller found rejected; never returned again
+
+        Returns:
+            (access token, expiry as naive UTC datetime)
+        """
+        with self._lock:
+            if self._is_usable(self._token, self._expiry, stale_token):
+                return self._token, self._expiry
+
+            with self._file_lock():
+                token, expiry = self._read_file()
+                if not self._is_usable(token, expiry, stale_token):
+                    token, expiry = self._refresh()
+                    self._write_file(token, expiry)
+                self._token, self._expiry = token, expiry
+            self._wakeup.set()
+            return token, expiry
+
+    def start_refresher(self) -> None:
+        """Start the background refresh thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._refresh_loop,
+                name="token-refresher",
+                daemon=True
+            )
+            self._thread.start()
+
+    def _refresh_loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                _, expiry = self.get_token()
+                wait = (expiry - datetime.utcnow()).total_seconds() - self.refresh_margin_seconds
+            except Exception as e:
+                logger.warning(f"Background token refresh failed: {e}")
+                wait = REFRESH_RETRY_SECONDS
+            # Woken early when a request path had to refresh on its own
+            self._wakeup.wait(max(wait, 1))
+
+    def _is_usable(
+        self,
+        token: Optional[str],
+        expiry: Optional[datetime],
+        stale_token: Optional[str]
+    ) -> bool:
+        return (
+            token is not None
+            and token != stale_token
+            and expiry is not None
+            and expiry - datetime.utcnow() > timedelta(seconds=self.refresh_margin_seconds)
+        )
+
+    def _refresh(self) -> Tuple[str, datetime]:
+        """Fetch a new token from the token endpoint (caller holds both locks)"""
+        started = time.monotonic()
+        self._source.refresh(Request())
+        self.refreshes += 1
+        logger.info(f"Access token refreshed in {time.monotonic() - started:.2f}s (expires {self._source.expiry})")
+        return self._source.token, self._source.expiry
+
+    @contextmanager
+    def _file_lock(self):
+        """Hold an exclusive lock shared with other processes"""
+        if not self.cache_file or fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+        with open(f"{self.cache_file}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_file(self) -> Tuple[Optional[str], Optional[datetime]]:
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return None, None
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('client_email') != self._source.service_account_email:
+                return None, None
+            return data['token'], datetime.fromisoformat(data['expiry'])
+        except Exception as e:
+            logger.warning(f"Failed to read token cache {self.cache_file}: {e}")
+            return None, None
+
+    def _write_file(self, token: str, expiry: datetime) -> None:
+        """Write token atomically, readable by the owner only"""
+        if not self.cache_file:
+            return
+        try:
+            tmp_file = f"{self.cache_file}.tmp"
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'client_email': self._source.service_account_email,
+                    'token': token,
+                    'expiry': expiry.isoformat()
+                }, f)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.warning(f"Failed to save token cache {self.cache_file}: {e}")
+
+
+class SharedTokenCredentials(google_credentials.Credentials):
+    """google-auth credentials backed by an AccessTokenCache"""
+
+    def __init__(self, token_cache: AccessTokenCache):
+        super().__init__()
+        self._token_cache = token_cache
+
+    def refresh(self, request) -> None:
+        # Also reached after a 401, so never hand back the rejected token
+        self.token, self.expiry = self._token_cache.get_token(stale_token=self.token)
+
+    def before_request(self, request, method, url, headers) -> None:
+        # Pick up the token the background thread refreshed
+        token, expiry = self._token_cache.current()
+        if token is not None:
+            self.token, self.expiry = token, expiry
+        super().before_request(request, method, url, headers)
@@ -0,0 +1,338 @@
+"""
+Local SQLite mirror of the Dashboard upload log
+
+The Dashboard sheet only grows, so it is mirrored row for row into a local
+SQLite database and upload log reads never touch the sheet:
+    - each sync reads only the rows after the last synced one, as A1 ranges
+      starting at the last synced row (a row that no longer matches means
+      the sheet was edited, and the mirror is rebuilt)
+    - rows this process writes are added from the append response
+    - recent activity, per-shipment history and document completeness are
+      indexed queries (shipment_id, doc_type, upload_timestamp, drive_file_id)
+
+The database lives under settings.cache_dir, so a restarted process only
+reads the rows added since it last ran.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+from core.enums import UploadStatus
+from config.settings import get_settings
+from config.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from .sheets_service import SheetsService
+
+logger = get_logger(__name__)
+
+# Dashboard 시트 헤더 (DocumentMetadata 18개 컬럼)
+DASHBOARD_COLUMNS = [
+    'upload_timestamp',
+    'shipment_id',
+    'doc_type',
+    'file_name',
+    'drive_file_id',
+    'drive_url',
+    'drive_folder_id',
+    'uploader',
+    'file_size_bytes',
+    'status',
+    'error_message',
+    'carrier_name',
+    'carrier_mode',
+    'origin',
+    'destination',
+    'extracted_text',
+    'extracted_json',
+    'embedding_status'
+]
+
+# Stored as text so lookups match regardless of how the sheet typed them
+INDEXED_COLUMNS = ['shipment_id', 'doc_type', 'upload_timestamp', 'drive_file_id']
+_TEXT_COLUMNS = set(INDEXED_COLUMNS) | {'file_name', 'status'}
+
+# Rows read per A1 range while catching up
+SYNC_BATCH_ROWS = 5000
+
+# SQLite host parameter limit is 999 on older builds
+_MAX_PARAMS = 500
+
+_UPDATED_RANGE = re.compile(r"![A-Z]+(\d+)(?::[A-Z]+(\d+))?$")
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS upload_log (row INTEGER PRIMARY KEY, " + ', '.join(
+        f"{column} TEXT" if column in _TEXT_COLUMNS else column for column in DASHBOARD_COLUMNS
+    ) + ")",
+    *[
+        f"CREATE INDEX IF NOT EXISTS idx_upload_log_{column} ON upload_log ({column}, row)"
+        for column in INDEXED_COLUMNS
+    ],
+    # Covers document completeness queries without touching the table
+    "CREATE INDEX IF NOT EXISTS idx_upload_log_completeness ON upload_log (shipment_id, status, doc_type)"
+]
+
+
+def row_key(record: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Identity of a log row (upload time, file name, file ID)"""
+    return (
+        str(record.get('upload_timestamp', '')),
+        str(record.get('file_name', '')),
+        str(record.get('drive_file_id', ''))
+    )
+
+
+class UploadLogMirror:
+    """Row-for-row SQLite copy of the Dashboard sheet"""
+
+    def __init__(
+        self,
+        db_path: str,
+        sheet_key: str,
+        sync_interval_seconds: float = 10.0,
+        batch_rows: int = SYNC_BATCH_ROWS
+    ):
+        """
+        Initialize mirror (opens or creates the database)
+
+        Args:
+            db_path: SQLite database file (':memory:' for a throwaway mirror)
+            sheet_key: Identifies the mirrored sheet; a database holding
+                another sheet's rows is cleared
+            sync_interval_seconds: Minimum seconds between reads of new rows
+                (rows written by this process are added immediately)
+            batch_rows: Rows per A1 range read while catching up
+        """
+        self.db_path = db_path
+        self.sheet_key = sheet_key
+        self.sync_interval_seconds = sync_interval_seconds
+        self.batch_rows = batch_rows
+        self._last_synced = float('-inf')
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+        self._last_row = self._load_last_row()
+
+    @property
+    def is_built(self) -> bool:
+        return self._last_row is not None
+
+    @property
+    def last_row(self) -> Optional[int]:
+        """Last synced sheet row (1 = header only)"""
+        return self._last_row
+
+    def sync(self, sheets: "SheetsService", force: bool = False) -> int:
+        """
+        Read rows appended since the last sync
+
+        Args:
+            sheets: Sheets service used for the reads
+            force: Ignore the sync interval
+
+        Returns:
+            Number of new rows
+        """
+        with self._lock:
+            if (
+                not force
+                and self._last_row is not None
+                and time.monotonic() - self._last_synced < self.sync_interval_seconds
+            ):
+                return 0
+
+            # Another process sharing the database may have synced further
+            self._last_row = self._load_last_row()
+            building = self._last_row is None
+            added = 0
+            while True:
+                anchor_row = self._last_row or 1
+                records = sheets._read_dashboard_rows([(anchor_row, anchor_row + self.batch_rows)])[0]
+                if anchor_row > 1 and not self._matches(anchor_row, records[0] if records else None):
+                    logger.warning("Dashboard rows changed outside appends, rebuilding upload log mirror")
+                    self._clear()
+                    building = True
+                    added = 0
+                    continue
+                self._insert(list(enumerate(records[1:], start=anchor_row + 1)))
+                self._set_last_row(max(anchor_row, anchor_row + len(records) - 1))
+                added += max(len(records) - 1, 0)
+                if len(records) <= self.batch_rows:
+                    break
+
+            self._last_synced = time.monotonic()
+            if building:
+                logger.info(f"Upload log mirror built: {self._last_row - 1} rows")
+            elif added:
+                logger.info(f"Upload log mirror synced: {added} new rows (last row {self._last_row})")
+            return added
+
+    def add_appended(self, updated_range: Optional[str], records: List[Dict[str, Any]]) -> None:
+        """
+        Add rows this process just appended
+
+        Args:
+            updated_range: A1 range from the append response (e.g. "'dashboard'!A12:R14")
+            records: Appended rows as records, in order
+        """
+        match = _UPDATED_RANGE.search(updated_range or '')
+        if not match:
+            return
+        first_row = int(match.group(1))
+        with self._lock:
+            # Rows appended by others in between are picked up by the next sync
+            if self._last_row is None or first_row != self._last_row + 1:
+                return
+            self._insert(list(enumerate(records, start=first_row)))
+            self._set_last_row(first_row + len(records) - 1)
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        """Get the most recent rows, newest first"""
+        return self._select("ORDER BY row DESC LIMIT ?", (limit,))
+
+    def for_shipment(self, shipment_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Get a shipment's rows, newest first"""
+        return self._select("WHERE shipment_id = ? ORDER BY row DESC LIMIT ?", (str(shipment_id), limit))
+
+    def uploaded_doc_types(self, shipment_ids: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Get the document types uploaded per shipment
+
+        Args:
+            shipment_ids: Shipments to look up
+
+        Returns:
+            shipment_id → sorted doc types with a successful upload (shipments
+            without any are omitted)
+        """
+        shipment_ids = list(dict.fromkeys(str(shipment_id) for shipment_id in shipment_ids))
+        doc_types: Dict[str, List[str]] = {}
+        with self._lock:
+            for start in range(0, len(shipment_ids), _MAX_PARAMS):
+                chunk = shipment_ids[start:start + _MAX_PARAMS]
+                cursor = self._conn.execute(
+                    "SELECT DISTINCT shipment_id, doc_type FROM upload_log "
+                    f"WHERE shipment_id IN ({', '.join('?' * len(chunk))}) AND status = ? "
+                    "ORDER BY shipment_id, doc_type",
+                    (*chunk, UploadStatus.UPLOADED.value)
+                )
+                for shipment_id, doc_type in cursor:
+                    doc_types.setdefault(shipment_id, []).append(doc_type)
+        return doc_types
+
+    def contains(self, record: Dict[str, Any]) -> bool:
+        """Check whether a row with the same identity is mirrored"""
+        upload_timestamp, file_name, drive_file_id = row_key(record)
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM upload_log WHERE drive_file_id = ? AND file_name = ? AND upload_timestamp = ?",
+                (drive_file_id, file_name, upload_timestamp)
+            ).fetchone() is not None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ===== internals =====
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, recreating it if it is unreadable"""
+        if self.db_path == ':memory:':
+            return self._open()
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        try:
+            return self._open()
+        except sqlite3.DatabaseError as e:
+            # Only a cache: start over from the sheet
+            logger.warning(f"Upload log mirror unreadable, recreating {self.db_path}: {e}")
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(self.db_path + suffix):
+                    os.unlink(self.db_path + suffix)
+            return self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        """Open the database and create the schema (clears another sheet's rows)"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        try:
+            if self.db_path != ':memory:':
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                stored_key = conn.execute("SELECT value FROM meta WHERE key = 'sheet'").fetchone()
+                if stored_key is None or stored_key[0] != self.sheet_key:
+                    conn.execute("DELETE FROM upload_log")
+                    conn.execute("DELETE FROM meta")
+                    conn.execute("INSERT INTO meta (key, value) VALUES ('sheet', ?)", (self.sheet_key,))
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+    def _load_last_row(self) -> Optional[int]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'last_row'").fetchone()
+        return int(row[0]) if row else None
+
+    def _set_last_row(self, last_row: int) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_row', ?)", (str(last_row),)
+            )
+        self._last_row = last_row
+
+    def _clear(self) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM upload_log")
+            self._conn.execute("DELETE FROM meta WHERE key = 'last_row'")
+        self._last_row = None
+
+    def _insert(self, rows: List[Tuple[int, Optional[Dict[str, Any]]]]) -> None:
+        values = [
+            (row, *[
+                str(record.get(column, '')) if column in _TEXT_COLUMNS else record.get(column, '')
+                for column in DASHBOARD_COLUMNS
+            ])
+            for row, record in rows
+            if record is not None
+        ]
+        if not values:
+            return
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO upload_log (row, {', '.join(DASHBOARD_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (len(DASHBOARD_COLUMNS) + 1))})",
+                values
+            )
+
+    def _select(self, clause: str, params: Tuple[Any, ...]) -> List[Dict[str, Any]]:
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT {', '.join(DASHBOARD_COLUMNS)} FROM upload_log {clause}", params)
+            return [dict(zip(DASHBOARD_COLUMNS, values)) for values in cursor]
+
+    def _matches(self, row: int, record: Optional[Dict[str, Any]]) -> bool:
+        stored = self._select("WHERE row = ?", (row,))
+        if not stored:
+            # Blank row when it was synced; nothing to compare against
+            return True
+        return record is not None and row_key(record) == row_key(stored[0])
+
+
+_upload_log_mirror: Optional[UploadLogMirror] = None
+_upload_log_mirror_lock = threading.Lock()
+
+
+def get_upload_log_mirror() -> UploadLogMirror:
+    """Get process-wide upload log mirror"""
+    global _upload_log_mirror
+    with _upload_log_mirror_lock:
+        if _upload_log_mirror is None:
+            settings = get_settings()
+            _upload_log_mirror = UploadLogMirror(
+                db_path=os.path.join(settings.cache_dir, 'upload_log.sqlite3'),
+                sheet_key=f"{settings.dashboard_sheet_id}/{settings.dashboard_sheet_name}",
+                sync_interval_seconds=settings.upload_log_sync_interval_seconds
+            )
+        return _upload_log_mirror
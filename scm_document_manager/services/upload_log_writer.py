@@ -0,0 +1,335 @@
+"""
+Write-behind writer for Dashboard upload log rows
+
+Rows are appended to a local JSONL journal (fsync'd) and the upload is
+considered logged at that point. A background thread flushes queued rows to
+the Dashboard sheet with a single append_rows call per batch, triggered by
+batch size or flush interval.
+
+Each writer owns its journal file (one per process and sheet client) and
+holds an exclusive flock on it while alive. At startup a writer takes over
+journals whose owner has exited (their lock is free, e.g. after a crash):
+the rows are copied into its own journal, the old file is removed and the
+rows are written again.
+
+Delivery is at-least-once: rows leave the journal only after append_rows
+returns, so a batch whose response is lost (timeout after the sheet applied
+it) or whose journal was taken over after a crash is written again, and the
+Dashboard gets those rows twice.
+
+Rows the Sheets API rejects for good (see utils.retry.rejected_status) are
+moved to a dead-letter file next to the journals instead of blocking every
+later row; a batch rejected as malformed (400) is split to find the bad
+rows. Transient failures keep the rows queued.
+"""
+import atexit
+import glob
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, IO, List, Tuple
+from config.settings import get_settings
+from config.logging_config import get_logger
+from utils.retry import rejected_status
+
+try:
+    import fcntl
+except ImportError:  # Windows: journals of exited processes are not taken over
+    fcntl = None
+
+logger = get_logger(__name__)
+
+# Upper bound on rows per append_rows request
+MAX_ROWS_PER_FLUSH = 500
+
+# Journal files in the cache directory: upload_log_journal.<pid>.<writer>.jsonl
+JOURNAL_PREFIX = 'upload_log_journal'
+
+# Rows the sheet rejected, one JSON object per line ({"row", "error", "rejected_at"})
+DEAD_LETTER_FILE = 'upload_log_dead_letter.jsonl'
+
+
+def _lock_journal(f: IO, path: str, blocking: bool = True) -> bool:
+    """
+    Take the exclusive lock on an open journal file
+
+    Returns:
+        True if locked and the file is still the one at path (another
+        process may have taken it over and removed it meanwhile)
+    """
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    try:
+        return os.stat(path).st_ino == os.fstat(f.fileno()).st_ino
+    except FileNotFoundError:
+        return False
+
+
+def _read_rows(f: IO) -> List[List[Any]]:
+    rows = []
+    f.seek(0)
+    for line in f:
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError:
+            # Torn write from a crash mid-append
+            logger.warning("Skipping corrupt upload log journal line")
+    return rows
+
+
+def _write_rows(f: IO, rows: List[List[Any]]) -> None:
+    for row in rows:
+        f.write(json.dumps(row, ensure_ascii=False) + '\n')
+    f.flush()
+    os.fsync(f.fileno())
+
+
+class UploadLogWriter:
+    """Journaled, batched writer for Dashboard rows"""
+
+    def __init__(
+        self,
+        append_rows: Callable[[List[List[Any]]], None],
+        journal_path: str,
+        batch_size: int = 50,
+        flush_interval_seconds: float = 5.0
+    ):
+        """
+        Initialize writer and replay any unflushed journal rows
+
+        Args:
+            append_rows: Function writing a batch of rows to the sheet
+            journal_path: Local JSONL journal file owned by this writer
+            batch_size: Pending row count that triggers an immediate flush
+            flush_interval_seconds: Maximum delay before queued rows are flushed
+        """
+        self.append_rows = append_rows
+        self.journal_path = journal_path
+        self.dead_letter_path = os.path.join(os.path.dirname(journal_path) or '.', DEAD_LETTER_FILE)
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+
+        self._pending: List[List[Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+        self._journal = self._open_journal()
+        self._replay_journal()
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name="upload-log-writer",
+            daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def enqueue(self, rows: List[List[Any]]) -> None:
+        """
+        Journal rows for writing to the sheet
+
+        Returns once the rows are durable on local disk.
+
+        Args:
+            rows: Dashboard rows (18 columns each)
+        """
+        if not rows:
+            return
+
+        with self._lock:
+            _write_rows(self._journal, rows)
+            self._pending.extend(rows)
+            pending_count = len(self._pending)
+
+        if pending_count >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        Write all pending rows to the sheet
+
+        Rows the sheet rejects for good go to the dead-letter file.
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            Exception: From append_rows on a transient failure (the rows
+                stay queued and journaled)
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = self._pending[:MAX_ROWS_PER_FLUSH]
+                if not batch:
+                    return written
+
+                rejected = self._append_batch(batch)
+                if rejected:
+                    self._dead_letter(rejected)
+
+                with self._lock:
+                    # Only flush removes rows and enqueue only appends, so the
+                    # written batch is still the head of the queue
+                    del self._pending[:len(batch)]
+                    self._rewrite_journal()
+                written += len(batch) - len(rejected)
+                logger.info(f"Flushed {len(batch) - len(rejected)} upload log rows to Dashboard sheet")
+
+    def pending_rows(self) -> List[List[Any]]:
+        """Get rows journaled but not yet written to the sheet"""
+        with self._lock:
+            return list(self._pending)
+
+    def close(self) -> None:
+        """Stop background thread and flush remaining rows"""
+        self._stopped = True
+        self._wakeup.set()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning(f"Upload log rows left in journal for replay: {e}")
+
+    def _append_batch(self, rows: List[List[Any]]) -> List[Tuple[List[Any], str]]:
+        """
+        Append rows, setting aside the ones the sheet rejects for good
+
+        Returns:
+            (row, error) for every rejected row
+        """
+        try:
+            self.append_rows(rows)
+            return []
+        except Exception as e:
+            status = rejected_status(e)
+            if status is None:
+                raise
+            if status != 400 or len(rows) == 1:
+                return [(row, str(e)) for row in rows]
+            # Malformed request: split the batch to isolate the bad rows
+            middle = len(rows) // 2
+            return self._append_batch(rows[:middle]) + self._append_batch(rows[middle:])
+
+    def _dead_letter(self, rejected: List[Tuple[List[Any], str]]) -> None:
+        """Append rejected rows to the dead-letter file (durable before they leave the journal)"""
+        rejected_at = datetime.now(timezone.utc).isoformat()
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+            for row, error in rejected:
+                f.write(json.dumps({'row': row, 'error': error, 'rejected_at': rejected_at}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        logger.error(
+            f"Dashboard sheet rejected {len(rejected)} upload log rows, moved to {self.dead_letter_path}: "
+            f"{rejected[0][1]}"
+        )
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wakeup.wait(timeout=self.flush_interval_seconds)
+            self._wakeup.clear()
+            if self._stopped:
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Upload log flush failed, will retry: {e}")
+
+    def _open_journal(self) -> IO:
+        """Open and lock this writer's journal file"""
+        os.makedirs(os.path.dirname(self.journal_path) or '.', exist_ok=True)
+        while True:
+            f = open(self.journal_path, 'a+', encoding='utf-8')
+            if _lock_journal(f, self.journal_path):
+                return f
+            # Taken over and removed by another process (reused pid); reopen
+            f.close()
+
+    def _replay_journal(self) -> None:
+        """Load unflushed rows from this journal and from journals of exited processes"""
+        # Left by an exited process whose pid this one reuses
+        self._pending.extend(_read_rows(self._journal))
+        if fcntl is not None:
+            self._take_over_journals()
+
+        if self._pending:
+            logger.info(f"Replaying {len(self._pending)} unflushed upload log rows")
+            self._wakeup.set()
+
+    def _take_over_journals(self) -> None:
+        """Move rows from journals of exited writers into this one"""
+        journal_dir = os.path.dirname(self.journal_path) or '.'
+        for path in sorted(glob.glob(os.path.join(journal_dir, f"{JOURNAL_PREFIX}.*.jsonl"))):
+            if os.path.abspath(path) == os.path.abspath(self.journal_path):
+                continue
+            try:
+                f = open(path, 'r', encoding='utf-8')
+            except FileNotFoundError:
+                continue
+            with f:
+                # A held lock means the owning writer is still running
+                if not _lock_journal(f, path, blocking=False):
+                    continue
+                rows = _read_rows(f)
+                # Copy before removing, so a crash here duplicates rather than loses rows
+                _write_rows(self._journal, rows)
+                os.remove(path)
+            if rows:
+                logger.info(f"Taking over {len(rows)} upload log rows from {os.path.basename(path)}")
+            self._pending.extend(rows)
+
+    def _rewrite_journal(self) -> None:
+        """Drop flushed rows from the journal (caller holds _lock)"""
+        if not self._pending:
+            self._journal.truncate(0)
+            os.fsync(self._journal.fileno())
+            return
+
+        # Rows were enqueued during the flush: swap in a journal holding only
+        # those, locked before it replaces the old file
+        tmp_path = f"{self.journal_path}.tmp"
+        f = open(tmp_path, 'w', encoding='utf-8')
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        _write_rows(f, self._pending)
+        os.replace(tmp_path, self.journal_path)
+        self._journal.close()
+        self._journal = f
+
+
+# id(sheets client) → writer; a writer keeps its client alive, so ids stay unique
+_writers: Dict[int, UploadLogWriter] = {}
+_writer_lock = threading.Lock()
+
+
+def get_upload_log_writer(
+    client: Any,
+    append_rows: Callable[[List[List[Any]]], None]
+) -> UploadLogWriter:
+    """
+    Get the upload log writer for a Sheets client
+
+    Args:
+        client: gspread client the rows are written with
+        append_rows: Sheet write function using that client (used when its
+            writer is first created)
+    """
+    with _writer_lock:
+        writer = _writers.get(id(client))
+        if writer is None:
+            settings = get_settings()
+            journal_name = f"{JOURNAL_PREFIX}.{os.getpid()}.{len(_writers)}.jsonl"
+            writer = _writers[id(client)] = UploadLogWriter(
+                append_rows=append_rows,
+                journal_path=os.path.join(settings.cache_dir, journal_name),
+                batch_size=settings.upload_log_batch_size,
+                flush_interval_seconds=settings.upload_log_flush_interval_seconds
+            )
+        return writer
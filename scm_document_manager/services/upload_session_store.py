@@ -0,0 +1,100 @@
+"""
+Persistent store of Drive resumable upload sessions
+
+Each in-progress upload saves its resumable session URI and last confirmed
+byte offset, so an interrupted upload (network error or process restart)
+resumes from that offset instead of byte zero.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+from config.settings import get_settings
+from config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Drive resumable session URIs expire after one week
+SESSION_MAX_AGE_SECONDS = 6 * 24 * 3600
+
+
+class UploadSessionStore:
+    """JSON-file backed map of session key → resumable upload state"""
+
+    def __init__(self, store_file: Optional[str] = None):
+        """
+        Initialize session store
+
+        Args:
+            store_file: JSON file used for persistence (None for memory only)
+        """
+        self.store_file = store_file
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def get(self, session_key: str) -> Optional[Dict[str, Any]]:
+        """Get saved session state (resumable_uri, progress, ...) if any"""
+        with self._lock:
+            session = self._sessions.get(session_key)
+            if session and time.time() - session['created_at'] > SESSION_MAX_AGE_SECONDS:
+                del self._sessions[session_key]
+                self._save()
+                return None
+            return dict(session) if session else None
+
+    def save(self, session_key: str, resumable_uri: str, progress: int) -> None:
+        """Record session URI and last confirmed byte offset"""
+        with self._lock:
+            session = self._sessions.get(session_key)
+            if session is None or session['resumable_uri'] != resumable_uri:
+                session = {'resumable_uri': resumable_uri, 'created_at': time.time()}
+                self._sessions[session_key] = session
+            session['progress'] = progress
+            self._save()
+
+    def remove(self, session_key: str) -> None:
+        """Forget a finished or abandoned session"""
+        with self._lock:
+            if self._sessions.pop(session_key, None) is not None:
+                self._save()
+
+    def _load(self) -> None:
+        if not self.store_file or not os.path.exists(self.store_file):
+            return
+        try:
+            with open(self.store_file, 'r', encoding='utf-8') as f:
+                self._sessions = json.load(f)
+            if self._sessions:
+                logger.info(f"Loaded {len(self._sessions)} resumable upload sessions")
+        except Exception as e:
+            logger.warning(f"Failed to load upload sessions {self.store_file}: {e}")
+
+    def _save(self) -> None:
+        if not self.store_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.store_file) or '.', exist_ok=True)
+            tmp_file = f"{self.store_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._sessions, f)
+            os.replace(tmp_file, self.store_file)
+        except Exception as e:
+            logger.warning(f"Failed to save upload sessions {self.store_file}: {e}")
+
+
+_session_store: Optional[UploadSessionStore] = None
+_session_store_lock = threading.Lock()
+
+
+def get_upload_session_store() -> UploadSessionStore:
+    """Get process-wide upload session store"""
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            settings = get_settings()
+            _session_store = UploadSessionStore(
+                store_file=os.path.join(settings.cache_dir, 'upload_sessions.json')
+            )
+        return _session_store
@@ -0,0 +1,171 @@
+"""
+Benchmark harness
+
+Each benchmark is compared against tests/benchmarks/baselines.json:
+    - time: median of several rounds (GC disabled). CPU-bound benchmarks are
+      stored in calibration units (multiples of a fixed pure-Python loop
+      timed alongside each round) so baselines recorded on another machine
+      stay comparable; latency-bound ones (simulated API latency) in seconds.
+    - api_calls: calls made to the fake backends per call, which must never
+      exceed the baseline.
+
+A timing over the threshold is measured again before the benchmark fails,
+so a single noisy run does not fail the suite.
+
+Environment:
+    BENCH_THRESHOLD: Allowed slowdown over baseline (default 0.5 = 50%)
+    BENCH_UPDATE_BASELINES=1: Record current results as the new baselines
+"""
+import gc
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+import pytest
+from config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+BASELINES_FILE = os.path.join(os.path.dirname(__file__), 'baselines.json')
+DEFAULT_THRESHOLD = 0.5
+# CPU-bound rounds repeat the call until they last at least this long
+MIN_ROUND_SECONDS = 0.05
+
+
+def _calibrate() -> float:
+    """Time a fixed pure-Python workload (dict, string and arithmetic ops)"""
+    started = time.perf_counter()
+    table: Dict[str, int] = {}
+    for i in range(20_000):
+        key = f"INV{i % 5000:06d}".lower()
+        table[key] = table.get(key, 0) + i * i
+    return time.perf_counter() - started
+
+
+class Benchmark:
+    """Runs benchmarks and checks them against recorded baselines"""
+
+    def __init__(self, baselines: Dict[str, Dict[str, Any]], threshold: float, update: bool):
+        self.baselines = baselines
+        self.threshold = threshold
+        self.update = update
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def __call__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        rounds: int = 7,
+        setup: Optional[Callable[[], Any]] = None,
+        count_calls: Optional[Callable[[], int]] = None,
+        cpu_bound: bool = True
+    ) -> float:
+        """
+        Run a benchmark and fail on regression
+
+        Args:
+            name: Baseline key
+            func: Code under test (one call)
+            rounds: Rounds to run; the median counts
+            setup: Called before each round, untimed (rounds then make a
+                single call)
+            count_calls: Returns the fake backends' total call count
+            cpu_bound: Store time in calibration units instead of seconds
+
+        Returns:
+            Median time per call, in the benchmark's unit
+        """
+        unit = 'calibration' if cpu_bound else 'seconds'
+        number = self._autorange(func) if cpu_bound and setup is None else 1
+        median, calls = self._measure(func, rounds, number, setup, count_calls, cpu_bound)
+
+        baseline = self.baselines.get(name)
+        if not self.update and baseline is not None and baseline.get('unit') == unit:
+            limit = baseline['time'] * (1 + self.threshold)
+            if median > limit:
+                logger.info(f"Benchmark {name} over limit ({median:.4f} > {limit:.4f}), measuring again")
+                median = min(median, self._measure(func, rounds, number, setup, count_calls, cpu_bound)[0])
+
+        result = {'unit': unit, 'time': round(median, 4)}
+        if calls is not None:
+            result['api_calls'] = calls
+        self.results[name] = result
+
+        if self.update or baseline is None:
+            logger.info(f"Benchmark {name}: {result} (no baseline check)")
+            return median
+
+        failures = []
+        if baseline.get('unit') == unit and median > baseline['time'] * (1 + self.threshold):
+            failures.append(
+                f"time {result['time']} {unit} > {baseline['time'] * (1 + self.threshold):.4f} "
+                f"(baseline {baseline['time']} +{self.threshold:.0%})"
+            )
+        if 'api_calls' in baseline and calls is not None and calls > baseline['api_calls']:
+            failures.append(f"api_calls {calls} > baseline {baseline['api_calls']}")
+        if failures:
+            pytest.fail(f"Benchmark {name} regressed: " + '; '.join(failures))
+        return median
+
+    @staticmethod
+    def _measure(
+        func: Callable[[], Any],
+        rounds: int,
+        number: int,
+        setup: Optional[Callable[[], Any]],
+        count_calls: Optional[Callable[[], int]],
+        cpu_bound: bool
+    ) -> Tuple[float, Optional[int]]:
+        """Median time per call and API calls per call"""
+        samples = []
+        calls = None
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for _ in range(rounds):
+                if setup is not None:
+                    setup()
+                # Calibrated every round so both timings see the same machine load
+                calibration = min(_calibrate(), _calibrate()) if cpu_bound else 1.0
+                calls_before = count_calls() if count_calls else 0
+                started = time.perf_counter()
+                for _ in range(number):
+                    func()
+                samples.append((time.perf_counter() - started) / number / calibration)
+                if count_calls is not None:
+                    calls = (count_calls() - calls_before) // number
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        samples.sort()
+        return samples[len(samples) // 2], calls
+
+    @staticmethod
+    def _autorange(func: Callable[[], Any]) -> int:
+        """Calls per round needed to last MIN_ROUND_SECONDS (like timeit)"""
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        return max(1, int(MIN_ROUND_SECONDS / max(elapsed, 1e-6)))
+
+
+@pytest.fixture(scope='session')
+def bench():
+    """Benchmark runner; writes baselines at session end when updating"""
+    baselines: Dict[str, Dict[str, Any]] = {}
+    if os.path.exists(BASELINES_FILE):
+        with open(BASELINES_FILE, 'r', encoding='utf-8') as f:
+            baselines = json.load(f)
+
+    runner = Benchmark(
+        baselines,
+        threshold=float(os.environ.get('BENCH_THRESHOLD', DEFAULT_THRESHOLD)),
+        update=os.environ.get('BENCH_UPDATE_BASELINES') == '1'
+    )
+    yield runner
+
+    if runner.update and runner.results:
+        baselines.update(runner.results)
+        with open(BASELINES_FILE, 'w', encoding='utf-8') as f:
+            json.dump(dict(sorted(baselines.items())), f, indent=2)
+            f.write('\n')
@@ -0,0 +1,326 @@
+"""
+Hot-path benchmarks against the offline fakes
+
+Run:
+    pytest tests/benchmarks -m benchmark -q
+    BENCH_UPDATE_BASELINES=1 pytest tests/benchmarks -m benchmark -q   # re-record
+"""
+import itertools
+from datetime import datetime
+from typing import List
+import pytest
+from core.models import DocumentMetadata, ShipmentInfo
+from services import shipment_snapshot, upload_log_mirror
+from services.document_service import DocumentService
+from services.drive_service import DriveService
+from services.folder_cache import FolderCache
+from services.local_store import LocalContentStore
+from services.sheets_service import DASHBOARD_COLUMNS, SHIPMENT_COLUMNS, SheetsService
+from tests.fakes import FakeDriveAPI, FakeGspreadClient
+from ui.components.shipment_table import ShipmentFrame
+
+pytestmark = pytest.mark.benchmark
+
+# Simulated round-trip latency for the latency-bound benchmarks
+API_LATENCY_SECONDS = 0.002
+
+CARRIERS = [('CJ', '해운'), ('KW', '특송'), ('DHL', '항공')]
+ROUTES = [('태광KR', 'AMZUS'), ('태광KR', 'CJ서부US'), ('CJ서부US', 'AMZUS')]
+
+
+def _shipment_rows(count: int) -> List[List[str]]:
+    rows = [list(SHIPMENT_COLUMNS)]
+    for i in range(count):
+        carrier_name, carrier_mode = CARRIERS[i % len(CARRIERS)]
+        origin, destination = ROUTES[i % len(ROUTES)]
+        rows.append([
+            f"TA{254000000000 + i}",
+            f"{carrier_name} {destination} 발송 #{i}",
+            carrier_name,
+            carrier_mode,
+            origin,
+            destination,
+            f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            f"BL{i:08d}",
+            'DELIVERED' if i % 4 == 0 else 'IN_TRANSIT'
+        ])
+    return rows
+
+
+def _dashboard_rows(count: int) -> List[List[str]]:
+    rows = [list(DASHBOARD_COLUMNS)]
+    for i in range(count):
+        record = {
+            'upload_timestamp': f"2025-10-{i % 28 + 1:02d} 09:{i % 60:02d}:{i % 60:02d}",
+            'shipment_id': f"TA{254000000000 + i % 500}",
+            'doc_type': 'Bill of Lading',
+            'file_name': f"20251030_BL_{i}.pdf",
+            'drive_file_id': f"F{i}",
+            'drive_url': f"https://drive.fake/F{i}",
+            'uploader': '전용수',
+            'file_size_bytes': '123456',
+            'status': 'uploaded'
+        }
+        rows.append([record.get(column, '') for column in DASHBOARD_COLUMNS])
+    return rows
+
+
+def _sheets_client(shipments: int = 0, latency: float = 0.0, upload_logs: int = 0) -> FakeGspreadClient:
+    client = FakeGspreadClient(latency=latency)
+    client.add_spreadsheet('SCM').add_worksheet('SCM_통합', _shipment_rows(shipments))
+    client.add_spreadsheet('DASHBOARD').add_worksheet('dashboard', _dashboard_rows(upload_logs))
+    return client
+
+
+@pytest.fixture
+def snapshot_store(monkeypatch):
+    """Fresh process-wide snapshot store so each sheet size gets its own snapshot"""
+    store = shipment_snapshot.ShipmentSnapshotStore(check_interval_seconds=3600)
+    monkeypatch.setattr(shipment_snapshot, '_snapshot_store', store)
+    return store
+
+
+@pytest.fixture
+def snapshot_store_fast(monkeypatch):
+    """Fresh snapshot store that checks the revision on every call"""
+    store = shipment_snapshot.ShipmentSnapshotStore(check_interval_seconds=0)
+    monkeypatch.setattr(shipment_snapshot, '_snapshot_store', store)
+    return store
+
+
+@pytest.fixture
+def log_mirror(monkeypatch, tmp_path):
+    """Fresh process-wide upload log mirror for each Dashboard sheet"""
+    mirror = upload_log_mirror.UploadLogMirror(
+        str(tmp_path / 'upload_log.sqlite3'), 'DASHBOARD/dashboard', sync_interval_seconds=3600
+    )
+    monkeypatch.setattr(upload_log_mirror, '_upload_log_mirror', mirror)
+    yield mirror
+    mirror.close()
+
+
+@pytest.mark.parametrize('rows', [1_000, 10_000, 50_000])
+def test_search_shipments(bench, snapshot_store, rows):
+    client = _sheets_client(shipments=rows)
+    sheets = SheetsService(client=client)
+    sheets.get_shipment_snapshot()  # build snapshot and index outside the timing
+
+    terms = [
+        f"TA{254000000000 + rows // 2}",  # exact invoice
+        'ta2540000001',                   # prefix
+        f"BL{rows // 3:08d}",             # exact BL
+        '발송 #12',                       # ticket substring
+        'nothing-matches'
+    ]
+
+    def search():
+        for term in terms:
+            sheets.search_shipments(term)
+
+    bench(f"search_shipments[{rows}]", search, rounds=20, count_calls=lambda: client.total_calls)
+
+
+def test_snapshot_cold_load(bench, monkeypatch):
+    client = _sheets_client(shipments=10_000)
+    sheets = SheetsService(client=client)
+    sheets.read_shipment_records()  # resolve worksheet and header positions
+
+    def fresh_store():
+        monkeypatch.setattr(
+            shipment_snapshot, '_snapshot_store',
+            shipment_snapshot.ShipmentSnapshotStore(check_interval_seconds=3600)
+        )
+
+    bench(
+        'shipment_snapshot_load[10000]',
+        sheets.get_shipment_snapshot,
+        setup=fresh_store,
+        count_calls=lambda: client.total_calls
+    )
+
+
+def test_snapshot_refresh_one_edit(bench, snapshot_store_fast):
+    client = _sheets_client(shipments=50_000)
+    worksheet = client.open_by_key('SCM').worksheet('SCM_통합')
+    sheets = SheetsService(client=client)
+    sheets.get_shipment_snapshot()
+    statuses = itertools.cycle(['DELIVERED', 'IN_TRANSIT'])
+    status_col = SHIPMENT_COLUMNS.index('status') + 1
+
+    def edit_one_status():
+        worksheet.update_cell(25_000, status_col, next(statuses))
+
+    bench(
+        'shipment_snapshot_refresh[50000, 1 edit]',
+        sheets.get_shipment_snapshot,
+        setup=edit_one_status,
+        count_calls=lambda: client.total_calls
+    )
+
+
+def test_shipment_table_rerun(bench, snapshot_store):
+    sheets = SheetsService(client=_sheets_client(shipments=50_000))
+    frame = ShipmentFrame(sheets.get_shipment_snapshot())
+    queries = [
+        dict(),
+        dict(sort_by='일자', descending=True),
+        dict(status='DELIVERED', sort_by='송장번호'),
+        dict(search='발송 #12')
+    ]
+
+    def rerun():
+        # Widgets rerun with unchanged filters; only the page moves
+        for page, query in enumerate(queries, start=1):
+            frame.page(frame.query(**query), page, 50)
+
+    bench('shipment_table_rerun[50000]', rerun)
+
+
+def test_get_all_shipments_parse(bench):
+    client = _sheets_client(shipments=10_000)
+    sheets = SheetsService(client=client)
+    sheets.get_all_shipments(limit=None)  # resolve worksheet and header positions
+
+    bench(
+        'get_all_shipments[10000]',
+        lambda: sheets.get_all_shipments(limit=None),
+        count_calls=lambda: client.total_calls
+    )
+
+
+def test_get_upload_logs(bench, log_mirror):
+    client = _sheets_client(upload_logs=50_000)
+    sheets = SheetsService(client=client)
+    sheets.get_upload_logs(limit=10)  # build the mirror outside the timing
+    shipment_ids = [f"TA{254000000000 + i}" for i in range(0, 500, 5)]
+
+    def dashboard_reads():
+        sheets.get_upload_logs(limit=10)
+        sheets.get_upload_logs(shipment_id=f"TA{254000000007}", limit=100)
+        sheets.get_uploaded_doc_types(shipment_ids)
+
+    bench('get_upload_logs[50000]', dashboard_reads, count_calls=lambda: client.total_calls)
+
+
+def test_first_shipments_streamed(bench):
+    client = _sheets_client(shipments=50_000)
+    sheets = SheetsService(client=client)
+    sheets.get_all_shipments(limit=50)  # resolve worksheet and header positions
+
+    bench(
+        'get_all_shipments[50 of 50000]',
+        lambda: sheets.get_all_shipments(limit=50),
+        count_calls=lambda: client.total_calls
+    )
+
+
+def test_shipment_info_validation(bench):
+    fields = [
+        'invoice_no', 'ticket_name', 'carrier_name', 'carrier_mode',
+        'origin', 'destination', 'onboard_date', 'bl_no', 'status'
+    ]
+    records = [dict(zip(fields, row)) for row in _shipment_rows(10_000)[1:]]
+
+    bench('shipment_info_validation[10000]', lambda: [ShipmentInfo(**r) for r in records])
+
+
+def test_document_metadata_validation(bench):
+    records = [
+        {
+            'upload_timestamp': datetime(2025, 10, 30, 9, 0, i % 60),
+            'shipment_id': f"TA{254000000000 + i}",
+            'doc_type': 'Bill of Lading',
+            'file_name': f"20251030_BL_TA{254000000000 + i}.pdf",
+            'drive_file_id': f"F{i}",
+            'drive_url': f"https://drive.fake/F{i}",
+            'drive_folder_id': 'FOLDER',
+            'uploader': '전용수',
+            'file_size_bytes': 123456,
+            'carrier_name': 'CJ',
+            'carrier_mode': '해운',
+            'origin': '태광KR',
+            'destination': 'AMZUS'
+        }
+        for i in range(10_000)
+    ]
+
+    bench('document_metadata_validation[10000]', lambda: [DocumentMetadata(**r) for r in records])
+
+
+def _upload_round(documents: DocumentService):
+    counter = itertools.count()
+
+    def upload():
+        i = next(counter)
+        result = documents.upload_document(
+            b'%%PDF-1.4 benchmark %d' % i + b'\0' * 200_000,
+            f"bl_{i}.pdf",
+            'TA254000000001',
+            'Bill of Lading',
+            'BL',
+            uploader='bench',
+            origin='태광KR',
+            destination='AMZUS',
+            carrier_name='CJ',
+            carrier_mode='해운'
+        )
+        assert result.success, result.message
+    return upload
+
+
+def test_upload_document(bench):
+    drive_api = FakeDriveAPI('ROOT', latency=API_LATENCY_SECONDS)
+    sheets = SheetsService(client=_sheets_client())
+    upload = _upload_round(DocumentService(
+        DriveService(folder_cache=FolderCache(), service=drive_api),
+        sheets
+    ))
+
+    upload()  # create the shipment folders once; rounds measure the warm path
+    bench(
+        'upload_document[warm_folders]',
+        upload,
+        count_calls=lambda: drive_api.total_calls,
+        cpu_bound=False
+    )
+    sheets.flush_upload_logs()  # each sheets client has its own log writer
+
+
+def test_upload_document_local_store(bench, tmp_path):
+    sheets = SheetsService(client=_sheets_client())
+    upload = _upload_round(DocumentService(LocalContentStore(str(tmp_path / 'store')), sheets))
+
+    upload()
+    bench('upload_document[local_store]', upload, cpu_bound=False)
+    sheets.flush_upload_logs()
+
+
+def test_folder_resolution_cold(bench):
+    drive_api = FakeDriveAPI('ROOT', latency=API_LATENCY_SECONDS)
+    drive = DriveService(folder_cache=FolderCache(), service=drive_api)
+    counter = itertools.count()
+
+    def cold_cache():
+        drive.folder_cache = FolderCache()
+
+    bench(
+        'ensure_folder_path[cold]',
+        lambda: drive.ensure_folder_path(f"01_KR_TO_3PL/TA{next(counter)}/BL"),
+        setup=cold_cache,
+        count_calls=lambda: drive_api.total_calls,
+        cpu_bound=False
+    )
+
+
+def test_folder_resolution_warm(bench):
+    drive_api = FakeDriveAPI('ROOT', latency=API_LATENCY_SECONDS)
+    drive = DriveService(folder_cache=FolderCache(), service=drive_api)
+    paths = [f"01_KR_TO_3PL/TA{i}/BL" for i in range(100)]
+    for path in paths:
+        drive.ensure_folder_path(path)
+
+    def resolve_all():
+        for path in paths:
+            drive.ensure_folder_path(path)
+
+    bench('ensure_folder_path[warm x100]', resolve_all, count_calls=lambda: drive_api.total_calls)
@@ -0,0 +1,42 @@
+"""
+Shared test setup: offline settings for the fake Drive / Sheets backends
+"""
+import json
+import os
+import tempfile
+
+# Applied before any service reads settings
+os.environ.setdefault('GOOGLE_DRIVE_ROOT_FOLDER_ID', 'ROOT')
+os.environ.setdefault('INVOICE_SHEET_ID', 'SCM')
+os.environ.setdefault('DASHBOARD_SHEET_ID', 'DASHBOARD')
+os.environ.setdefault('GOOGLE_CREDENTIALS_JSON', json.dumps({'client_email': 'tests@example.com'}))
+os.environ['CACHE_DIR'] = tempfile.mkdtemp(prefix='scm-test-')
+os.environ['METRICS_ENABLED'] = 'false'
+# Quotas are simulated by the fakes; keep the scheduler out of the way
+os.environ['DRIVE_REQUESTS_PER_MINUTE'] = '1000000'
+os.environ['SHEETS_READ_REQUESTS_PER_MINUTE'] = '1000000'
+os.environ['SHEETS_WRITE_REQUESTS_PER_MINUTE'] = '1000000'
+
+import pytest  # noqa: E402
+import tenacity  # noqa: E402
+from utils import retry  # noqa: E402
+
+
+class _NoSleep:
+    @staticmethod
+    def sleep(seconds: float) -> None:
+        pass
+
+
+@pytest.fixture
+def no_retry_wait(monkeypatch):
+    """Retry transient API errors without waiting"""
+    monkeypatch.setattr(tenacity.nap, 'time', _NoSleep)
+
+
+@pytest.fixture(autouse=True)
+def _close_circuits():
+    """Leave every circuit breaker closed after each test"""
+    yield
+    for breaker in list(retry._breakers.values()):
+        breaker.record_success()
@@ -0,0 +1,572 @@
+"""
+Offline fake backends for Google Drive and Google Sheets
+
+FakeDriveAPI stands in for the googleapiclient Drive v3 resource and
+FakeGspreadClient for a gspread client, so DriveService / SheetsService /
+DocumentService run unchanged without network access. Both can simulate
+per-call latency, a per-minute request quota (HTTP 429) and injected HTTP
+errors (fail_next), and count calls for benchmarks.
+
+Usage:
+    drive = DriveService(folder_cache=FolderCache(), service=FakeDriveAPI('ROOT'))
+    sheets = SheetsService(client=FakeGspreadClient())
+"""
+import hashlib
+import itertools
+import json
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import gspread
+import httplib2
+import requests
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaUploadProgress
+from gspread.utils import a1_range_to_grid_range
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+
+def _http_error(status: int, message: str = '') -> HttpError:
+    return HttpError(httplib2.Response({'status': status}), message.encode('utf-8'))
+
+
+class _Backend:
+    """Shared latency / quota / call-count simulation"""
+
+    def __init__(self, latency: float = 0.0, quota_per_minute: Optional[int] = None):
+        self.latency = latency
+        self.quota_per_minute = quota_per_minute
+        self.calls: Counter = Counter()
+        self._recent = deque()
+        self._faults: Dict[str, deque] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def fail_next(self, name: str, *statuses: int, applied: bool = False) -> None:
+        """
+        Make the next calls of an API method fail with HTTP errors
+
+        Args:
+            name: Call name as counted in calls (e.g. 'files.list')
+            statuses: One HTTP status per failing call, in order
+            applied: The call takes effect before failing (a lost response)
+        """
+        with self._lock:
+            self._faults.setdefault(name, deque()).extend((status, applied) for status in statuses)
+
+    def _raise_fault(self, name: str, applied: bool) -> None:
+        with self._lock:
+            faults = self._faults.get(name)
+            if not faults or faults[0][1] != applied:
+                return
+            status, _ = faults.popleft()
+        raise self._error(status, f'Injected error for {name}')
+
+    def _error(self, status: int, message: str) -> Exception:
+        """Error the client library raises for an HTTP status"""
+        return _http_error(status, message)
+
+    def _call(self, name: str, sleep: bool = True) -> None:
+        with self._lock:
+            self.calls[name] += 1
+            self._raise_fault(name, applied=False)
+            if self.quota_per_minute is not None:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] > 60:
+                    self._recent.popleft()
+                if len(self._recent) >= self.quota_per_minute:
+                    raise self._error(429, 'Quota exceeded')
+                self._recent.append(now)
+        if self.latency and sleep:
+            time.sleep(self.latency)
+
+
+# ===== Drive =====
+
+class _Request:
+    def __init__(self, backend: _Backend, name: str, fn):
+        self._backend = backend
+        self._name = name
+        self._fn = fn
+
+    def execute(self, http=None, num_retries=0):
+        self._backend._call(self._name)
+        result = self._fn()
+        self._backend._raise_fault(self._name, applied=True)
+        return result
+
+
+class _UploadHttp:
+    """Answers resumable session status queries (PUT with Content-Range: bytes */size)"""
+
+    def __init__(self, api: "FakeDriveAPI"):
+        self._api = api
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        api = self._api
+        api._call('files.create.status')
+        session_id = uri.rsplit('/', 1)[-1]
+        with api._lock:
+            if session_id not in api.upload_sessions:
+                return httplib2.Response({'status': 404}), b'Upload session not found'
+            received = len(api.upload_sessions[session_id])
+        headers = {'status': 308}
+        if received:
+            headers['range'] = f"bytes=0-{received - 1}"
+        return httplib2.Response(headers), b''
+
+
+class _MediaRequest:
+    """Resumable media upload request (next_chunk protocol)"""
+
+    def __init__(self, api: "FakeDriveAPI", body: Dict[str, Any], media_body, fields: Optional[str]):
+        self._api = api
+        self._body = body
+        self._media = media_body
+        self.http = _UploadHttp(api)
+        self.resumable_uri = None
+        self.resumable_progress = 0
+
+    def next_chunk(self, http=None, num_retries=0):
+        api = self._api
+        size = self._media.size()
+
+        if self.resumable_uri is None:
+            api._call('files.create.session')
+            with api._lock:
+                api._check_parents(self._body.get('parents'))
+                session_id = f"session-{next(api._ids)}"
+                api.upload_sessions[session_id] = b''
+            self.resumable_uri = f"https://fake.upload/{session_id}"
+
+        api._call('files.create.chunk')
+        session_id = self.resumable_uri.rsplit('/', 1)[-1]
+        stream = self._media.stream()
+        stream.seek(self.resumable_progress)
+        chunk = stream.read(self._media.chunksize())
+
+        with api._lock:
+            if session_id not in api.upload_sessions:
+                raise _http_error(404, 'Upload session not found')
+            if api.fail_next_chunks > 0:
+                api.fail_next_chunks -= 1
+                raise _http_error(503, 'Backend error')
+            api.upload_sessions[session_id] += chunk
+            self.resumable_progress += len(chunk)
+
+            if self.resumable_progress < size:
+                return MediaUploadProgress(self.resumable_progress, size), None
+
+            content = api.upload_sessions.pop(session_id)
+            file = api._add_file(
+                name=self._body['name'],
+                mime_type=self._media.mimetype(),
+                parents=self._body.get('parents'),
+                app_properties=self._body.get('appProperties'),
+                content=content
+            )
+        return None, dict(file)
+
+
+class _BatchRequest:
+    """Batch HTTP request: one round trip, one callback per sub-request"""
+
+    MAX_REQUESTS = 100
+
+    def __init__(self, api: "FakeDriveAPI", callback):
+        self._api = api
+        self._callback = callback
+        self._requests: List[tuple] = []
+
+    def add(self, request: _Request, callback=None, request_id: Optional[str] = None):
+        if len(self._requests) >= self.MAX_REQUESTS:
+            raise ValueError('Batch requests are limited to 100 calls')
+        request_id = request_id or str(len(self._requests) + 1)
+        self._requests.append((request_id, request, callback or self._callback))
+
+    def execute(self, http=None):
+        self._api._call('batch')
+        for request_id, request, callback in self._requests:
+            try:
+                self._api._call(f"batch.{request._name}", sleep=False)
+                response, exception = request._fn(), None
+                self._api._raise_fault(f"batch.{request._name}", applied=True)
+            except HttpError as e:
+                response, exception = None, e
+            callback(request_id, response, exception)
+
+
+class _Files:
+    def __init__(self, api: "FakeDriveAPI"):
+        self._api = api
+
+    def get(self, fileId: str, fields: Optional[str] = None, **kwargs):
+        def fn():
+            with self._api._lock:
+                file = self._api.file_store.get(fileId)
+                if file is None:
+                    raise _http_error(404, f'File not found: {fileId}')
+                return dict(file)
+        return _Request(self._api, 'files.get', fn)
+
+    def list(
+        self,
+        q: str = '',
+        fields: Optional[str] = None,
+        pageSize: int = 100,
+        pageToken: Optional[str] = None,
+        **kwargs
+    ):
+        def fn():
+            with self._api._lock:
+                matches = [dict(f) for f in self._api._query(q)]
+            start = int(pageToken or 0)
+            response = {'files': matches[start:start + pageSize]}
+            if start + pageSize < len(matches):
+                response['nextPageToken'] = str(start + pageSize)
+            return response
+        return _Request(self._api, 'files.list', fn)
+
+    def create(self, body: Dict[str, Any], fields: Optional[str] = None, media_body=None, **kwargs):
+        if media_body is not None:
+            return _MediaRequest(self._api, body, media_body, fields)
+
+        def fn():
+            with self._api._lock:
+                self._api._check_parents(body.get('parents'))
+                return dict(self._api._add_file(
+                    name=body['name'],
+                    mime_type=body.get('mimeType', 'application/octet-stream'),
+                    parents=body.get('parents'),
+                    app_properties=body.get('appProperties'),
+                    shortcut_target=(body.get('shortcutDetails') or {}).get('targetId')
+                ))
+        return _Request(self._api, 'files.create', fn)
+
+    def update(
+        self,
+        fileId: str,
+        body: Optional[Dict[str, Any]] = None,
+        addParents: Optional[str] = None,
+        removeParents: Optional[str] = None,
+        fields: Optional[str] = None,
+        **kwargs
+    ):
+        def fn():
+            with self._api._lock:
+                file = self._api.file_store.get(fileId)
+                if file is None:
+                    raise _http_error(404, f'File not found: {fileId}')
+                parents = [p for p in file['parents'] if p not in (removeParents or '').split(',')]
+                if addParents:
+                    parents.extend(addParents.split(','))
+                self._api._set_parents(file, parents)
+                file.update(body or {})
+                self._api._record_change(file)
+                return dict(file)
+        return _Request(self._api, 'files.update', fn)
+
+    def delete(self, fileId: str, **kwargs):
+        def fn():
+            with self._api._lock:
+                file = self._api.file_store.pop(fileId, None)
+                if file is None:
+                    raise _http_error(404, f'File not found: {fileId}')
+                self._api._set_parents(file, [])
+                self._api._record_change(file, removed=True)
+            return ''
+        return _Request(self._api, 'files.delete', fn)
+
+
+class _Changes:
+    """changes resource; page tokens are offsets into FakeDriveAPI.changes_log"""
+
+    def __init__(self, api: "FakeDriveAPI"):
+        self._api = api
+
+    def getStartPageToken(self, **kwargs):
+        def fn():
+            with self._api._lock:
+                return {'startPageToken': str(len(self._api.changes_log))}
+        return _Request(self._api, 'changes.getStartPageToken', fn)
+
+    def list(self, pageToken: str, pageSize: int = 100, **kwargs):
+        def fn():
+            with self._api._lock:
+                log = self._api.changes_log
+                start = int(pageToken)
+                if start > len(log):
+                    raise _http_error(404, f'Invalid page token: {pageToken}')
+                changes = [dict(c) for c in log[start:start + pageSize]]
+                end = start + len(changes)
+                response = {'changes': changes}
+                if end < len(log):
+                    response['nextPageToken'] = str(end)
+                else:
+                    response['newStartPageToken'] = str(end)
+            return response
+        return _Request(self._api, 'changes.list', fn)
+
+
+class FakeDriveAPI(_Backend):
+    """In-memory stand-in for googleapiclient's Drive v3 resource"""
+
+    def __init__(
+        self,
+        root_folder_id: str = 'ROOT',
+        latency: float = 0.0,
+        quota_per_minute: Optional[int] = None
+    ):
+        super().__init__(latency, quota_per_minute)
+        self.root_folder_id = root_folder_id
+        self.file_store: Dict[str, Dict[str, Any]] = {}
+        self.contents: Dict[str, bytes] = {}
+        self.upload_sessions: Dict[str, bytes] = {}
+        self.changes_log: List[Dict[str, Any]] = []
+        # parent ID → child IDs (insertion ordered) for "'x' in parents" queries
+        self._children: Dict[str, Dict[str, None]] = {}
+        self.fail_next_chunks = 0
+        self._ids = itertools.count(1)
+        self.file_store[root_folder_id] = {
+            'id': root_folder_id,
+            'name': 'root',
+            'mimeType': FOLDER_MIME_TYPE,
+            'parents': [],
+            'trashed': False
+        }
+
+    def files(self) -> _Files:
+        return _Files(self)
+
+    def changes(self) -> _Changes:
+        return _Changes(self)
+
+    def new_batch_http_request(self, callback=None) -> _BatchRequest:
+        return _BatchRequest(self, callback)
+
+    # --- helpers for tests ---
+
+    def add_folder(self, name: str, parent_id: str) -> str:
+        """Create a folder directly (no call counted)"""
+        with self._lock:
+            return self._add_file(name, FOLDER_MIME_TYPE, [parent_id])['id']
+
+    def trash(self, file_id: str) -> None:
+        """Trash a file directly, as if done by hand in Drive"""
+        with self._lock:
+            self.file_store[file_id]['trashed'] = True
+            self._record_change(self.file_store[file_id])
+
+    # --- internals ---
+
+    def _add_file(
+        self,
+        name: str,
+        mime_type: str,
+        parents: Optional[List[str]],
+        app_properties: Optional[Dict[str, str]] = None,
+        content: Optional[bytes] = None,
+        shortcut_target: Optional[str] = None
+    ) -> Dict[str, Any]:
+        file_id = f"F{next(self._ids)}"
+        file = {
+            'id': file_id,
+            'name': name,
+            'mimeType': mime_type,
+            'parents': [],
+            'trashed': False,
+            'webViewLink': f"https://drive.fake/{file_id}"
+        }
+        self._set_parents(file, list(parents or []))
+        if app_properties:
+            file['appProperties'] = dict(app_properties)
+        if content is not None:
+            file['size'] = str(len(content))
+            file['md5Checksum'] = hashlib.md5(content).hexdigest()
+            self.contents[file_id] = content
+        if shortcut_target:
+            file['shortcutDetails'] = {'targetId': shortcut_target}
+        self.file_store[file_id] = file
+        self._record_change(file)
+        return file
+
+    def _record_change(self, file: Dict[str, Any], removed: bool = False) -> None:
+        self.changes_log.append({'fileId': file['id'], 'removed': removed, 'file': dict(file)})
+
+    def _check_parents(self, parents: Optional[List[str]]) -> None:
+        for parent_id in parents or []:
+            parent = self.file_store.get(parent_id)
+            if parent is None or parent['trashed']:
+                raise _http_error(404, f'File not found: {parent_id}')
+
+    _CONDITION = re.compile(
+        r"(?P<field>name|mimeType)\s*(?P<op>!=|=)\s*'(?P<value>(?:[^'\\]|\\.)*)'"
+        r"|trashed\s*=\s*(?P<trashed>true|false)"
+        r"|'(?P<parent>[^']*)'\s+in\s+parents"
+        r"|appProperties\s+has\s+\{\s*key='(?P<key>[^']*)'\s+and\s+value='(?P<pvalue>[^']*)'\s*\}"
+    )
+
+    def _set_parents(self, file: Dict[str, Any], parents: List[str]) -> None:
+        for parent_id in file['parents']:
+            self._children.get(parent_id, {}).pop(file['id'], None)
+        file['parents'] = parents
+        for parent_id in parents:
+            self._children.setdefault(parent_id, {})[file['id']] = None
+
+    def _query(self, query: str) -> List[Dict[str, Any]]:
+        """Evaluate the subset of Drive query syntax used by the services"""
+        predicates = []
+        candidates = None
+        for clause in self._CONDITION.finditer(query):
+            if clause.group('field'):
+                field, value = clause.group('field'), clause.group('value').replace("\\'", "'")
+                negate = clause.group('op') == '!='
+                predicates.append(lambda f, k=field, v=value, n=negate: (f.get(k) == v) != n)
+            elif clause.group('trashed'):
+                trashed = clause.group('trashed') == 'true'
+                predicates.append(lambda f, t=trashed: f['trashed'] == t)
+            elif clause.group('parent') is not None:
+                child_ids = self._children.get(clause.group('parent'), {})
+                candidates = [self.file_store[i] for i in child_ids if i in self.file_store]
+            elif clause.group('key'):
+                key, value = clause.group('key'), clause.group('pvalue')
+                predicates.append(lambda f, k=key, v=value: (f.get('appProperties') or {}).get(k) == v)
+
+        if candidates is None:
+            candidates = self.file_store.values()
+        return [f for f in candidates if all(p(f) for p in predicates)]
+
+
+# ===== Sheets =====
+
+class FakeWorksheet:
+    """In-memory worksheet (row-major list of string values)"""
+
+    def __init__(self, spreadsheet: "FakeSpreadsheet", title: str, rows: List[List[Any]]):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.rows = [[str(v) for v in row] for row in rows]
+
+    @property
+    def row_count(self) -> int:
+        return len(self.rows)
+
+    def row_values(self, row: int) -> List[str]:
+        self.spreadsheet.client._call('values.get')
+        return list(self.rows[row - 1]) if row <= len(self.rows) else []
+
+    def batch_get(self, ranges: List[str], major_dimension: str = 'ROWS', **kwargs) -> List[List[List[str]]]:
+        self.spreadsheet.client._call('values.batchGet')
+        return [self._get_range(r, major_dimension) for r in ranges]
+
+    def get_all_records(self) -> List[Dict[str, Any]]:
+        self.spreadsheet.client._call('values.get')
+        headers = self.rows[0]
+        return [dict(zip(headers, row + [''] * (len(headers) - len(row)))) for row in self.rows[1:]]
+
+    def update_cell(self, row: int, col: int, value: Any) -> None:
+        self.spreadsheet.client._call('values.update')
+        while len(self.rows) < row:
+            self.rows.append([])
+        cells = self.rows[row - 1]
+        cells.extend([''] * (col - len(cells)))
+        cells[col - 1] = '' if value is None else str(value)
+        self.spreadsheet.touch()
+
+    def append_rows(self, values: List[List[Any]], **kwargs) -> Dict[str, Any]:
+        self.spreadsheet.client._call('values.append')
+        start = len(self.rows) + 1
+        self.rows.extend([['' if v is None else str(v) for v in row] for row in values])
+        self.spreadsheet.touch()
+        width = max(len(row) for row in values)
+        end_col = chr(ord('A') + width - 1)
+        return {'updates': {'updatedRange': f"'{self.title}'!A{start}:{end_col}{len(self.rows)}"}}
+
+    def _get_range(self, a1: str, major_dimension: str) -> List[List[str]]:
+        grid = a1_range_to_grid_range(a1.split('!')[-1])
+        row_start = grid.get('startRowIndex', 0)
+        row_end = grid.get('endRowIndex', len(self.rows))
+        col_start = grid.get('startColumnIndex', 0)
+        col_end = grid.get('endColumnIndex')
+        if col_end is None:
+            col_end = max((len(r) for r in self.rows), default=0)
+        rows = self.rows[row_start:row_end]
+
+        # Like the Sheets API, trailing empty rows/cells are omitted
+        if major_dimension == 'COLUMNS':
+            columns = [
+                self._rstrip([row[c] if c < len(row) else '' for row in rows])
+                for c in range(col_start, col_end)
+            ]
+            return self._rstrip(columns)
+        return self._rstrip([self._rstrip(row[col_start:col_end]) for row in rows])
+
+    @staticmethod
+    def _rstrip(values: List[Any]) -> List[Any]:
+        end = len(values)
+        while end and not values[end - 1]:
+            end -= 1
+        return values[:end]
+
+
+class FakeSpreadsheet:
+    def __init__(self, client: "FakeGspreadClient", sheet_id: str):
+        self.client = client
+        self.id = sheet_id
+        self.title = sheet_id
+        self._worksheets: Dict[str, FakeWorksheet] = {}
+        self.touch()
+
+    def touch(self) -> None:
+        self.modified_time = datetime.now(timezone.utc).isoformat()
+        self.version = getattr(self, 'version', 0) + 1
+
+    def add_worksheet(self, title: str, rows: List[List[Any]]) -> FakeWorksheet:
+        self._worksheets[title] = FakeWorksheet(self, title, rows)
+        self.touch()
+        return self._worksheets[title]
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        self.client._call('spreadsheets.get')
+        if title not in self._worksheets:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def worksheets(self) -> List[FakeWorksheet]:
+        return list(self._worksheets.values())
+
+
+class FakeGspreadClient(_Backend):
+    """In-memory stand-in for gspread.Client"""
+
+    def __init__(self, latency: float = 0.0, quota_per_minute: Optional[int] = None):
+        super().__init__(latency, quota_per_minute)
+        self.spreadsheets: Dict[str, FakeSpreadsheet] = {}
+
+    def _error(self, status: int, message: str) -> Exception:
+        response = requests.Response()
+        response.status_code = status
+        response._content = json.dumps({'error': {'code': status, 'message': message}}).encode('utf-8')
+        return gspread.exceptions.APIError(response)
+
+    def add_spreadsheet(self, sheet_id: str) -> FakeSpreadsheet:
+        self.spreadsheets[sheet_id] = FakeSpreadsheet(self, sheet_id)
+        return self.spreadsheets[sheet_id]
+
+    def open_by_key(self, key: str) -> FakeSpreadsheet:
+        self._call('spreadsheets.get')
+        if key not in self.spreadsheets:
+            raise gspread.exceptions.SpreadsheetNotFound(key)
+        return self.spreadsheets[key]
+
+    def get_file_drive_metadata(self, file_id: str) -> Dict[str, Any]:
+        self._call('drive.files.get')
+        sheet = self.spreadsheets[file_id]
+        return {'id': file_id, 'name': sheet.title, 'modifiedTime': sheet.modified_time}
@@ -0,0 +1,136 @@
+"""
+AsyncDocumentService / AsyncDriveService against the offline fakes
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from core.models import UploadRequest
+from services.async_services import AsyncDocumentService, AsyncDriveService
+from services.document_service import DocumentService
+from services.drive_service import DriveService
+from services.folder_cache import FolderCache
+from services.sheets_service import DASHBOARD_COLUMNS, SheetsService
+from tests.fakes import FOLDER_MIME_TYPE, FakeDriveAPI, FakeGspreadClient
+
+
+def _request(i: int, content: bytes = b'%PDF-1.4 test', shipment_id: str = 'TA254000000001') -> UploadRequest:
+    return UploadRequest(
+        file_content=content + b' %d' % i,
+        file_name=f"bl_{i}.pdf",
+        shipment_id=shipment_id,
+        doc_type='Bill of Lading',
+        doc_type_abbr='BL',
+        uploader='test',
+        origin='태광KR',
+        destination='AMZUS'
+    )
+
+
+@pytest.fixture
+def drive_api():
+    return FakeDriveAPI('ROOT')
+
+
+@pytest.fixture
+def sheets_client():
+    client = FakeGspreadClient()
+    client.add_spreadsheet('DASHBOARD').add_worksheet('dashboard', [list(DASHBOARD_COLUMNS)])
+    return client
+
+
+@pytest.fixture
+def documents(drive_api, sheets_client):
+    service = DocumentService(
+        DriveService(folder_cache=FolderCache(), service=drive_api),
+        SheetsService(client=sheets_client)
+    )
+    yield service
+    service.sheets.flush_upload_logs()  # each sheets client has its own log writer
+
+
+def _folders(api: FakeDriveAPI):
+    return sorted(
+        (f['name'], f['parents'][0])
+        for f in api.file_store.values()
+        if f['mimeType'] == FOLDER_MIME_TYPE and f['parents']
+    )
+
+
+def test_upload_documents_shares_new_folders(documents, drive_api, sheets_client):
+    batch = [_request(i) for i in range(8)] + [_request(8, shipment_id='TA254000000002')]
+    progress = []
+
+    async def upload():
+        async with AsyncDocumentService(documents) as service:
+            return await service.upload_documents(batch, lambda i, sent, total: progress.append(i))
+
+    results = asyncio.run(upload())
+
+    assert all(result.success for result in results), [result.error for result in results]
+    assert [result.metadata.file_name.split('_', 2)[-1] for result in results] == [r.file_name for r in batch]
+    # Concurrent uploads into new folders created each folder once
+    folders = _folders(drive_api)
+    assert len(folders) == len(set(folders))
+    assert {name for name, _ in folders} >= {'TA254000000001', 'TA254000000002', 'Bill of Lading'}
+    assert set(progress) == set(range(len(batch)))
+
+    assert documents.sheets.flush_upload_logs() == len(batch)
+    assert len(sheets_client.open_by_key('DASHBOARD').worksheet('dashboard').rows) == len(batch) + 1
+
+
+def test_upload_documents_reports_failures_in_order(documents, monkeypatch):
+    monkeypatch.setattr(documents.settings, 'max_file_size_mb', 1)
+    batch = [_request(0), _request(1, content=b'x' * (2 * 1024 * 1024)), _request(2)]
+
+    async def upload():
+        async with AsyncDocumentService(documents) as service:
+            return await service.upload_documents(batch)
+
+    results = asyncio.run(upload())
+
+    assert [result.success for result in results] == [True, False, True]
+    assert 'exceeds limit' in results[1].error
+
+
+def test_dashboard_failure_fails_the_uploads(documents, monkeypatch):
+    def down(rows):
+        raise RuntimeError('sheet unavailable')
+    monkeypatch.setattr(documents.sheets, 'append_upload_logs', down)
+
+    async def upload():
+        async with AsyncDocumentService(documents) as service:
+            return await service.upload_documents([_request(0), _request(1)])
+
+    results = asyncio.run(upload())
+
+    assert [result.success for result in results] == [False, False]
+    assert results[0].error == 'sheet unavailable'
+
+
+def test_ensure_folder_paths_reports_errors_per_path(drive_api):
+    drive = DriveService(folder_cache=FolderCache(), service=drive_api)
+    existing = drive_api.add_folder('01_KR_TO_3PL', 'ROOT')
+    drive_api.add_folder('TA1', existing)
+
+    async def resolve():
+        async with AsyncDriveService(drive) as service:
+            return await service.ensure_folder_paths(['01_KR_TO_3PL/TA1/BL', '/01_KR_TO_3PL/TA2/BL/'])
+
+    resolved = asyncio.run(resolve())
+
+    assert set(resolved) == {'01_KR_TO_3PL/TA1/BL', '01_KR_TO_3PL/TA2/BL'}
+    assert drive.ensure_folder_path('01_KR_TO_3PL/TA1/BL') == resolved['01_KR_TO_3PL/TA1/BL']
+    assert sum(1 for name, _ in _folders(drive_api) if name == '01_KR_TO_3PL') == 1
+
+
+def test_close_shuts_down_only_owned_executors(documents):
+    shared = ThreadPoolExecutor(max_workers=2)
+    borrowing = AsyncDocumentService(documents, executor=shared)
+    borrowing.close()
+    assert shared.submit(lambda: 1).result() == 1
+    shared.shutdown()
+
+    owning = AsyncDocumentService(documents)
+    owning.close()
+    with pytest.raises(RuntimeError):
+        owning.drive._executor.submit(lambda: 1)
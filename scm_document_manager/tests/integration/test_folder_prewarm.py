@@ -0,0 +1,111 @@
+"""
+FolderPrewarmer against the fake Drive batch API
+"""
+import pytest
+from core.models import ShipmentInfo
+from services.drive_folder_index import DriveFolderIndex
+from services.drive_service import DriveService
+from services.folder_cache import FolderCache
+from services.folder_prewarm import FolderPrewarmer
+from tests.fakes import FOLDER_MIME_TYPE, FakeDriveAPI
+
+CATEGORY = '03_KR_TO_CUSTOMER'
+
+
+def _shipment(invoice_no: str, status: str = 'IN_TRANSIT') -> ShipmentInfo:
+    return ShipmentInfo(
+        invoice_no=invoice_no, carrier_name='CJ', carrier_mode='해운',
+        origin='태광KR', destination='AMZUS', status=status
+    )
+
+
+@pytest.fixture(autouse=True)
+def _no_round_wait(monkeypatch):
+    monkeypatch.setattr('services.folder_prewarm.time.sleep', lambda seconds: None)
+
+
+@pytest.fixture
+def drive_api():
+    return FakeDriveAPI('ROOT')
+
+
+@pytest.fixture
+def drive(drive_api):
+    return DriveService(folder_cache=FolderCache(), service=drive_api)
+
+
+@pytest.fixture
+def prewarmer(drive):
+    return FolderPrewarmer(drive, {'in_transit'}, folder_index=DriveFolderIndex('ROOT'))
+
+
+def _folders(api: FakeDriveAPI, name: str):
+    return [
+        f for f in api.file_store.values()
+        if f['mimeType'] == FOLDER_MIME_TYPE and f['name'] == name
+    ]
+
+
+def _cached(drive: DriveService, path: str):
+    return drive.folder_cache.get(FolderCache.make_key('ROOT', path))
+
+
+def test_creates_shipment_folders_and_caches_existing_document_folders(drive, drive_api, prewarmer):
+    # Folders made earlier by uploads from another process
+    other = DriveService(folder_cache=FolderCache(), service=drive_api)
+    bl_id = other.ensure_folder_path(f"{CATEGORY}/TA1/Bill of Lading")
+    settlement_id = other.ensure_folder_path('00_SETTLEMENT/TA1/Settlement Statement')
+
+    prewarmer.prewarm([_shipment('TA1'), _shipment('TA2'), _shipment('TA3', status='DELIVERED')])
+
+    assert _cached(drive, f"{CATEGORY}/TA1/Bill of Lading") == bl_id
+    assert _cached(drive, '00_SETTLEMENT/TA1/Settlement Statement') == settlement_id
+    assert _cached(drive, f"{CATEGORY}/TA2")
+    # Document type folders and the settlement tree are never created
+    assert len(_folders(drive_api, 'Bill of Lading')) == 1
+    assert len(_folders(drive_api, 'Settlement Statement')) == 1
+    assert len(_folders(drive_api, '00_SETTLEMENT')) == 1
+    assert not _folders(drive_api, 'TA3')
+
+
+def test_missing_document_folders_are_not_looked_up_again(drive_api, prewarmer):
+    shipments = [_shipment('TA1'), _shipment('TA2')]
+    prewarmer.prewarm(shipments)
+    batches = drive_api.calls['batch']
+
+    assert prewarmer.prewarm(shipments) == 0
+    assert drive_api.calls['batch'] == batches
+
+
+def test_permanent_sub_request_failure_skips_only_that_folder(drive, drive_api, prewarmer):
+    prewarmer.prewarm([_shipment('TA0')])  # category folder exists and is cached
+    # Lookup of TA1 (first in the batch) fails; it is not created blindly
+    drive_api.fail_next('batch.files.list', 400)
+
+    prewarmer.prewarm([_shipment('TA1'), _shipment('TA2')])
+
+    assert not _folders(drive_api, 'TA1')
+    assert _cached(drive, f"{CATEGORY}/TA2")
+
+    # The next run (new sheet revision) picks it up
+    prewarmer.prewarm([_shipment('TA1'), _shipment('TA2')])
+    assert len(_folders(drive_api, 'TA1')) == 1
+
+
+def test_transient_lookup_failure_is_retried(drive, drive_api, prewarmer):
+    drive_api.fail_next('batch.files.list', 503)
+
+    prewarmer.prewarm([_shipment('TA1')])
+
+    assert _cached(drive, f"{CATEGORY}/TA1")
+    assert len(_folders(drive_api, CATEGORY)) == 1
+
+
+def test_create_with_lost_response_is_not_sent_again(drive, drive_api, prewarmer):
+    prewarmer.prewarm([_shipment('TA0')])
+    drive_api.fail_next('batch.files.create', 503, applied=True)
+
+    prewarmer.prewarm([_shipment('TA1')])
+
+    [folder] = _folders(drive_api, 'TA1')
+    assert _cached(drive, f"{CATEGORY}/TA1") == folder['id']
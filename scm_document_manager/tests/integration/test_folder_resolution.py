@@ -0,0 +1,93 @@
+"""
+DriveService.ensure_folder_path when Drive calls fail
+"""
+import pytest
+from core.exceptions import DriveAPIError, FolderNotFoundError
+from services.drive_service import DriveService
+from services.folder_cache import FolderCache
+from tests.fakes import FOLDER_MIME_TYPE, FakeDriveAPI
+
+PATH = '01_KR_TO_3PL/TA254000000001/BL'
+
+
+@pytest.fixture
+def drive_api():
+    return FakeDriveAPI('ROOT')
+
+
+@pytest.fixture
+def drive(drive_api):
+    return DriveService(folder_cache=FolderCache(), service=drive_api)
+
+
+def _folder_names(api: FakeDriveAPI):
+    return sorted(
+        f['name'] for f in api.file_store.values()
+        if f['mimeType'] == FOLDER_MIME_TYPE and f['parents']
+    )
+
+
+def test_creates_missing_folders_once(drive, drive_api):
+    folder_id = drive.ensure_folder_path(PATH)
+
+    assert _folder_names(drive_api) == ['01_KR_TO_3PL', 'BL', 'TA254000000001']
+    assert drive_api.file_store[folder_id]['name'] == 'BL'
+    calls = drive_api.total_calls
+    assert drive.ensure_folder_path(PATH) == folder_id
+    assert drive_api.total_calls == calls
+
+
+def test_lookup_rate_limited_is_retried_not_treated_as_missing(drive, drive_api, no_retry_wait):
+    existing = drive_api.add_folder('01_KR_TO_3PL', 'ROOT')
+    drive_api.fail_next('files.list', 429)
+
+    drive.ensure_folder_path(PATH)
+
+    assert _folder_names(drive_api).count('01_KR_TO_3PL') == 1
+    assert drive.folder_cache.get(FolderCache.make_key('ROOT', '01_KR_TO_3PL')) == existing
+
+
+def test_lookup_failure_is_raised_not_treated_as_missing(drive, drive_api):
+    drive_api.add_folder('01_KR_TO_3PL', 'ROOT')
+    drive_api.fail_next('files.list', 400)
+
+    with pytest.raises(DriveAPIError):
+        drive.ensure_folder_path(PATH)
+    assert _folder_names(drive_api) == ['01_KR_TO_3PL']
+
+
+def test_create_lost_response_does_not_duplicate(drive, drive_api, no_retry_wait):
+    # The folder is created but the response is a 503
+    drive_api.fail_next('files.create', 503, applied=True)
+
+    folder_id = drive.ensure_folder_path(PATH)
+
+    assert _folder_names(drive_api) == ['01_KR_TO_3PL', 'BL', 'TA254000000001']
+    assert drive_api.file_store[folder_id]['name'] == 'BL'
+    assert drive_api.calls['files.create'] == 3
+
+
+def test_inaccessible_root_raises(drive_api):
+    drive = DriveService(folder_cache=FolderCache(), service=drive_api)
+    drive.settings = drive.settings.model_copy(update={'google_drive_root_folder_id': 'MISSING'})
+
+    with pytest.raises(DriveAPIError, match='Cannot access root folder'):
+        drive.ensure_folder_path(PATH)
+    assert _folder_names(drive_api) == []
+
+
+def test_deleted_cached_folders_are_resolved_again(drive, drive_api):
+    old_id = drive.ensure_folder_path(PATH)
+    ticket_id = drive.ensure_folder_path('01_KR_TO_3PL/TA254000000001')
+    for folder_id in (old_id, ticket_id):
+        drive_api.files().delete(fileId=folder_id).execute()
+
+    # The upload finds the folder gone and drops it from the cache
+    with pytest.raises(FolderNotFoundError):
+        drive.upload_file(b'%PDF', 'a.pdf', old_id)
+    new_id = drive.ensure_folder_path(PATH)
+
+    assert new_id != old_id
+    assert drive_api.file_store[new_id]['name'] == 'BL'
+    assert drive_api.file_store[new_id]['parents'][0] in drive_api.file_store
+    assert _folder_names(drive_api) == ['01_KR_TO_3PL', 'BL', 'TA254000000001']
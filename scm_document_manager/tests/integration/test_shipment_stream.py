@@ -0,0 +1,75 @@
+"""
+SheetsService.iter_shipments: row windows, end of sheet and transient errors
+"""
+import pytest
+from services.sheets_service import SHIPMENT_COLUMNS, SheetsService
+from tests.fakes import FakeGspreadClient
+
+
+def _row(i: int):
+    return [f"TA{254000000000 + i}", f"ticket {i}", 'CJ', '해운', '태광KR', 'AMZUS', '2025-10-30', '', 'IN_TRANSIT']
+
+
+@pytest.fixture
+def client():
+    client = FakeGspreadClient()
+    client.add_spreadsheet('SCM').add_worksheet('SCM_통합', [list(SHIPMENT_COLUMNS)] + [_row(i) for i in range(25)])
+    return client
+
+
+@pytest.fixture
+def worksheet(client):
+    return client.open_by_key('SCM').worksheet('SCM_통합')
+
+
+def test_streams_every_row_and_stops_at_first_blank_window(client, monkeypatch):
+    monkeypatch.setattr('services.sheets_service.STREAM_END_BLANK_ROWS', 10)
+    sheets = SheetsService(client=client)
+
+    shipments = list(sheets.iter_shipments(batch_rows=10))
+
+    assert [s.ticket_name for s in shipments] == [f"ticket {i}" for i in range(25)]
+    # Three windows with rows, then one blank window
+    assert client.calls['values.batchGet'] == 4
+
+
+def test_rows_appended_after_open_are_read(client, worksheet):
+    sheets = SheetsService(client=client)
+    list(sheets.iter_shipments(batch_rows=10))  # worksheet cached by the instance
+
+    worksheet.rows += [_row(i) for i in range(25, 40)]
+
+    assert len(list(sheets.iter_shipments(batch_rows=10))) == 40
+
+
+def test_blank_rows_inside_a_window_are_skipped(client, worksheet):
+    worksheet.rows[5] = [''] * len(SHIPMENT_COLUMNS)
+    sheets = SheetsService(client=client)
+
+    assert len(list(sheets.iter_shipments(batch_rows=10))) == 24
+
+
+@pytest.mark.parametrize('endpoint', ['spreadsheets.get', 'values.batchGet'])
+def test_transient_errors_are_retried(client, no_retry_wait, endpoint):
+    sheets = SheetsService(client=client)
+    client.fail_next(endpoint, 503)
+
+    assert len(list(sheets.iter_shipments(batch_rows=10))) == 25
+
+
+def test_small_limit_reads_past_a_blank_gap(client, worksheet):
+    worksheet.rows[1:4] = [[''] * len(SHIPMENT_COLUMNS)] * 3  # rows 2-4 blank
+    sheets = SheetsService(client=client)
+
+    assert [s.ticket_name for s in sheets.get_all_shipments(limit=1)] == ['ticket 3']
+    assert len(sheets.get_all_shipments(limit=2)) == 2
+
+
+def test_blank_run_of_end_rows_ends_the_stream(client, worksheet, monkeypatch):
+    monkeypatch.setattr('services.sheets_service.STREAM_END_BLANK_ROWS', 10)
+    worksheet.rows[11:21] = [[''] * len(SHIPMENT_COLUMNS)] * 10  # rows 12-21 blank
+    sheets = SheetsService(client=client)
+
+    assert len(list(sheets.iter_shipments(batch_rows=10))) == 10
+    # Without a limit every row is read
+    assert len(sheets.get_all_shipments(limit=None)) == 15
@@ -0,0 +1,124 @@
+"""
+UploadLogMirror sync through SheetsService, and journaled rows in upload log reads
+"""
+from typing import List
+import pytest
+from services import upload_log_mirror, upload_log_writer
+from services.sheets_service import DASHBOARD_COLUMNS, SheetsService
+from tests.fakes import FakeGspreadClient
+
+BL = 'Bill of Lading'
+CIPL = 'Commercial Invoice + Packing List'
+
+
+def _log_row(i: int, shipment_id: str = 'TA1', doc_type: str = BL, status: str = 'uploaded') -> List[str]:
+    record = {
+        'upload_timestamp': f"2025-10-30T09:00:{i:02d}",
+        'shipment_id': shipment_id,
+        'doc_type': doc_type,
+        'file_name': f"20251030_BL_{i}.pdf",
+        'drive_file_id': f"F{i}",
+        'status': status
+    }
+    return [record.get(column, '') for column in DASHBOARD_COLUMNS]
+
+
+@pytest.fixture
+def client():
+    client = FakeGspreadClient()
+    client.add_spreadsheet('DASHBOARD').add_worksheet(
+        'dashboard', [list(DASHBOARD_COLUMNS)] + [_log_row(i) for i in range(5)]
+    )
+    return client
+
+
+@pytest.fixture
+def worksheet(client):
+    return client.open_by_key('DASHBOARD').worksheet('dashboard')
+
+
+@pytest.fixture
+def mirror(monkeypatch, tmp_path):
+    """Process-wide mirror that reads new rows on every call"""
+    mirror = upload_log_mirror.UploadLogMirror(
+        str(tmp_path / 'upload_log.sqlite3'), 'DASHBOARD/dashboard', sync_interval_seconds=0
+    )
+    monkeypatch.setattr(upload_log_mirror, '_upload_log_mirror', mirror)
+    yield mirror
+    mirror.close()
+
+
+@pytest.fixture
+def sheets(client, mirror):
+    return SheetsService(client=client)
+
+
+@pytest.fixture
+def writer(monkeypatch, tmp_path, client, sheets):
+    """Log writer of the client that only flushes when asked"""
+    writer = upload_log_writer.UploadLogWriter(
+        sheets._append_dashboard_rows, str(tmp_path / 'upload_log_journal.1.0.jsonl'),
+        flush_interval_seconds=3600
+    )
+    monkeypatch.setattr(upload_log_writer, '_writers', {id(client): writer})
+    yield writer
+    writer.close()
+
+
+@pytest.fixture
+def reads(sheets):
+    """A1 ranges of every Dashboard read"""
+    reads = []
+    read_rows = sheets._read_dashboard_rows
+
+    def recording_read(ranges):
+        reads.append(ranges)
+        return read_rows(ranges)
+    sheets._read_dashboard_rows = recording_read
+    return reads
+
+
+def _file_ids(records) -> List[str]:
+    return [record['drive_file_id'] for record in records]
+
+
+def test_sync_reads_only_rows_after_the_last_one(sheets, worksheet, mirror, reads):
+    assert _file_ids(sheets.get_upload_logs(limit=10)) == ['F4', 'F3', 'F2', 'F1', 'F0']
+    assert mirror.last_row == 6
+
+    worksheet.rows += [_log_row(5), _log_row(6)]
+
+    assert _file_ids(sheets.get_upload_logs(limit=3)) == ['F6', 'F5', 'F4']
+    # The second read starts at the last synced row, which anchors the rows after it
+    assert reads[1] == [(6, 6 + mirror.batch_rows)]
+    assert mirror.last_row == 8
+
+
+def test_edited_anchor_row_rebuilds_the_mirror(sheets, worksheet, mirror, reads):
+    sheets.get_upload_logs(limit=10)
+
+    worksheet.rows[5] = _log_row(9)  # last synced row replaced
+    worksheet.rows.append(_log_row(10))
+
+    assert _file_ids(sheets.get_upload_logs(limit=10)) == ['F10', 'F9', 'F3', 'F2', 'F1', 'F0']
+    assert [ranges[0][0] for ranges in reads] == [1, 6, 1]
+    assert not mirror.contains(dict(zip(DASHBOARD_COLUMNS, _log_row(4))))
+
+
+def test_journaled_rows_are_served_before_they_are_written(sheets, worksheet, writer):
+    writer.enqueue([
+        _log_row(5, doc_type=CIPL),
+        _log_row(6, shipment_id='TA2', doc_type=CIPL),
+        _log_row(7, doc_type='Quotation', status='failed')
+    ])
+
+    assert _file_ids(sheets.get_upload_logs(limit=3)) == ['F7', 'F6', 'F5']
+    assert _file_ids(sheets.get_upload_logs(shipment_id='TA1', limit=3)) == ['F7', 'F5', 'F4']
+    # Failed uploads do not count towards completeness
+    assert sheets.get_uploaded_doc_types(['TA1', 'TA2', 'TA3']) == {'TA1': [BL, CIPL], 'TA2': [CIPL]}
+    assert len(worksheet.rows) == 6
+
+    # Once written they come from the mirror, not twice
+    assert writer.flush() == 3
+    assert _file_ids(sheets.get_upload_logs(limit=10)) == ['F7', 'F6', 'F5', 'F4', 'F3', 'F2', 'F1', 'F0']
+    assert sheets.get_uploaded_doc_types(['TA1']) == {'TA1': [BL, CIPL]}
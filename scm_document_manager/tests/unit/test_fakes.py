@@ -0,0 +1,116 @@
+"""
+Behaviour of the offline fakes that the service tests and benchmarks rely on
+"""
+from io import BytesIO
+import pytest
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseUpload
+from tests.fakes import FOLDER_MIME_TYPE, FakeDriveAPI, FakeGspreadClient
+
+
+def test_folder_query_by_name_and_parent():
+    api = FakeDriveAPI('ROOT')
+    folder_id = api.add_folder("TA'1", 'ROOT')
+    api.add_folder("TA'1", folder_id)
+
+    query = f"name='TA\\'1' and '{'ROOT'}' in parents and mimeType='{FOLDER_MIME_TYPE}' and trashed=false"
+    files = api.files().list(q=query).execute()['files']
+
+    assert [f['id'] for f in files] == [folder_id]
+    assert api.calls['files.list'] == 1
+
+
+def test_trashed_files_drop_out_of_queries():
+    api = FakeDriveAPI('ROOT')
+    folder_id = api.add_folder('BL', 'ROOT')
+    api.trash(folder_id)
+
+    files = api.files().list(q="name='BL' and trashed=false").execute()['files']
+
+    assert files == []
+    assert api.changes_log[-1]['file']['trashed'] is True
+
+
+def test_quota_raises_429():
+    api = FakeDriveAPI('ROOT', quota_per_minute=2)
+    api.files().get(fileId='ROOT').execute()
+    api.files().get(fileId='ROOT').execute()
+
+    with pytest.raises(HttpError) as raised:
+        api.files().get(fileId='ROOT').execute()
+    assert raised.value.resp.status == 429
+
+
+def test_resumable_upload_and_status_query():
+    api = FakeDriveAPI('ROOT')
+    data = b'x' * (600 * 1024)
+    media = MediaIoBaseUpload(BytesIO(data), mimetype='application/pdf', chunksize=256 * 1024, resumable=True)
+    request = api.files().create(body={'name': 'a.pdf', 'parents': ['ROOT']}, media_body=media)
+
+    status, file = request.next_chunk()
+    assert file is None and status.resumable_progress == 256 * 1024
+
+    response, _ = request.http.request(request.resumable_uri, method='PUT')
+    assert response.status == 308
+    assert response['range'] == f"bytes=0-{256 * 1024 - 1}"
+
+    while file is None:
+        status, file = request.next_chunk()
+    assert api.contents[file['id']] == data
+    response, _ = request.http.request(request.resumable_uri, method='PUT')
+    assert response.status == 404
+
+
+def test_failed_chunk_keeps_session_progress():
+    api = FakeDriveAPI('ROOT')
+    media = MediaIoBaseUpload(BytesIO(b'x' * (600 * 1024)), mimetype='application/pdf',
+                              chunksize=256 * 1024, resumable=True)
+    request = api.files().create(body={'name': 'a.pdf', 'parents': ['ROOT']}, media_body=media)
+    request.next_chunk()
+    api.fail_next_chunks = 1
+
+    with pytest.raises(HttpError) as raised:
+        request.next_chunk()
+    assert raised.value.resp.status == 503
+    response, _ = request.http.request(request.resumable_uri, method='PUT')
+    assert response['range'] == f"bytes=0-{256 * 1024 - 1}"
+
+
+def test_changes_feed_pages_from_token():
+    api = FakeDriveAPI('ROOT')
+    token = api.changes().getStartPageToken().execute()['startPageToken']
+    first = api.add_folder('A', 'ROOT')
+    second = api.add_folder('B', 'ROOT')
+
+    page = api.changes().list(pageToken=token, pageSize=1).execute()
+    assert [c['fileId'] for c in page['changes']] == [first]
+    page = api.changes().list(pageToken=page['nextPageToken'], pageSize=1).execute()
+    assert [c['fileId'] for c in page['changes']] == [second]
+    assert page['newStartPageToken'] == str(len(api.changes_log))
+
+    with pytest.raises(HttpError):
+        api.changes().list(pageToken='999').execute()
+
+
+def test_worksheet_ranges_omit_trailing_blanks():
+    client = FakeGspreadClient()
+    worksheet = client.add_spreadsheet('S').add_worksheet('W', [['a', 'b', ''], ['c', '', ''], ['', '', '']])
+
+    assert worksheet.batch_get(['A1:C3']) == [[['a', 'b'], ['c']]]
+    assert worksheet.batch_get(['B1:B3'], major_dimension='COLUMNS') == [[['b']]]
+
+
+def test_worksheet_writes_bump_the_revision():
+    client = FakeGspreadClient()
+    spreadsheet = client.add_spreadsheet('S')
+    worksheet = spreadsheet.add_worksheet('W', [['h1', 'h2']])
+    version = spreadsheet.version
+
+    response = worksheet.append_rows([['1', '2'], ['3', None]])
+    worksheet.update_cell(5, 1, 'x')
+
+    assert response['updates']['updatedRange'] == "'W'!A2:B3"
+    assert worksheet.rows[2] == ['3', '']
+    assert worksheet.rows[4] == ['x'] and worksheet.row_count == 5
+    assert spreadsheet.version == version + 2
+    assert client.calls['values.append'] == 1 and client.calls['values.update'] == 1
@@ -0,0 +1,62 @@
+"""
+FolderCache: batched writes of the JSON cache file
+"""
+import json
+import time
+from services.folder_cache import FolderCache
+
+
+def _stored(path):
+    with open(path, encoding='utf-8') as f:
+        return {key: folder_id for key, (folder_id, _) in json.load(f).items()}
+
+
+def test_sets_are_written_once_on_flush(tmp_path):
+    path = tmp_path / 'folder_cache.json'
+    cache = FolderCache(cache_file=str(path), flush_interval_seconds=3600)
+
+    for i in range(100):
+        cache.set(f"ROOT/TA{i}", f"F{i}")
+    assert not path.exists()
+
+    cache.flush()
+    assert len(_stored(path)) == 100
+    assert FolderCache(cache_file=str(path)).get('ROOT/TA7') == 'F7'
+
+
+def test_changes_are_flushed_after_the_interval(tmp_path):
+    path = tmp_path / 'folder_cache.json'
+    cache = FolderCache(cache_file=str(path), flush_interval_seconds=0.05)
+
+    cache.set_many({'ROOT/a': 'A', 'ROOT/a/b': 'B', 'ROOT/c': 'C'})
+    cache.invalidate('ROOT/a')
+
+    deadline = time.monotonic() + 5
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _stored(path) == {'ROOT/c': 'C'}
+
+
+def test_flush_without_changes_does_not_write(tmp_path):
+    path = tmp_path / 'folder_cache.json'
+    cache = FolderCache(cache_file=str(path), flush_interval_seconds=3600)
+    cache.set('ROOT/a', 'A')
+    cache.flush()
+    path.unlink()
+
+    cache.get('ROOT/a')
+    cache.flush()
+    assert not path.exists()
+
+
+def test_failed_write_is_retried_on_next_flush(tmp_path):
+    blocker = tmp_path / 'not_a_dir'
+    blocker.write_text('')
+    cache = FolderCache(cache_file=str(blocker / 'folder_cache.json'), flush_interval_seconds=3600)
+    cache.set('ROOT/a', 'A')
+
+    cache.flush()  # parent is a file, so the write fails
+    blocker.unlink()
+    cache.flush()
+
+    assert _stored(blocker / 'folder_cache.json') == {'ROOT/a': 'A'}
@@ -0,0 +1,64 @@
+"""
+LocalContentStore folder entries: name collisions and the copy fallback
+"""
+import io
+import os
+import pytest
+from services.local_store import LocalContentStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalContentStore(str(tmp_path / 'store'))
+    store.ensure_folder_path('TA1/BL')
+    return store
+
+
+@pytest.fixture
+def no_hard_links(monkeypatch):
+    def link(src, dst):
+        raise OSError('hard links not supported')
+    monkeypatch.setattr('services.local_store.os.link', link)
+
+
+def _store(store: LocalContentStore, content: bytes, name: str = 'bl.pdf'):
+    return store.upload_stream(io.BytesIO(content), name, 'TA1/BL')
+
+
+def _entries(store: LocalContentStore):
+    return sorted(os.listdir(store._folder_dir('TA1/BL')))
+
+
+def _read(store: LocalContentStore, name: str) -> bytes:
+    return (store._folder_dir('TA1/BL') / name).read_bytes()
+
+
+def test_same_name_other_content_gets_next_name(store):
+    _store(store, b'first')
+    _store(store, b'second')
+
+    assert _entries(store) == ['bl (1).pdf', 'bl.pdf']
+    assert _read(store, 'bl.pdf') == b'first'
+    assert _read(store, 'bl (1).pdf') == b'second'
+
+
+def test_name_taken_outside_the_store_is_not_overwritten(store):
+    (store._folder_dir('TA1/BL') / 'bl.pdf').write_bytes(b'written by hand')
+
+    result = _store(store, b'uploaded')
+
+    assert result['drive_url'].endswith('/bl%20%281%29.pdf')
+    assert _read(store, 'bl.pdf') == b'written by hand'
+
+
+@pytest.mark.usefixtures('no_hard_links')
+def test_copy_fallback_does_not_duplicate_restored_content(store):
+    first = _store(store, b'content')
+    second = _store(store, b'content')
+    _store(store, b'other')
+
+    assert first == second
+    assert _entries(store) == ['bl (1).pdf', 'bl.pdf']
+    assert _read(store, 'bl (1).pdf') == b'other'
+    assert store._read_sidecar(first['file_id'])['locations'] == [{'folder_id': 'TA1/BL', 'name': 'bl.pdf'}]
+    assert not os.listdir(store._tmp)
@@ -0,0 +1,23 @@
+"""
+Metrics: Prometheus rendering of collected stats
+"""
+from services.metrics import Metrics
+
+
+def test_prometheus_skips_collected_values_that_are_not_numbers():
+    metrics = Metrics()
+    metrics.register_collector('pool', lambda: {
+        'open': 3,
+        'state': 'closed',
+        'per_host': {'a': 1.5, 'b': None, 'c': 'half-open', 'd': True},
+        'hosts': ['a', 'b']
+    })
+
+    lines = metrics.render_prometheus().splitlines()
+    samples = [line for line in lines if line.startswith('scm_pool_')]
+
+    assert samples == [
+        'scm_pool_open 3',
+        'scm_pool_a{key="per_host"} 1.5',
+        'scm_pool_d{key="per_host"} 1',
+    ]
@@ -0,0 +1,176 @@
+"""
+Error classification, retries and the per-endpoint circuit breaker
+"""
+import itertools
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+from core.exceptions import CircuitOpenError, DriveAPIError
+from utils import retry
+from utils.retry import CircuitBreaker, classify_error, get_retry_stats, retry_on_api_error
+
+_endpoints = itertools.count()
+
+
+def _http_error(status: int, content: bytes = b'', retry_after: str = None) -> HttpError:
+    headers = {'status': status}
+    if retry_after:
+        headers['retry-after'] = retry_after
+    return HttpError(httplib2.Response(headers), content)
+
+
+def _wrapped(error: Exception) -> DriveAPIError:
+    """Service-style wrapper keeping the API error as the cause"""
+    try:
+        raise DriveAPIError('wrapped') from error
+    except DriveAPIError as e:
+        return e
+
+
+@pytest.mark.parametrize('error, expected', [
+    (_http_error(429), 0.0),
+    (_http_error(503, retry_after='7'), 7.0),
+    (_http_error(403, b'{"reason": "userRateLimitExceeded"}'), 0.0),
+    (_http_error(403, b'{"reason": "forbidden"}'), None),
+    (_http_error(404), None),
+    (_wrapped(_http_error(500)), 0.0),
+    (_wrapped(_http_error(400)), None),
+    (TimeoutError(), 0.0),
+    (ValueError('bad'), None),
+    (CircuitOpenError('open'), None),
+])
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
+
+
+def test_transient_errors_are_retried(no_retry_wait):
+    endpoint = f"test-{next(_endpoints)}"
+    outcomes = [_http_error(503), _http_error(429), 'ok']
+
+    @retry_on_api_error(max_attempts=3, endpoint=endpoint)
+    def call():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert call() == 'ok'
+    assert get_retry_stats()[endpoint]['retries'] == 2
+
+
+def test_permanent_errors_are_not_retried(no_retry_wait):
+    calls = []
+
+    @retry_on_api_error(max_attempts=3, endpoint=f"test-{next(_endpoints)}")
+    def call():
+        calls.append(1)
+        raise _wrapped(_http_error(400))
+
+    with pytest.raises(DriveAPIError):
+        call()
+    assert len(calls) == 1
+
+
+def test_gives_up_after_max_attempts(no_retry_wait):
+    endpoint = f"test-{next(_endpoints)}"
+    calls = []
+
+    @retry_on_api_error(max_attempts=3, endpoint=endpoint)
+    def call():
+        calls.append(1)
+        raise _http_error(500)
+
+    with pytest.raises(HttpError):
+        call()
+    assert len(calls) == 3
+    assert get_retry_stats()[endpoint]['gave_up'] == 1
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(retry, 'time', clock)
+    return clock
+
+
+def test_circuit_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker('test-open', failure_threshold=3, reset_seconds=30)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert not breaker.is_open
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError, match='retry in 30s'):
+        breaker.before_call()
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker('test-reset', failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert not breaker.is_open
+
+
+def test_half_open_allows_one_trial(clock):
+    breaker = CircuitBreaker('test-trial', failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock.now += 31
+
+    breaker.before_call()  # trial call
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert not breaker.is_open
+    breaker.before_call()
+
+
+def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker('test-reopen', failure_threshold=5, reset_seconds=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 31
+
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_permanent_error_releases_trial(clock, no_retry_wait):
+    endpoint = f"test-{next(_endpoints)}"
+    breaker = retry.get_circuit_breaker(endpoint)
+    breaker.failure_threshold = 1
+
+    @retry_on_api_error(max_attempts=1, endpoint=endpoint)
+    def call(error):
+        if error:
+            raise error
+        return 'ok'
+
+    with pytest.raises(HttpError):
+        call(_http_error(503))
+    with pytest.raises(CircuitOpenError):
+        call(None)
+
+    clock.now += retry.CIRCUIT_RESET_SECONDS + 1
+    with pytest.raises(HttpError):
+        call(_http_error(404))
+    # A 404 says nothing about the endpoint: the circuit stays half-open
+    assert call(None) == 'ok'
+    assert not breaker.is_open
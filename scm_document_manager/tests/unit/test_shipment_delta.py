@@ -0,0 +1,182 @@
+"""
+ShipmentDeltaSync: row matching, change sets and search index upkeep
+"""
+from typing import Any, Dict, List
+import pytest
+from services import shipment_delta
+from services.shipment_delta import ShipmentDeltaSync
+from services.shipment_snapshot import ShipmentSnapshot
+
+
+def _record(i: int, status: str = 'IN_TRANSIT') -> Dict[str, Any]:
+    return {
+        'invoice_no': f"TA{254000000000 + i}",
+        'ticket_name': f"CJ AMZUS 발송 #{i}",
+        'carrier_name': 'CJ',
+        'carrier_mode': '해운',
+        'origin': '태광KR',
+        'destination': 'AMZUS',
+        'onboard_date': '2025-10-30',
+        'bl_no': f"BL{i:08d}",
+        'status': status
+    }
+
+
+class _CountingParse:
+    """Records are already ShipmentInfo fields; counts the rows parsed"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls += 1
+        return dict(record)
+
+
+@pytest.fixture
+def parse():
+    return _CountingParse()
+
+
+def _invoices(sync: ShipmentDeltaSync) -> List[str]:
+    return sync.shipments.column('invoice_no')
+
+
+def _search(sync: ShipmentDeltaSync, term: str) -> List[str]:
+    return ShipmentSnapshot('r', sync.shipments, sync.index).search(term).column('invoice_no')
+
+
+def test_initial_load_inserts_every_row(parse):
+    sync = ShipmentDeltaSync()
+    records = [_record(i) for i in range(5)]
+
+    change_set = sync.apply('r1', records, parse)
+
+    assert len(change_set.inserted) == 5
+    assert not change_set.changed and not change_set.deleted
+    assert _invoices(sync) == [r['invoice_no'] for r in records]
+    assert parse.calls == 5
+
+
+def test_unchanged_reload_is_empty(parse):
+    sync = ShipmentDeltaSync()
+    records = [_record(i) for i in range(5)]
+    sync.apply('r1', records, parse)
+
+    change_set = sync.apply('r2', [dict(r) for r in records], parse)
+
+    assert change_set.is_empty
+    assert parse.calls == 5
+
+
+def test_edited_row_is_parsed_alone_and_paired(parse):
+    sync = ShipmentDeltaSync()
+    records = [_record(i) for i in range(100)]
+    sync.apply('r1', records, parse)
+
+    records[40] = _record(40, status='DELIVERED')
+    change_set = sync.apply('r2', records, parse)
+
+    assert parse.calls == 101
+    assert not change_set.inserted and not change_set.deleted
+    [(old, new)] = change_set.changed
+    assert old.invoice_no == new.invoice_no == records[40]['invoice_no']
+    assert (old.status, new.status) == ('IN_TRANSIT', 'DELIVERED')
+    assert sync.shipments[40].status == 'DELIVERED'
+
+
+def test_deleted_and_inserted_rows(parse):
+    sync = ShipmentDeltaSync()
+    records = [_record(i) for i in range(10)]
+    sync.apply('r1', records, parse)
+
+    updated = records[:3] + records[4:] + [_record(10)]
+    change_set = sync.apply('r2', updated, parse)
+
+    assert [s.invoice_no for s in change_set.deleted] == [records[3]['invoice_no']]
+    assert [s.invoice_no for s in change_set.inserted] == [_record(10)['invoice_no']]
+    assert _invoices(sync) == [r['invoice_no'] for r in updated]
+    assert _search(sync, records[3]['invoice_no']) == []
+    assert _search(sync, 'BL00000010') == [_record(10)['invoice_no']]
+
+
+def test_reorder_keeps_rows_without_parsing(parse):
+    sync = ShipmentDeltaSync()
+    records = [_record(i) for i in range(10)]
+    sync.apply('r1', records, parse)
+
+    change_set = sync.apply('r2', list(reversed(records)), parse)
+
+    assert change_set.is_empty
+    assert parse.calls == 10
+    assert _invoices(sync) == [r['invoice_no'] for r in reversed(records)]
+
+
+def test_duplicate_rows_are_matched_one_to_one(parse):
+    sync = ShipmentDeltaSync()
+    records = [_record(1), _record(1), _record(2)]
+    sync.apply('r1', records, parse)
+
+    change_set = sync.apply('r2', [_record(1), _record(2)], parse)
+
+    assert [s.invoice_no for s in change_set.deleted] == [_record(1)['invoice_no']]
+    assert not change_set.inserted and not change_set.changed
+    assert _invoices(sync) == [_record(1)['invoice_no'], _record(2)['invoice_no']]
+    # The remaining copy is still found
+    assert _search(sync, _record(1)['invoice_no']) == [_record(1)['invoice_no']]
+
+
+def test_rows_without_invoice_or_unparsable_are_skipped():
+    sync = ShipmentDeltaSync()
+    blank = dict(_record(1), invoice_no='')
+    records = [_record(0), blank, {'invoice_no': 'BROKEN'}]
+
+    sync.apply('r1', records, lambda r: None if r['invoice_no'] == 'BROKEN' else dict(r))
+
+    assert _invoices(sync) == [_record(0)['invoice_no']]
+
+
+def test_search_follows_repeated_edits(parse):
+    sync = ShipmentDeltaSync()
+    records = [_record(i) for i in range(20)]
+    sync.apply('r1', records, parse)
+
+    for round_no in range(30):
+        records[round_no % 20] = dict(
+            _record(round_no % 20), ticket_name=f"edit {round_no}",
+            status='DELIVERED' if round_no % 2 else 'IN_TRANSIT'
+        )
+        sync.apply(f"r{round_no + 2}", records, parse)
+
+    assert _invoices(sync) == [r['invoice_no'] for r in records]
+    assert [s.ticket_name for s in sync.shipments] == [r['ticket_name'] for r in records]
+    assert _search(sync, 'edit 29') == [records[9]['invoice_no']]
+    assert _search(sync, 'edit 9') == []  # row 9 was edited again in round 29
+    assert _search(sync, 'ta25400000001') == [r['invoice_no'] for r in records[10:20]]
+
+
+def test_store_is_compacted_once_mostly_dead(parse, monkeypatch):
+    monkeypatch.setattr(shipment_delta, 'COMPACT_MIN_DEAD_ROWS', 10)
+    sync = ShipmentDeltaSync()
+    records = [_record(i) for i in range(10)]
+    sync.apply('r1', records, parse)
+    old_snapshot = ShipmentSnapshot('r1', sync.shipments, sync.index)
+
+    for round_no in range(25):
+        records[round_no % 10] = dict(_record(round_no % 10), ticket_name=f"edit {round_no}")
+        sync.apply(f"r{round_no + 2}", records, parse)
+
+    # Dead rows never outnumber live ones for long
+    assert len(sync.store) <= 2 * len(records)
+    assert _invoices(sync) == [r['invoice_no'] for r in records]
+    assert [s.ticket_name for s in sync.shipments] == [r['ticket_name'] for r in records]
+    assert _search(sync, 'edit 24') == [records[4]['invoice_no']]
+    assert _search(sync, 'edit 4') == []
+
+    # Snapshots taken before compaction still read their own rows
+    assert [s.ticket_name for s in old_snapshot.shipments] == [_record(i)['ticket_name'] for i in range(10)]
+
+    # Matching by fingerprint still works on the compacted store
+    calls = parse.calls
+    assert sync.apply('r99', list(records), parse).is_empty
+    assert parse.calls == calls
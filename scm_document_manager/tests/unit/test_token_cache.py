@@ -0,0 +1,102 @@
+"""
+AccessTokenCache: sharing through the cache file, expiry and rejected tokens
+"""
+from datetime import datetime, timedelta
+import pytest
+from services import token_cache
+from services.token_cache import AccessTokenCache, SharedTokenCredentials
+
+TOKEN_LIFETIME = timedelta(hours=1)
+
+
+class _Clock:
+    offset = timedelta()
+
+
+class _Datetime(datetime):
+    """datetime whose utcnow follows _Clock"""
+
+    @classmethod
+    def utcnow(cls):
+        return datetime.utcnow() + _Clock.offset
+
+
+class _TokenEndpoint:
+    """Issues token-1, token-2, ... valid for TOKEN_LIFETIME"""
+
+    def __init__(self):
+        self.issued = 0
+
+    def credentials(self, info, scopes) -> "_ServiceAccount":
+        return _ServiceAccount(self, info['client_email'])
+
+
+class _ServiceAccount:
+    """Stands in for service_account.Credentials"""
+
+    def __init__(self, endpoint: _TokenEndpoint, email: str):
+        self.endpoint = endpoint
+        self.service_account_email = email
+        self.token = None
+        self.expiry = None
+
+    def refresh(self, request) -> None:
+        self.endpoint.issued += 1
+        self.token = f"token-{self.endpoint.issued}"
+        self.expiry = _Datetime.utcnow() + TOKEN_LIFETIME
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    endpoint = _TokenEndpoint()
+    _Clock.offset = timedelta()
+    monkeypatch.setattr(token_cache, 'datetime', _Datetime)
+    monkeypatch.setattr(token_cache.service_account.Credentials, 'from_service_account_info', endpoint.credentials)
+    return endpoint
+
+
+@pytest.fixture
+def new_cache(tmp_path, endpoint):
+    def new_cache() -> AccessTokenCache:
+        return AccessTokenCache(
+            {'client_email': 'tests@example.com'}, ['scope'],
+            cache_file=str(tmp_path / 'access_token.json'), refresh_margin_seconds=600
+        )
+    return new_cache
+
+
+def test_caches_on_one_file_share_the_token(new_cache, endpoint):
+    first, second = new_cache(), new_cache()
+
+    token, expiry = first.get_token()
+
+    assert second.get_token() == (token, expiry)
+    assert first.get_token() == (token, expiry)
+    assert (first.refreshes, second.refreshes, endpoint.issued) == (1, 0, 1)
+
+
+def test_token_is_refreshed_before_expiry(new_cache, endpoint):
+    first, second = new_cache(), new_cache()
+    assert first.get_token()[0] == 'token-1'
+
+    _Clock.offset = TOKEN_LIFETIME - timedelta(seconds=300)  # inside the refresh margin
+
+    assert second.get_token()[0] == 'token-2'
+    # The other process picks up the refreshed token from the file
+    assert first.get_token()[0] == 'token-2'
+    assert endpoint.issued == 2
+
+
+def test_rejected_token_is_not_handed_back(new_cache, endpoint):
+    first, second = new_cache(), new_cache()
+    first.get_token()
+
+    # Still valid by expiry, in memory and on file
+    assert second.get_token(stale_token='token-1')[0] == 'token-2'
+    assert first.get_token(stale_token='token-1')[0] == 'token-2'
+    assert endpoint.issued == 2
+
+    credentials = SharedTokenCredentials(first)
+    credentials.token = 'token-2'
+    credentials.refresh(None)
+    assert credentials.token == 'token-3'
@@ -0,0 +1,174 @@
+"""
+UploadLogWriter journaling, flushing and replay
+"""
+import json
+import os
+import gspread
+import pytest
+import requests
+from services.upload_log_writer import UploadLogWriter
+
+
+def _api_error(status: int, message: str) -> gspread.exceptions.APIError:
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps({'error': {'code': status, 'message': message}}).encode('utf-8')
+    return gspread.exceptions.APIError(response)
+
+
+class _Sheet:
+    def __init__(self):
+        self.rows = []
+        self.down = False
+        self.malformed = set()  # first cells of rows the API rejects with 400
+        self.lose_next_response = False
+
+    def append_rows(self, rows):
+        if self.down:
+            raise RuntimeError('sheet unavailable')
+        if any(row[0] in self.malformed for row in rows):
+            raise _api_error(400, 'Invalid value')
+        self.rows.extend(rows)
+        if self.lose_next_response:
+            self.lose_next_response = False
+            raise _api_error(503, 'Service unavailable')
+
+
+@pytest.fixture
+def sheet():
+    return _Sheet()
+
+
+@pytest.fixture
+def new_writer(tmp_path, sheet):
+    writers = []
+
+    def new_writer(name: str = 'upload_log_journal.1.0.jsonl') -> UploadLogWriter:
+        writer = UploadLogWriter(sheet.append_rows, str(tmp_path / name), flush_interval_seconds=3600)
+        writers.append(writer)
+        return writer
+
+    yield new_writer
+    sheet.down = False
+    for writer in writers:
+        writer.close()
+
+
+def _journal_rows(path: str):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_enqueue_journals_before_flush(new_writer, sheet):
+    writer = new_writer()
+    writer.enqueue([['a', 1], ['b', 2]])
+
+    assert _journal_rows(writer.journal_path) == [['a', 1], ['b', 2]]
+    assert sheet.rows == []
+
+    assert writer.flush() == 2
+    assert sheet.rows == [['a', 1], ['b', 2]]
+    assert _journal_rows(writer.journal_path) == []
+
+
+def test_failed_flush_keeps_rows(new_writer, sheet):
+    writer = new_writer()
+    writer.enqueue([['a', 1]])
+    sheet.down = True
+
+    with pytest.raises(RuntimeError):
+        writer.flush()
+
+    assert writer.pending_rows() == [['a', 1]]
+    assert _journal_rows(writer.journal_path) == [['a', 1]]
+
+
+def test_rows_of_exited_writer_are_replayed_once(tmp_path, new_writer, sheet):
+    orphan = tmp_path / 'upload_log_journal.999.0.jsonl'
+    orphan.write_text(json.dumps(['a', 1]) + '\n' + '["torn', encoding='utf-8')
+    sheet.down = True  # keep the replayed rows pending
+
+    first = new_writer()
+    second = new_writer('upload_log_journal.1.1.jsonl')
+
+    assert first.pending_rows() == [['a', 1]]
+    assert second.pending_rows() == []
+    assert not orphan.exists()
+    sheet.down = False
+    first.flush()
+    assert sheet.rows == [['a', 1]]
+
+
+def test_journal_of_running_writer_is_not_taken(new_writer):
+    running = new_writer('upload_log_journal.2.0.jsonl')
+    running.enqueue([['a', 1]])
+
+    starting = new_writer()
+
+    assert starting.pending_rows() == []
+    assert _journal_rows(running.journal_path) == [['a', 1]]
+
+
+def test_rows_enqueued_during_flush_stay_journaled(new_writer, sheet):
+    writer = new_writer()
+    writer.enqueue([['a', 1]])
+
+    def append_and_enqueue(rows):
+        sheet.rows.extend(rows)
+        if len(sheet.rows) == 1:
+            writer.enqueue([['b', 2]])
+    writer.append_rows = append_and_enqueue
+
+    writer.flush()
+
+    assert sheet.rows == [['a', 1], ['b', 2]]
+    assert _journal_rows(writer.journal_path) == []
+    assert not os.path.exists(f"{writer.journal_path}.tmp")
+
+
+def test_rejected_rows_are_dead_lettered(new_writer, sheet):
+    writer = new_writer()
+    sheet.malformed = {'bad'}
+    writer.enqueue([['a', 1], ['bad', 2], ['c', 3], ['d', 4]])
+
+    assert writer.flush() == 3
+
+    assert sheet.rows == [['a', 1], ['c', 3], ['d', 4]]
+    assert _journal_rows(writer.journal_path) == []
+    [dead] = _journal_rows(writer.dead_letter_path)
+    assert dead['row'] == ['bad', 2]
+    assert 'Invalid value' in dead['error']
+
+    # Later rows are not blocked
+    writer.enqueue([['e', 5]])
+    assert writer.flush() == 1
+    assert sheet.rows[-1] == ['e', 5]
+
+
+def test_transient_failure_is_not_dead_lettered(new_writer):
+    writer = new_writer()
+    writer.enqueue([['a', 1]])
+
+    def unavailable(rows):
+        raise _api_error(503, 'Service unavailable')
+    writer.append_rows = unavailable
+
+    with pytest.raises(gspread.exceptions.APIError):
+        writer.flush()
+
+    assert writer.pending_rows() == [['a', 1]]
+    assert not os.path.exists(writer.dead_letter_path)
+
+
+def test_lost_response_sends_batch_again(new_writer, sheet):
+    writer = new_writer()
+    writer.enqueue([['a', 1], ['b', 2]])
+    sheet.lose_next_response = True  # rows are appended, then the call fails
+
+    with pytest.raises(gspread.exceptions.APIError):
+        writer.flush()
+    assert writer.flush() == 2
+
+    # At-least-once: nothing is lost, the batch is on the sheet twice
+    assert sheet.rows == [['a', 1], ['b', 2], ['a', 1], ['b', 2]]
+    assert _journal_rows(writer.journal_path) == []
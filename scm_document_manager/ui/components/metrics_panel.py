@@ -0,0 +1,30 @@
+"""
+Debug panel showing latency and cache metrics
+"""
+import pandas as pd
+import streamlit as st
+from services.metrics import get_metrics
+
+
+def render_metrics_panel() -> None:
+    """Render span latencies, counters and collected stats in a collapsed expander"""
+    snapshot = get_metrics().snapshot()
+
+    with st.expander("🛠 성능 지표 (debug)", expanded=False):
+        if not snapshot['enabled']:
+            st.caption("METRICS_ENABLED=true 로 설정하면 지표가 수집됩니다")
+            return
+
+        if snapshot['spans']:
+            spans = pd.DataFrame.from_dict(snapshot['spans'], orient='index')
+            spans.index.name = 'span'
+            st.dataframe(spans, use_container_width=True)
+        else:
+            st.caption("기록된 구간 없음")
+
+        if snapshot['counters']:
+            st.json(snapshot['counters'])
+
+        for name, stats in snapshot['stats'].items():
+            st.markdown(f"**{name}**")
+            st.json(stats)
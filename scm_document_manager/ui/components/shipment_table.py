@@ -0,0 +1,195 @@
+"""
+Paginated shipment table
+
+The display columns of a snapshot are built once per sheet revision
+(ShipmentFrame, shared by all sessions). A rerun only filters, sorts and
+slices row positions, and only the visible page is sent to the browser.
+"""
+import math
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+import streamlit as st
+from config.settings import get_settings
+
+if TYPE_CHECKING:
+    from services.shipment_snapshot import ShipmentSnapshot
+
+ALL_STATUSES = "전체"
+SHEET_ORDER = "시트 순서"
+SORT_COLUMNS = ["송장번호", "일자", "상태", "운송사", "경로"]
+PAGE_SIZES = [25, 50, 100, 200]
+
+# Filter/sort results kept per frame, so paging through them is a slice
+_MAX_CACHED_QUERIES = 32
+
+
+class ShipmentFrame:
+    """Display columns and per-column sort orders of one snapshot"""
+
+    def __init__(self, snapshot: "ShipmentSnapshot"):
+        shipments = snapshot.shipments
+        self.revision = snapshot.revision
+        self._index = snapshot.index
+        self._positions = {row_id: position for position, row_id in enumerate(shipments.row_ids)}
+
+        # Read straight from the store columns; no ShipmentInfo is built
+        column = shipments.column
+        self.frame = pd.DataFrame({
+            "송장번호": column('invoice_no'),
+            "티켓명": [value or "-" for value in column('ticket_name')],
+            "일자": [value or "-" for value in column('onboard_date')],
+            "경로": [
+                f"{origin} → {destination}"
+                for origin, destination in zip(column('origin'), column('destination'))
+            ],
+            "운송사": [
+                f"{name} ({mode})"
+                for name, mode in zip(column('carrier_name'), column('carrier_mode'))
+            ],
+            "BL번호": [value or "-" for value in column('bl_no')],
+            "상태": [value or "-" for value in column('status')]
+        })
+
+        statuses = self.frame["상태"].to_numpy()
+        self.statuses = sorted(set(statuses))
+        self._by_status = {status: np.flatnonzero(statuses == status) for status in self.statuses}
+        self._ranks: Dict[str, np.ndarray] = {}
+        self._queries: Dict[Tuple, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def query(
+        self,
+        search: str = '',
+        status: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = False
+    ) -> np.ndarray:
+        """
+        Get row positions matching the filters, in display order
+
+        Args:
+            search: Invoice/BL number or ticket name text (search index match)
+            status: Only rows with this status
+            sort_by: Column to sort by (None: sheet order)
+            descending: Reverse the order
+
+        Returns:
+            Row positions into self.frame
+        """
+        key = (search.strip().lower(), status, sort_by, descending)
+        with self._lock:
+            positions = self._queries.get(key)
+        if positions is not None:
+            return positions
+
+        if key[0]:
+            # The index is shared with newer revisions; keep rows of this one
+            matches = (self._positions.get(row_id) for row_id in self._index.search(key[0]))
+            positions = np.fromiter(
+                (position for position in matches if position is not None), dtype=np.int64
+            )
+            if status is not None:
+                positions = positions[self.frame["상태"].to_numpy()[positions] == status]
+        elif status is not None:
+            positions = self._by_status.get(status, np.empty(0, dtype=np.int64))
+        else:
+            positions = np.arange(len(self.frame))
+
+        if sort_by is not None:
+            positions = positions[np.argsort(self._rank(sort_by)[positions], kind='stable')]
+        if descending:
+            positions = positions[::-1]
+
+        with self._lock:
+            if len(self._queries) >= _MAX_CACHED_QUERIES:
+                self._queries.pop(next(iter(self._queries)))
+            self._queries[key] = positions
+        return positions
+
+    def page(self, positions: np.ndarray, page: int, page_size: int) -> pd.DataFrame:
+        """Get one page (1-based) of the given row positions"""
+        start = (page - 1) * page_size
+        return self.frame.iloc[positions[start:start + page_size]]
+
+    def _rank(self, column: str) -> np.ndarray:
+        """Sort rank of every row by a column (computed once per column)"""
+        with self._lock:
+            rank = self._ranks.get(column)
+        if rank is None:
+            order = np.argsort(self.frame[column].to_numpy(), kind='stable')
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            with self._lock:
+                self._ranks[column] = rank
+        return rank
+
+
+_frame: Optional[ShipmentFrame] = None
+_frame_lock = threading.Lock()
+
+
+def get_shipment_frame(snapshot: "ShipmentSnapshot") -> ShipmentFrame:
+    """Get the process-wide frame for a snapshot (rebuilt when the revision changes)"""
+    global _frame
+    with _frame_lock:
+        if _frame is None or _frame.revision != snapshot.revision:
+            _frame = ShipmentFrame(snapshot)
+        return _frame
+
+
+def render_shipment_table(snapshot: "ShipmentSnapshot") -> None:
+    """Render search/status/sort controls and the current page of shipments"""
+    frame = get_shipment_frame(snapshot)
+
+    col_search, col_status, col_sort, col_order = st.columns([3, 2, 2, 1])
+    with col_search:
+        search = st.text_input(
+            "검색",
+            key="shipment_table_search",
+            placeholder="송장번호, BL번호, 티켓명"
+        )
+    with col_status:
+        status = st.selectbox("상태", [ALL_STATUSES, *frame.statuses], key="shipment_table_status")
+    with col_sort:
+        sort_by = st.selectbox("정렬", [SHEET_ORDER, *SORT_COLUMNS], key="shipment_table_sort")
+    with col_order:
+        descending = st.toggle("내림차순", key="shipment_table_descending")
+
+    positions = frame.query(
+        search,
+        status=None if status == ALL_STATUSES else status,
+        sort_by=None if sort_by == SHEET_ORDER else sort_by,
+        descending=descending
+    )
+
+    default_size = get_settings().shipment_table_page_size
+    page_size = st.session_state.get("shipment_table_page_size", default_size)
+    pages = max(1, math.ceil(len(positions) / page_size))
+
+    # Back to the first page when the filters change; stay in range after reloads
+    query_key = (search, status, sort_by, descending, page_size)
+    if st.session_state.get("shipment_table_query") != query_key:
+        st.session_state.shipment_table_query = query_key
+        st.session_state.shipment_table_page = 1
+    st.session_state.shipment_table_page = min(st.session_state.get("shipment_table_page", 1), pages)
+
+    st.dataframe(
+        frame.page(positions, st.session_state.shipment_table_page, page_size),
+        use_container_width=True,
+        hide_index=True,
+        height=400
+    )
+
+    col_caption, col_page, col_size = st.columns([4, 1, 1])
+    with col_page:
+        page = st.number_input("페이지", min_value=1, max_value=pages, step=1, key="shipment_table_page")
+    with col_size:
+        sizes = sorted(set(PAGE_SIZES) | {default_size})
+        st.selectbox("페이지당", sizes, index=sizes.index(page_size), key="shipment_table_page_size")
+    with col_caption:
+        st.caption(f"총 {len(frame)}건 중 {len(positions)}건 · {page}/{pages} 페이지")
@@ -0,0 +1,39 @@
+"""
+Upload progress bar component
+"""
+import threading
+from typing import Callable
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+
+def create_upload_progress(total_bytes: int) -> Callable[[int, int, int], None]:
+    """
+    Render a progress bar and return a batch upload progress callback
+
+    The callback is invoked from upload worker threads, so it attaches the
+    current script run context before touching the Streamlit element.
+
+    Args:
+        total_bytes: Total size of all files in the batch
+
+    Returns:
+        Callback accepting (request index, bytes_sent, total_bytes)
+    """
+    progress_bar = st.progress(0.0, text="업로드 준비 중...")
+    ctx = get_script_run_ctx()
+    sent_by_index = {}
+    lock = threading.Lock()
+
+    def on_progress(index: int, sent: int, total: int) -> None:
+        add_script_run_ctx(threading.current_thread(), ctx)
+        with lock:
+            sent_by_index[index] = sent
+            done = sum(sent_by_index.values())
+        ratio = min(done / total_bytes, 1.0) if total_bytes else 1.0
+        progress_bar.progress(
+            ratio,
+            text=f"업로드 중... {done / 1024 / 1024:.1f} / {total_bytes / 1024 / 1024:.1f} MB"
+        )
+
+    return on_progress
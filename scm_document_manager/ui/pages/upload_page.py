@@ -5,6 +5,8 @@ import streamlit as st
 from services.sheets_service import SheetsService
 from services.document_service import DocumentService
 from core.enums import DocType
+from core.models import UploadRequest
+from ui.components.upload_progress import create_upload_progress
 
 
 def render():
@@ -86,6 +88,17 @@ def render():
 
         st.info(f"**선택된 선적:** {shipment.invoice_no} ({shipment.carrier_name})")
 
+        # Document completeness (served from the local upload log mirror)
+        try:
+            uploaded_types = st.session_state.sheets_service.get_uploaded_doc_types(
+                [shipment.invoice_no]
+            ).get(shipment.invoice_no, [])
+            st.markdown("**서류 현황:** " + " · ".join(
+                f"{'✅' if dt.value in uploaded_types else '⬜'} {dt.value}" for dt in DocType
+            ))
+        except Exception as e:
+            st.caption(f"서류 현황 조회 실패: {e}")
+
         col_doc1, col_doc2 = st.columns(2)
 
         with col_doc1:
@@ -102,56 +115,67 @@ def render():
                 help="파일명에 사용될 약어 (예: CIPL, BL, SETTLE)"
             )
 
-        uploaded_file = st.file_uploader(
+        uploaded_files = st.file_uploader(
             "파일 선택",
             type=['pdf', 'xlsx', 'xls', 'csv', 'png', 'jpg', 'jpeg'],
-            help=f"최대 파일 크기: {st.session_state.document_service.drive.settings.max_file_size_mb}MB"
+            accept_multiple_files=True,
+            help=f"최대 파일 크기: {st.session_state.document_service.settings.max_file_size_mb}MB"
         )
 
-        if uploaded_file:
-            file_size_mb = len(uploaded_file.getvalue()) / 1024 / 1024
+        if uploaded_files:
+            total_size_mb = sum(f.size for f in uploaded_files) / 1024 / 1024
 
             col_info1, col_info2 = st.columns(2)
             with col_info1:
-                st.markdown(f"**파일명:** {uploaded_file.name}")
-                st.markdown(f"**크기:** {file_size_mb:.2f} MB")
+                st.markdown(f"**파일 수:** {len(uploaded_files)}")
+                st.markdown(f"**총 크기:** {total_size_mb:.2f} MB")
             with col_info2:
-                st.markdown(f"**형식:** {uploaded_file.type}")
+                for f in uploaded_files:
+                    st.markdown(f"- {f.name} ({f.type})")
 
             if st.button("🚀 서류 업로드", type="primary", use_container_width=True):
-                with st.spinner("업로드 중..."):
+                with st.spinner(f"{len(uploaded_files)}개 파일 업로드 중..."):
                     try:
-                        result = st.session_state.document_service.upload_document(
-                            file_content=uploaded_file.getvalue(),
-                            file_name=uploaded_file.name,
-                            shipment_id=shipment.invoice_no,
-                            doc_type=doc_type,
-                            doc_type_abbr=doc_abbr,
-                            origin=shipment.origin,
-                            destination=shipment.destination,
-                            carrier_name=shipment.carrier_name,
-                            carrier_mode=shipment.carrier_mode
+                        batch = [
+                            UploadRequest(
+                                file_content=f,
+                                file_name=f.name,
+                                shipment_id=shipment.invoice_no,
+                                doc_type=doc_type,
+                                doc_type_abbr=doc_abbr,
+                                origin=shipment.origin,
+                                destination=shipment.destination,
+                                carrier_name=shipment.carrier_name,
+                                carrier_mode=shipment.carrier_mode
+                            )
+                            for f in uploaded_files
+                        ]
+                        on_progress = create_upload_progress(sum(f.size for f in uploaded_files))
+                        results = st.session_state.document_service.upload_documents(
+                            batch,
+                            progress_callback=on_progress
                         )
 
-                        if result.success:
-                            st.success("✅ " + result.message)
-
-                            if result.metadata:
-                                with st.expander("📋 업로드 상세 정보"):
-                                    st.json({
-                                        "파일명": result.metadata.file_name,
-                                        "드라이브 URL": result.metadata.drive_url,
-                                        "폴더 경로": result.metadata.drive_folder_id,
-                                        "업로더": result.metadata.uploader,
-                                        "업로드 시간": result.metadata.upload_timestamp.isoformat()
-                                    })
-
-                            # Clear session
-                            if st.button("다른 서류 업로드"):
-                                del st.session_state.selected_shipment
-                                st.rerun()
-                        else:
-                            st.error(f"❌ 업로드 실패: {result.error}")
+                        for f, result in zip(uploaded_files, results):
+                            if result.success:
+                                st.success("✅ " + result.message)
+
+                                if result.metadata:
+                                    with st.expander(f"📋 {f.name} 업로드 상세 정보"):
+                                        st.json({
+                                            "파일명": result.metadata.file_name,
+                                            "드라이브 URL": result.metadata.drive_url,
+                                            "폴더 경로": result.metadata.drive_folder_id,
+                                            "업로더": result.metadata.uploader,
+                                            "업로드 시간": result.metadata.upload_timestamp.isoformat()
+                                        })
+                            else:
+                                st.error(f"❌ {f.name} 업로드 실패: {result.error}")
+
+                        # Clear session
+                        if st.button("다른 서류 업로드"):
+                            del st.session_state.selected_shipment
+                            st.rerun()
 
                     except Exception as e:
                         st.error(f"❌ 업로드 오류: {e}")
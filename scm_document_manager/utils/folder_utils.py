@@ -74,7 +74,24 @@ def build_folder_path(
     Returns:
         Folder path string
     """
-    return f"{category.value}/{shipment_id}/{doc_type}"
+    return f"{build_shipment_folder_path(category, shipment_id)}/{doc_type}"
+
+
+def build_shipment_folder_path(category: ShipmentCategory, shipment_id: str) -> str:
+    """
+    Build the shipment folder path (parent of its document type folders)
+
+    Example:
+        01_KR_TO_3PL/TA717001250829
+
+    Args:
+        category: Shipment category
+        shipment_id: Invoice number
+
+    Returns:
+        Folder path string
+    """
+    return f"{category.value}/{shipment_id}"
 
 
 def build_file_name(
@@ -1,20 +1,308 @@
 """
 Retry utilities using tenacity
+
+Failures are classified from the underlying Google API error (the services
+wrap HttpError / gspread APIError in their own exceptions, keeping the
+original as __cause__/__context__):
+
+- transient: 429, 5xx, 403 rate-limit reasons, timeouts and connection
+  errors; retried, waiting Retry-After when the server sends one and
+  decorrelated jitter otherwise
+- permanent: every other error; raised immediately
+
+Each endpoint (e.g. "drive", "sheets") has a circuit breaker. After
+consecutive transient failures it opens and calls fail fast with
+CircuitOpenError until a trial call succeeds after the reset timeout.
 """
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type
-)
-from core.exceptions import DriveAPIError, SheetsAPIError
-
-
-def retry_on_api_error(max_attempts=3):
-    """Decorator for retrying API calls"""
-    return retry(
-        stop=stop_after_attempt(max_attempts),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((DriveAPIError, SheetsAPIError)),
-        reraise=True
-    )
+import functools
+import random
+import threading
+import time
+from typing import Dict, Iterator, Optional
+import gspread
+import requests
+from googleapiclient.errors import HttpError
+from tenacity import retry, retry_if_exception, stop_after_attempt
+from config.logging_config import get_logger
+from core.exceptions import CircuitOpenError
+
+logger = get_logger(__name__)
+
+# Decorrelated jitter bounds (seconds)
+BASE_WAIT_SECONDS = 1.0
+MAX_WAIT_SECONDS = 20.0
+
+# Longest Retry-After honored before giving up on the call instead
+MAX_RETRY_AFTER_SECONDS = 60.0
+
+# Consecutive transient failures that open a circuit, and how long it stays open
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_SECONDS = 30.0
+
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+
+
+def _error_chain(error: BaseException) -> Iterator[BaseException]:
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def classify_error(error: BaseException) -> Optional[float]:
+    """
+    Classify an API failure
+
+    Args:
+        error: Exception raised by a service call
+
+    Returns:
+        None if permanent; otherwise the server's Retry-After in seconds,
+        or 0.0 if it did not send one
+    """
+    for cause in _error_chain(error):
+        if isinstance(cause, CircuitOpenError):
+            return None
+        if isinstance(cause, HttpError):
+            status = cause.resp.status
+            retry_after = cause.resp.get('retry-after')
+            content = cause.content.decode('utf-8', 'replace') if cause.content else ''
+            rate_limited = status == 403 and any(reason in content for reason in RATE_LIMIT_REASONS)
+        elif isinstance(cause, gspread.exceptions.APIError):
+            status = cause.response.status_code
+            retry_after = cause.response.headers.get('Retry-After')
+            rate_limited = False
+        elif isinstance(cause, (
+            TimeoutError,
+            ConnectionError,
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout
+        )):
+            return 0.0
+        else:
+            continue
+
+        if status == 429 or status >= 500 or rate_limited:
+            try:
+                return float(retry_after) if retry_after else 0.0
+            except ValueError:
+                return 0.0
+        return None
+    return None
+
+
+def rejected_status(error: BaseException) -> Optional[int]:
+    """
+    Get the HTTP status of a request the API rejected for good
+
+    Args:
+        error: Exception raised by a service call
+
+    Returns:
+        Status (e.g. 400 for a malformed request) if the error comes from an
+        API response classify_error treats as permanent; None for transient
+        errors, open circuits and failures without an API response
+    """
+    if classify_error(error) is not None:
+        return None
+    for cause in _error_chain(error):
+        if isinstance(cause, CircuitOpenError):
+            return None
+        if isinstance(cause, HttpError):
+            return cause.resp.status
+        if isinstance(cause, gspread.exceptions.APIError):
+            return cause.response.status_code
+    return None
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one endpoint"""
+
+    def __init__(
+        self,
+        endpoint: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds: float = CIRCUIT_RESET_SECONDS
+    ):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless the call may proceed"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.reset_seconds - time.monotonic()
+            if remaining <= 0 and not self._trial_running:
+                # Half-open: let one trial call through
+                self._trial_running = True
+                return
+            _stats.record_rejection(self.endpoint)
+            raise CircuitOpenError(
+                f"{self.endpoint} API is unavailable, retry in {max(remaining, 0):.0f}s"
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"Circuit closed for {self.endpoint}")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            trial_failed = self._trial_running
+            self._trial_running = False
+            if trial_failed or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                _stats.record_open(self.endpoint)
+                logger.warning(
+                    f"Circuit opened for {self.endpoint} after {self._failures} "
+                    f"transient failures; failing fast for {self.reset_seconds:.0f}s"
+                )
+
+    def release_trial(self) -> None:
+        """End a trial call that failed for a non-transient reason"""
+        with self._lock:
+            self._trial_running = False
+
+
+class RetryStats:
+    """Per-endpoint retry counters"""
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, endpoint: str) -> Dict[str, float]:
+        return self._counters.setdefault(endpoint, {
+            'retries': 0,
+            'wait_seconds': 0.0,
+            'gave_up': 0,
+            'circuit_opened': 0,
+            'circuit_rejected': 0
+        })
+
+    def record_retry(self, endpoint: str, wait: float) -> None:
+        with self._lock:
+            counters = self._endpoint(endpoint)
+            counters['retries'] += 1
+            counters['wait_seconds'] += wait
+
+    def record_give_up(self, endpoint: str) -> None:
+        with self._lock:
+            self._endpoint(endpoint)['gave_up'] += 1
+
+    def record_open(self, endpoint: str) -> None:
+        with self._lock:
+            self._endpoint(endpoint)['circuit_opened'] += 1
+
+    def record_rejection(self, endpoint: str) -> None:
+        with self._lock:
+            self._endpoint(endpoint)['circuit_rejected'] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                endpoint: {**counters, 'wait_seconds': round(counters['wait_seconds'], 3)}
+                for endpoint, counters in self._counters.items()
+            }
+
+
+_stats = RetryStats()
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(endpoint: str) -> CircuitBreaker:
+    """Get process-wide circuit breaker for an endpoint"""
+    with _breakers_lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker(endpoint)
+        return _breakers[endpoint]
+
+
+def get_retry_stats() -> Dict[str, Dict[str, float]]:
+    """Get retries, time spent waiting, give-ups and circuit events per endpoint"""
+    return _stats.snapshot()
+
+
+def _is_retriable(error: BaseException) -> bool:
+    retry_after = classify_error(error)
+    return retry_after is not None and retry_after <= MAX_RETRY_AFTER_SECONDS
+
+
+def _wait(retry_state) -> float:
+    """Retry-After if the server sent one, else decorrelated jitter"""
+    retry_after = classify_error(retry_state.outcome.exception()) or 0.0
+    previous = getattr(retry_state, 'previous_wait', BASE_WAIT_SECONDS)
+    jitter = min(MAX_WAIT_SECONDS, random.uniform(BASE_WAIT_SECONDS, previous * 3))
+    retry_state.previous_wait = jitter
+    return max(retry_after, jitter)
+
+
+def retry_on_api_error(max_attempts=3, endpoint: str = 'default'):
+    """
+    Decorator for retrying transient API failures
+
+    Args:
+        max_attempts: Attempts including the first call
+        endpoint: Circuit breaker / stats key (e.g. "drive", "sheets")
+    """
+    breaker = get_circuit_breaker(endpoint)
+
+    def before_sleep(retry_state) -> None:
+        wait = retry_state.next_action.sleep
+        _stats.record_retry(endpoint, wait)
+        logger.warning(
+            f"{retry_state.fn.__qualname__} failed (attempt {retry_state.attempt_number}/{max_attempts}), "
+            f"retrying in {wait:.1f}s: {retry_state.outcome.exception()}"
+        )
+
+    def decorator(func):
+        @functools.wraps(func)
+        def attempt(*args, **kwargs):
+            breaker.before_call()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if classify_error(e) is not None:
+                    breaker.record_failure()
+                else:
+                    # Permanent errors say nothing about the endpoint's health
+                    breaker.release_trial()
+                raise
+            breaker.record_success()
+            return result
+
+        retrying = retry(
+            stop=stop_after_attempt(max_attempts),
+            wait=_wait,
+            retry=retry_if_exception(_is_retriable),
+            before_sleep=before_sleep,
+            reraise=True
+        )(attempt)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return retrying(*args, **kwargs)
+            except Exception as e:
+                if _is_retriable(e):
+                    _stats.record_give_up(endpoint)
+                raise
+
+        return wrapper
+    return decorator